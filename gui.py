@@ -1,7 +1,34 @@
+import contextlib
+import functools
+import os
+import shutil
+import tempfile
+import time
+
 import streamlit as st
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from wavelab import (
+    BASIC_SIGNALS, CHANNEL_PRESETS, CHANNEL_SIGNALS, CUSTOM_SIGNAL, DECIMATION_METHODS, DEFAULT_MAX_POINTS, FILTER_OPERATIONS, MAX_CHANNELS,
+    MAX_SWEEP_VALUES, MIX_MODES, MULTICHANNEL_SIGNAL, NEON_DARK, OPERATION_PARAMS,
+    OPERATION_THEORY, OPERATIONS, RECORDED_SIGNAL, RECORDING_FORMATS, RECORDINGS_DIR, RESOLUTION_STEPS,
+    SEGMENT_LENGTHS, SHARED_CACHE, SIGNAL_TYPES, SPECTRUM_WINDOWS, STREAM_RATES, SWEEP_METRICS, SWEEP_PARAMS,
+    SWEEP_SIGNALS, Channel, ChannelMix, ExpressionError, RingBuffer, SignalStream, SpectrumCache, StreamPacer, channel_preset, decimate,
+    decimate_channels, design_filter, expression_key, signal_key, evaluate_sandboxed, generate_signal, generate_sweep, list_recordings,
+    needs_second_signal, open_recording, sandbox_info, sweep_metric, sweep_npz, sweep_values, time_grid,
+)
+from wavelab.background import (
+    BACKGROUND_ENABLED, BACKGROUND_SAMPLES, PREVIEW_SAMPLES, REFINE_POLL, BackgroundRunner, Cancelled,
+)
+from wavelab.figures import (
+    chart_layout_key, create_channel_figure, create_component_figure, create_filter_response_figure, create_plotly_chart, create_preview_figure, create_spectrogram_figure,
+    create_spectrum_figure, create_stream_figure, create_sweep_heatmap, create_sweep_metric_figure,
+    create_waterfall_figure, figure_payload_bytes, update_plotly_chart,
+)
+from wavelab.metrics import RECORDER, peak_memory, stage, start_run
+from wavelab.pipeline import OperationChain, Step, chain_filters, chain_label, evaluate_bank, param_display
+from wavelab.theme import stylesheet_loader
+from wavelab.workspace import COMPUTE_MODES, Workspace, generate_into, run_chain
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -10,330 +37,799 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+# Stage timings of this script run; fragment reruns record their own (see `timed`).
+script_timings = start_run("script")
 
 # --- SESSION STATE INITIALIZATION ---
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
 if 'custom_eq' not in st.session_state:
     st.session_state.custom_eq = "sin(2*pi*5*t) * exp(-2*t)"
+if 'extra_steps' not in st.session_state:
+    st.session_state.extra_steps = []   # ids of chained operations after the first
+    st.session_state.next_step_id = 1
+if 'channels' not in st.session_state:
+    # Rows of the Multi-channel table; the table editor gets a new key whenever its edits are applied.
+    st.session_state.channels = [c._asdict() for c in channel_preset(CHANNEL_PRESETS[0], 8)]
+    st.session_state.channels_version = 0
+if 'op_engine' not in st.session_state:
+    st.session_state.op_engine = OperationChain(shared_cache=SHARED_CACHE)
+if 'spectrum_cache' not in st.session_state:
+    st.session_state.spectrum_cache = SpectrumCache()
 
 # --- NAVIGATION HELPER ---
 def nav_to(page_name):
     st.session_state.page = page_name
 
-# --- THEME CONSTANTS ---
-NEON_DARK = {
-    "BG": "#101014",
-    "PANEL": "#181820",
-    "ACCENT": "#C9E819",     # Neon Lime
-    "TEXT": "#00FFFF",       # Cyan
-    "BTN": "#53C4F1",
-    "SIGNAL1": "#B4C6F5",    # Light Blue
-    "SIGNAL2": "#F9CC98",    # Light Orange
-    "RESULT": "#39FF14",     # Bright Green
-    "GRID": "#444455"
-}
-
 # --- CSS STYLING ---
-st.markdown((
+# Built once per process and sent once per session (wavelab.theme): the loader
+# leaves the stylesheet in the page head, so later reruns do not repeat it.
+if 'css_sent' not in st.session_state:
+    with stage("css"):
+        st.html(stylesheet_loader(), unsafe_allow_javascript=True)
+    st.session_state.css_sent = True
+
+# --- LOGIC FUNCTIONS ---
+
+def metric_tags():
+    """Tags attached to every timing record: page, operation chain, sample count and compute mode."""
+    ss = st.session_state
+    result = ss.get("viz_result")
+    operation = result["label"] if ss.page == 'home' and result is not None else ""
+    return {"page": ss.page, "operation": operation, "samples": ss.get("num_samples", ""), "compute": ss.get("compute_mode", "shared")}
+
+def timed(scope):
+    """Record each call of a fragment as its own timing run named `scope`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            timings = start_run(scope)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.finish(**metric_tags())
+        return run
+    return decorate
+
+def shared_grid(num_samples, stop=1.0):
+    """Time grid from the process-wide cache, so sessions at the same resolution share one array."""
+    return SHARED_CACHE.get_or_compute(("grid", num_samples, 0.0, float(stop)), lambda: time_grid(num_samples, 0.0, stop))
+
+def signal_or_error(sig_type, t, amp, freq, phase, source=None, expression=None, errors=None, cancelled=None):
+    """Generate (or reuse) a signal, collecting custom-equation errors in `errors` instead of raising.
+
+    Custom equations run in the sandbox pool, so a runaway equation cannot stall other sessions.
     """
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Pacifico&display=swap');
-    @import url('https://fonts.googleapis.com/css2?family=Montserrat:wght@400;600&display=swap');
-    @import url('https://fonts.googleapis.com/css2?family=Exo+2:wght@700&display=swap');
-
-    /* Global Font & Background */
-    .stApp {{
-        background-color: {bg};
-        color: {text};
-        font-family: 'Montserrat', sans-serif;
-    }}
-    
-    [data-testid="stSidebar"] {{
-        background-color: {panel};
-        border-right: 1px solid #333;
-    }}
-
-    /* --- SIDEBAR HEADER (NON-STICKY) --- */
-    .sidebar-title-container {{
-        text-align: center;
-        padding-bottom: 20px;
-        margin-bottom: 20px;
-        border-bottom: 1px solid {grid};
-    }}
-
-    /* Title Styles inside Sidebar */
-    .sidebar-custom-title {{
-        font-family: 'Exo 2', 'Pacifico', cursive, sans-serif;
-        font-size: 3rem;
-        background: linear-gradient(90deg, #A259FF 0%, #FF6F91 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        text-fill-color: transparent;
-        text-shadow: 0 4px 8px rgba(0,0,0,0.5);
-        line-height: 1.2;
-        margin: 0;
-    }}
-    @media (max-width: 600px) {{
-        .sidebar-custom-title {{
-            font-size: 2rem;
-        }}
-    }}
-    
-    /* Subtitle Styles inside Sidebar (CYAN) */
-    .sidebar-subtitle {{
-        font-family: 'Montserrat', sans-serif;
-        color: #00FFFF !important; /* Cyan */
-        font-size: 0.85rem;
-        font-weight: 400;
-        margin-top: 5px;
-        opacity: 1;
-    }}
-
-    /* --- SIDEBAR NAVIGATION BUTTONS STYLING --- */
-    [data-testid="stSidebar"] div.stButton > button {{
-        background-color: transparent;
-        border: 1px solid {accent};
-        color: {accent};
-        border-radius: 8px;
-        width: 100%;
-        text-align: left;
-        padding-left: 20px;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        margin-bottom: 5px;
-    }}
-    
-    [data-testid="stSidebar"] div.stButton > button:hover {{
-        background-color: {accent};
-        color: {bg};
-        border-color: {accent};
-        transform: translateX(5px);
-        box-shadow: 0 0 10px {accent};
-    }}
-    
-    /* Section Headers in Sidebar */
-    .sidebar-header {{
-        color: #888;
-        font-size: 0.8rem;
-        font-weight: bold;
-        letter-spacing: 1.5px;
-        margin-top: 20px;
-        margin-bottom: 10px;
-        text-transform: uppercase;
-    }}
-
-    /* Main Page Title Styles */
-    .custom-title {{
-        font-family: 'Exo 2', 'Pacifico', cursive, sans-serif;
-        font-size: 4rem;
-        background: linear-gradient(90deg, #A259FF 0%, #FF6F91 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        text-fill-color: transparent;
-        margin-bottom: -0.5rem;
-        text-shadow: 0 4px 8px rgba(0,0,0,0.5);
-    }}
-    @media (max-width: 600px) {{
-        .custom-title {{
-            font-size: 2.2rem;
-        }}
-    }}
-    .custom-subtitle {{
-        font-family: sans-serif;
-        color: {text};
-        opacity: 0.7;
-        font-size: 1.1rem;
-        margin-bottom: 2rem;
-    }}
-    
-    /* Profile Card */
-    .profile-card {{
-        background-color: {panel};
-        border: 1px solid {accent};
-        padding: 30px;
-        border-radius: 12px;
-        text-align: center;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.5);
-        margin-bottom: 20px;
-        transition: transform 0.2s;
-        min-height: 320px;
-        min-width: 240px;
-        max-width: 100%;
-        display: flex;
-        flex-direction: column;
-        justify-content: space-between;
-        flex: 1 1 0;
-    }}
-    .profile-card:hover {{
-        transform: scale(1.02);
-    }}
-    .profile-name {{
-        color: {accent};
-        font-family: 'Pacifico', cursive;
-        font-size: 2rem;
-        margin-bottom: 10px;
-    }}
-    .profile-role {{
-        color: {btn};
-        font-weight: bold;
-        font-size: 1.2rem;
-        margin-bottom: 5px;
-    }}
-    a {{
-        color: {btn};
-        text-decoration: none;
-        margin: 0 5px;
-    }}
-    
-    /* License Footer */
-    .license-container {{
-        margin-top: 50px;
-        padding-top: 20px;
-        border-top: 1px solid {grid};
-        text-align: center;
-        font-size: 0.8rem;
-        color: #888;
-    }}
-    
-    div.stButton > button {{
-        font-weight: bold;
-    }}
-    </style>
+    if expression is not None:
+        compute = lambda: evaluate_sandboxed(expression, t, cancelled)
+    else:
+        compute = lambda: generate_signal(sig_type, t, amp, freq, phase, expression, source)
+    try:
+        return SHARED_CACHE.get_or_compute(signal_key(sig_type, amp, freq, phase, t, expression, source), compute)
+    except ExpressionError as e:
+        errors.append(f"Custom equation error: {e}")
+        return np.zeros_like(t)
+
+def save_upload(upload):
+    """Copy an uploaded recording into RECORDINGS_DIR so it can be memory-mapped from disk.
+
+    The copy is written to a temporary file and renamed into place: other sessions may
+    still have the old file memory-mapped, and truncating it under them would crash the server.
     """
-    .format(
-        bg=NEON_DARK['BG'],
-        text=NEON_DARK['TEXT'],
-        panel=NEON_DARK['PANEL'],
-        accent=NEON_DARK['ACCENT'],
-        btn=NEON_DARK['BTN'],
-        grid=NEON_DARK['GRID']
-    )
-), unsafe_allow_html=True)
+    path = os.path.join(RECORDINGS_DIR, os.path.basename(upload.name))
+    if not os.path.exists(path) or os.path.getsize(path) != upload.size:
+        os.makedirs(RECORDINGS_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=RECORDINGS_DIR, prefix=".upload-", delete=False) as f:
+            try:
+                shutil.copyfileobj(upload, f, 1 << 20)
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.replace(f.name, path)
+    return os.path.basename(path)
 
-# --- LOGIC FUNCTIONS ---
+def read_recording(prefix, errors):
+    """The Recording selected under widget keys `prefix`_file / `prefix`_rate, or None (appending to `errors`)."""
+    ss = st.session_state
+    files = list_recordings()
+    name = ss.get(f"{prefix}_file")
+    if name not in files:
+        name = files[0] if files else None
+    if name is None:
+        errors.append(f"No recordings found; upload one or copy files into '{RECORDINGS_DIR}/'.")
+        return None
+    try:
+        return open_recording(os.path.join(RECORDINGS_DIR, name), ss.get(f"{prefix}_rate", 1000.0))
+    except (OSError, ValueError) as e:
+        errors.append(f"Could not read recording '{name}': {e}")
+        return None
+
+def read_channels(errors):
+    """The ChannelMix of the channel table; a silent channel (appending to `errors`) if the table is invalid."""
+    ss = st.session_state
+    try:
+        return ChannelMix(ss.channels, ss.get("channel_mix", MIX_MODES[0]))
+    except (TypeError, ValueError) as e:
+        errors.append(f"Invalid channels: {e}")
+        return ChannelMix([Channel(amp=0.0)])
+
+def apply_channel_edits():
+    """Channel table callback: fold the editor's edits into the table and start a fresh editor."""
+    ss = st.session_state
+    edits = ss.get(f"channel_editor_{ss.channels_version}") or {}
+    rows = [dict(row) for row in ss.channels]
+    for i, change in edits.get("edited_rows", {}).items():
+        rows[int(i)].update(change)
+    deleted = {int(i) for i in edits.get("deleted_rows", [])}
+    rows = [row for i, row in enumerate(rows) if i not in deleted]
+    defaults = Channel()._asdict()
+    rows += [{**defaults, **{k: v for k, v in row.items() if v is not None}} for row in edits.get("added_rows", [])]
+    ss.channels = rows[:MAX_CHANNELS]
+    ss.channels_version += 1
+    rerun_fragments(*ALL_FRAGMENTS)
+
+def load_channel_preset():
+    ss = st.session_state
+    ss.channels = [c._asdict() for c in channel_preset(ss.channel_preset, ss.channel_count, ss.channel_f0)]
+    ss.channels_version += 1
+    rerun_fragments(*ALL_FRAGMENTS)
 
-def evaluate_custom_signal(expression, t):
-    """Safely evaluates a user string as a numpy expression."""
-    allowed_names = {
-        "sin": np.sin, "cos": np.cos, "tan": np.tan,
-        "exp": np.exp, "sqrt": np.sqrt, "log": np.log,
-        "pi": np.pi, "np": np, "t": t, "abs": np.abs, 
-        "sign": np.sign, "heaviside": np.heaviside
+def view_range(*t_arrays):
+    """Absolute x-range selected by the zoom window slider, or None for the full extent."""
+    lo_frac, hi_frac = st.session_state.get("zoom_window", (0.0, 100.0))
+    if (lo_frac, hi_frac) == (0.0, 100.0):
+        return None
+    x_min = min(float(np.min(t[[0, -1]])) for t in t_arrays)
+    x_max = max(float(np.max(t[[0, -1]])) for t in t_arrays)
+    span = x_max - x_min
+    return (x_min + span * lo_frac / 100, x_min + span * hi_frac / 100)
+
+def plot_arrays(t, y, x_range):
+    """Decimate a full-resolution trace down to what the chart can show."""
+    return decimate(t, y, st.session_state.get("max_points", DEFAULT_MAX_POINTS), st.session_state.get("decimation", "minmax"), x_range)
+
+def rerun_fragments(*keys):
+    """Widget callback: rerun only the named visualizer fragments instead of the whole page."""
+    if st.session_state.page == 'home':
+        st.rerun(list(keys))
+
+def step_keys(sid):
+    """Widget keys for one step of the operation chain; sid None is the first step."""
+    sfx = "" if sid is None else f"_{sid}"
+    return {
+        "operation": f"operation{sfx}", "param": f"param{sfx}_",
+        "s2_type": f"s2_type{sfx}", "s2_amp": f"s2_amp{sfx}", "s2_freq": f"s2_freq{sfx}", "s2_phase": f"s2_phase{sfx}",
+        "s2_recording": f"s2{sfx}"
+    }
+
+def read_step(sid, errors):
+    ss = st.session_state
+    keys = step_keys(sid)
+    operation = ss.get(keys["operation"], next(iter(OPERATIONS)))
+    if needs_second_signal(operation):
+        s2_type = ss.get(keys["s2_type"], BASIC_SIGNALS[0])
+        if s2_type == RECORDED_SIGNAL:
+            recording = read_recording(keys["s2_recording"], errors)
+            signal2 = (s2_type, ss.get(keys["s2_amp"], 1.0), 1.0, 0.0, recording) if recording else ("Sine", 0.0, 1.0, 0.0)
+        else:
+            signal2 = (s2_type, ss.get(keys["s2_amp"], 1.0), ss.get(keys["s2_freq"], 1.0), ss.get(keys["s2_phase"], 0.0))
+        return Step(operation, 1.0, signal2)
+    if operation in OPERATION_PARAMS:
+        return Step(operation, ss.get(keys["param"] + operation, OPERATION_PARAMS[operation][3]))
+    return Step(operation)
+
+def read_controls():
+    """Control Panel values from widget state, so every fragment sees the same parameters."""
+    ss = st.session_state
+    errors = []
+    controls = {
+        "s1_type": ss.get("s1_type", SIGNAL_TYPES[0]),
+        "s1_amp": ss.get("s1_amp", 1.0), "s1_freq": ss.get("s1_freq", 1.0), "s1_phase": ss.get("s1_phase", 0.0),
+        "s1_source": None, "s1_channels": None,
+        "steps": tuple(read_step(sid, errors) for sid in [None] + ss.extra_steps),
+        "errors": errors,
     }
+    if controls["s1_type"] == CUSTOM_SIGNAL:
+        controls.update(s1_amp=1.0, s1_freq=1.0, s1_phase=0.0)
+    elif controls["s1_type"] == RECORDED_SIGNAL:
+        recording = read_recording("s1", errors)
+        if recording is None:
+            # Silent until a recording can be read, like Signal 2.
+            controls.update(s1_type="Sine", s1_amp=0.0, s1_freq=1.0, s1_phase=0.0)
+        else:
+            controls.update(s1_freq=1.0, s1_phase=0.0, s1_source=recording)
+    elif controls["s1_type"] == MULTICHANNEL_SIGNAL:
+        controls.update(s1_freq=1.0, s1_phase=0.0, s1_channels=read_channels(errors))
+    return controls
+
+def signal_source(controls):
+    """What Signal 1 is generated from: its Recording, its ChannelMix or None."""
+    return controls["s1_channels"] if controls["s1_type"] == MULTICHANNEL_SIGNAL else controls["s1_source"]
+
+def session_workspace(mode):
+    """This session's Workspace for compute mode `mode`, or None on the shared path."""
+    if mode == "shared":
+        st.session_state.pop("workspace", None)
+        return None
+    ws = st.session_state.get("workspace")
+    if ws is None or ws.dtype != np.dtype(mode):
+        ws = st.session_state.workspace = Workspace(mode)
+    return ws
+
+def workspace_signal(ws, controls, t, expression, errors, cancelled=None):
+    """Signal 1 generated into the workspace, collecting custom-equation errors in `errors`."""
+    n = len(t)
+    out = ws.buffer("s1", n)
+    scratch = ws.buffer("s1_scratch", n) if controls["s1_type"] == "Sawtooth" else None
     try:
-        result = eval(expression, {"__builtins__": None}, allowed_names)
-        if np.isscalar(result):
-            result = np.full_like(t, result)
-        return result
-    except Exception as e:
-        return np.zeros_like(t)
+        return generate_into(
+            controls["s1_type"], t, controls["s1_amp"], controls["s1_freq"], controls["s1_phase"], out, scratch,
+            expression, signal_source(controls), functools.partial(evaluate_sandboxed, cancelled=cancelled)
+        )
+    except ExpressionError as e:
+        errors.append(f"Custom equation error: {e}")
+        out.fill(0)
+        return out
 
-def generate_signal(sig_type, t, amp, freq, phase):
-    if sig_type == "Custom User Signal":
-        return evaluate_custom_signal(st.session_state.custom_eq, t)
-
-    phase_rad = np.deg2rad(phase)
-    with np.errstate(divide='ignore', invalid='ignore'):
-        if sig_type == "Sine":
-            return amp * np.sin(2 * np.pi * freq * t + phase_rad)
-        elif sig_type == "Square":
-            return amp * np.sign(np.sin(2 * np.pi * freq * t + phase_rad))
-        elif sig_type == "Sawtooth":
-            return amp * (2 * (freq * t - np.floor(0.5 + freq * t)))
-        elif sig_type == "Step":
-            return amp * np.heaviside(t, 1)
-        elif sig_type == "Impulse":
-            arr = np.zeros_like(t)
-            idx = np.abs(t).argmin()
-            arr[idx] = amp
-            return arr
-        elif sig_type == "Ramp":
-            return amp * t
-    return np.zeros_like(t)
-
-# --- OPERATION THEORY ---
-OPERATION_THEORY = {
-    "Time Scaling": """
-    **Time Scaling Theory:**
-    Time scaling modifies the "speed" of a signal. Given x(t), the scaled signal is x(at):
-    - If a > 1: Signal plays faster (compressed in time)
-    - If 0 < a < 1: Signal plays slower (stretched in time)
-    """,
-    "Amplitude Scaling": """
-    **Amplitude Scaling Theory:**
-    Amplitude scaling changes the "height" of a signal. Given x(t), the scaled signal is A·x(t):
-    - Multiplying by A changes the peak amplitude.
-    """,
-    "Time Shifting": """
-    **Time Shifting Theory:**
-    Time shifting delays or advances a signal. Given x(t), the shifted signal is x(t - t₀):
-    - If t₀ > 0: Signal is delayed (shifted right)
-    - If t₀ < 0: Signal is advanced (shifted left)
-    """,
-    "Time Reversal": """
-    **Time Reversal Theory:**
-    Time reversal flips the signal about t = 0. Given x(t), the reversed signal is x(-t).
-    """,
-    "Signal Addition": """
-    **Signal Addition Theory:**
-    Adding two signals produces their superposition: y(t) = x₁(t) + x₂(t).
-    """,
-    "Signal Multiplication": """
-    **Signal Multiplication Theory:**
-    Multiplying two signals produces modulation: y(t) = x₁(t) · x₂(t).
+def visualizer_keys(t_input, controls):
+    """(source key, result key) of the current controls."""
+    recording = controls["s1_source"]
+    expression = st.session_state.custom_eq if controls["s1_type"] == CUSTOM_SIGNAL else None
+    mode = st.session_state.get("compute_mode", "shared")
+    source_key = (mode, len(t_input), controls["s1_type"], controls["s1_amp"], controls["s1_freq"], controls["s1_phase"], expression_key(expression), recording,
+                  controls["s1_channels"])
+    return source_key, (source_key, controls["steps"])
+
+def visualizer_job(t_input, controls):
+    """The computation of the full result as `compute(job)`, safe to run off the script thread.
+
+    Everything it needs from the session is read here, in the script thread;
+    the job itself never touches Streamlit. It checks for cancellation
+    between generation and every operation step.
     """
-}
-
-def add_watermark(fig, text="MyWavelab"):
-    """Add a faint centered watermark to a Plotly figure."""
-    fig.add_annotation(
-        text=text,
-        x=0.5,
-        y=0.5,
-        xref="paper",
-        yref="paper",
-        showarrow=False,
-        font=dict(size=50, color="rgba(255,255,255,0.08)", family="Montserrat, sans-serif"),
-        align="center"
+    ss = st.session_state
+    mode = ss.get("compute_mode", "shared")
+    source_key, key = visualizer_keys(t_input, controls)
+    recording = controls["s1_source"]
+    expression = ss.custom_eq if controls["s1_type"] == CUSTOM_SIGNAL else None
+    ws = session_workspace(mode)
+    engine = ss.op_engine
+    # Signal 1 of the last generation; jobs run one at a time, so it always describes the workspace buffers.
+    source = ss.setdefault("viz_source", {})
+    measure = ss.get("perf_panel")
+    tags = metric_tags()
+
+    def compute(job):
+        timings = start_run("compute")
+        errors = []
+        try:
+            # tracemalloc slows every allocation in the process, so peaks are only measured for the performance panel.
+            with peak_memory() if measure else contextlib.nullcontext({}) as peak:
+                start = time.perf_counter()
+                if source.get("key") != source_key:
+                    # A recording replaces the unit time axis with its own duration, at the same sample count.
+                    stop = 1.0 if recording is None else recording.duration
+                    source.clear()
+                    with stage("generate"):
+                        if ws is None:
+                            t_grid = t_input if recording is None else shared_grid(len(t_input), stop)
+                            s1 = signal_or_error(controls["s1_type"], t_grid, controls["s1_amp"], controls["s1_freq"], controls["s1_phase"],
+                                                 signal_source(controls), expression, errors, lambda: job.cancelled)
+                        else:
+                            t_grid = ws.grid(len(t_input), 0.0, stop)
+                            s1 = workspace_signal(ws, controls, t_grid, expression, errors, lambda: job.cancelled)
+                    job.check()
+                    source.update(key=source_key, t=t_grid, s1=s1, errors=errors)
+                t_grid, s1_generated = source["t"], source["s1"]
+                errors = source["errors"]
+
+                with stage("operation"):
+                    if ws is None:
+                        def evaluate():
+                            t_out, y_out = engine.evaluate(t_grid, s1_generated, controls["steps"], source_key, job.check)
+                            s2_list = engine.second_signals(source_key, controls["steps"])
+                            return (t_out, y_out, tuple(engine.run_info(source_key, controls["steps"])), *(s2_list[0] if s2_list else (None, None)))
+
+                        # Results are shared across sessions; this session's engine only runs on a miss.
+                        processed_key = ("processed", source_key, controls["steps"])
+                        t_processed, s_processed, run_info, t_s2, s2 = SHARED_CACHE.get_or_compute(processed_key, evaluate)
+                    else:
+                        # Buffers are overwritten in place: nothing is allocated at an unchanged resolution.
+                        t_processed, s_processed, s2_list, run_info = run_chain(ws, t_grid, s1_generated, controls["steps"], check=job.check)
+                        t_s2, s2 = s2_list[0] if s2_list else (None, None)
+                seconds = time.perf_counter() - start
+        finally:
+            timings.finish(**tags)
+        return {
+            "key": key, "t": t_grid, "s1": s1_generated, "t_s2": t_s2, "s2": s2,
+            "s1_recording": recording, "s1_channels": controls["s1_channels"], "s1_amp": controls["s1_amp"], "run_info": run_info,
+            "t_processed": t_processed, "s_processed": s_processed, "errors": errors, "preview": False,
+            "label": chain_label(controls["steps"]), "p_val_display": param_display(controls["steps"]),
+            "stats": {
+                "mode": mode, "samples": len(t_grid), "compute_ms": seconds * 1e3,
+                "peak_mb": peak["peak_bytes"] / 2**20 if "peak_bytes" in peak else None,
+                "workspace_mb": ws.nbytes / 2**20 if ws is not None else 0.0,
+            },
+        }
+
+    return compute
+
+def adopt_result(result):
+    """Make a finished result the session's current one."""
+    st.session_state.setdefault("compute_stats", {})[result["stats"]["mode"]] = result["stats"]
+    st.session_state.viz_result = result
+    return result
+
+def preview_result(t_input, controls, key):
+    """The result at PREVIEW_SAMPLES samples, computed in the script thread while the full one runs."""
+    cached = st.session_state.get("viz_preview")
+    if cached is not None and cached["key"] == key:
+        return cached
+    recording = controls["s1_source"]
+    expression = st.session_state.custom_eq if controls["s1_type"] == CUSTOM_SIGNAL else None
+    errors = []
+    with stage("preview"):
+        t = shared_grid(PREVIEW_SAMPLES, 1.0 if recording is None else recording.duration)
+        s1 = signal_or_error(controls["s1_type"], t, controls["s1_amp"], controls["s1_freq"], controls["s1_phase"], signal_source(controls), expression, errors)
+        # A throwaway chain: the session's engine may be busy in the background job.
+        chain = OperationChain(shared_cache=SHARED_CACHE)
+        t_processed, s_processed = chain.evaluate(t, s1, controls["steps"])
+        s2_list = chain.second_signals(None, controls["steps"])
+    t_s2, s2 = s2_list[0] if s2_list else (None, None)
+    result = {
+        "key": key, "t": t, "s1": s1, "t_s2": t_s2, "s2": s2,
+        "s1_recording": recording, "s1_channels": controls["s1_channels"], "s1_amp": controls["s1_amp"], "run_info": (),
+        "t_processed": t_processed, "s_processed": s_processed, "errors": errors, "preview": True,
+        "label": chain_label(controls["steps"]), "p_val_display": param_display(controls["steps"]),
+    }
+    st.session_state.viz_preview = result
+    return result
+
+def visualizer_result(t_input, controls):
+    """(result, job) for the current controls, shared by the chart, component and spectrum fragments.
+
+    Small results are computed right away and job is None. Larger ones are
+    computed by the session's BackgroundRunner: until they are ready, result
+    is a coarse preview and job the background computation (see `refine`).
+    Submitting new controls cancels the job for the old ones.
+    """
+    ss = st.session_state
+    _, key = visualizer_keys(t_input, controls)
+    cached = ss.get("viz_result")
+    if cached is not None and cached["key"] == key:
+        return cached, None
+    if "background" not in ss:
+        ss.background = BackgroundRunner()
+    runner = ss.background
+    compute = visualizer_job(t_input, controls)
+    if ss.get("compute_mode", "shared") != "shared":
+        # The job writes into the workspace buffers that the current result points at.
+        ss.pop("viz_result", None)
+    if not BACKGROUND_ENABLED or len(t_input) < BACKGROUND_SAMPLES:
+        return adopt_result(runner.run(key, compute)), None
+    job = runner.submit(key, compute)
+    if job.done():
+        try:
+            return adopt_result(job.result()), None
+        except Cancelled:
+            pass
+    return preview_result(t_input, controls, key), job
+
+def show_result(t_input, controls, render):
+    """Draw `render(result)` for the current controls; a preview is redrawn in place once the full result is ready.
+
+    While the job runs, a status line is rewritten every REFINE_POLL seconds.
+    That is also where Streamlit stops this run when newer input arrives; the
+    next run cancels the job if the controls changed.
+    """
+    result, job = visualizer_result(t_input, controls)
+    slot = st.empty()
+    with slot.container():
+        render(result)
+    if job is None:
+        return
+    status = st.empty()
+    while not job.wait(REFINE_POLL):
+        status.caption(f"Preview at {PREVIEW_SAMPLES:,} samples · computing {len(t_input):,}… {time.perf_counter() - job.submitted:.1f} s")
+    status.empty()
+    try:
+        result = adopt_result(job.result())
+    except Cancelled:
+        return
+    with slot.container():
+        render(result)
+
+def plot_traces(result):
+    """Decimated (t, y) pairs for Signal 1, Signal 2 and the result, plus the zoom range.
+
+    A recorded Signal 1 is drawn from its min/max overview, so peaks between
+    grid samples stay visible however long the file is.
+    """
+    t = result["t"]
+    x_range = view_range(*(axis for axis in (t, result["t_s2"], result["t_processed"]) if axis is not None))
+    recording = result["s1_recording"]
+    with stage("decimate"):
+        if recording is not None:
+            t_env, y_env = recording.envelope(x_range, st.session_state.get("max_points", DEFAULT_MAX_POINTS))
+            s1_trace = (t_env, result["s1_amp"] * y_env)
+        else:
+            s1_trace = plot_arrays(t, result["s1"], x_range)
+        return (
+            s1_trace,
+            plot_arrays(result["t_s2"], result["s2"], x_range),
+            plot_arrays(result["t_processed"], result["s_processed"], x_range),
+            x_range,
+        )
+
+# --- VISUALIZER FRAGMENTS ---
+# Each part of the visualizer reruns on its own. Control Panel callbacks name the
+# fragments that depend on the changed widget, so a slider drag never re-sends
+# the CSS, header or footer, and the chart figure is patched rather than rebuilt.
+CHART_FRAGMENTS = ("chart", "components", "spectrum")
+COMPUTE_MODE_LABELS = {"shared": "Shared (float64)", "float64": "Workspace (float64)", "float32": "Workspace (float32)"}
+ALL_FRAGMENTS = ("controls", "chart", "components", "spectrum", "theory")
+
+def recording_controls(prefix, sfx=""):
+    """File picker for a Recorded File source; uploads are saved to disk and memory-mapped from there."""
+    upload = st.file_uploader("Upload recording" + sfx, type=[ext[1:] for ext in RECORDING_FORMATS], key=f"{prefix}_upload", on_change=rerun_fragments, args=ALL_FRAGMENTS)
+    if upload is not None:
+        save_upload(upload)
+    files = list_recordings()
+    if not files:
+        st.caption(f"No recordings yet. Upload a WAV, NPY or CSV file, or copy one into `{RECORDINGS_DIR}/`.")
+        return
+    name = st.selectbox("Recording" + sfx, files, key=f"{prefix}_file", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+    if not name.lower().endswith(".wav"):
+        st.number_input("Sample Rate (Hz)" + sfx, 1.0, 1e9, 1000.0, key=f"{prefix}_rate", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+
+def channel_controls():
+    """Channel table of a Multi-channel Signal 1, and presets that fill it."""
+    ss = st.session_state
+    st.selectbox("Mix", MIX_MODES, key="channel_mix", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+    with st.expander("Presets"):
+        st.selectbox("Preset", CHANNEL_PRESETS, key="channel_preset")
+        st.slider("Components", 1, MAX_CHANNELS, 8, key="channel_count")
+        st.slider("Fundamental (Hz)", 0.1, 20.0, 1.0, 0.1, key="channel_f0")
+        st.button("Load preset", on_click=load_channel_preset, width="stretch")
+    st.data_editor(
+        ss.channels, key=f"channel_editor_{ss.channels_version}", num_rows="dynamic", hide_index=True,
+        on_change=apply_channel_edits, width="stretch",
+        column_config={
+            "signal": st.column_config.SelectboxColumn("Signal", options=CHANNEL_SIGNALS, required=True, default="Sine"),
+            "amp": st.column_config.NumberColumn("Amp", min_value=-5.0, max_value=5.0, default=1.0, format="%.3f"),
+            "freq": st.column_config.NumberColumn("Freq (Hz)", min_value=0.0, max_value=1000.0, default=1.0, format="%.3g"),
+            "phase": st.column_config.NumberColumn("Phase (°)", min_value=-180.0, max_value=180.0, default=0.0, format="%.0f"),
+            "shift": st.column_config.NumberColumn("Shift (s)", min_value=-5.0, max_value=5.0, default=0.0, format="%.3g"),
+        },
     )
+    st.caption(f"{len(ss.channels)} of up to {MAX_CHANNELS} channels")
 
-def create_plotly_chart(t_s1, y_s1, t_s2, y_s2, t_proc, y_proc, op_name, is_discrete, param_val):
-    fig = go.Figure()
-    hover_temp = "<b>%{text}</b><br>Time: %{x:.2f}<br>Amp: %{y:.2f}<extra></extra>"
-    
-    # 1. Signal 1
-    if is_discrete:
-        fig.add_trace(go.Bar(x=t_s1, y=y_s1, name="Signal 1", marker_color=NEON_DARK['SIGNAL1'], text=["Signal 1"] * len(t_s1), hovertemplate=hover_temp))
-    else:
-        fig.add_trace(go.Scatter(x=t_s1, y=y_s1, name="Signal 1", mode='lines', line=dict(color=NEON_DARK['SIGNAL1'], width=2), text=["Signal 1"] * len(t_s1), hovertemplate=hover_temp))
+def operation_controls(sid, operation):
+    """Parameter widgets for one step of the operation chain."""
+    keys = step_keys(sid)
+    sfx = "" if sid is None else f" #{sid}"
+    if needs_second_signal(operation):
+        st.markdown("<div class='sidebar-header'>Signal 2</div>", unsafe_allow_html=True)
+        s2_type = st.selectbox("Type" + sfx, BASIC_SIGNALS + [RECORDED_SIGNAL], key=keys["s2_type"], on_change=rerun_fragments, args=ALL_FRAGMENTS)
+        st.slider("Amp (S2)" + sfx, 0.1, 5.0, 1.0, 0.1, key=keys["s2_amp"], on_change=rerun_fragments, args=CHART_FRAGMENTS)
+        if s2_type == RECORDED_SIGNAL:
+            recording_controls(keys["s2_recording"], sfx)
+            return
+        st.slider("Freq (S2)" + sfx, 0.1, 20.0, 1.0, 0.5, key=keys["s2_freq"], on_change=rerun_fragments, args=CHART_FRAGMENTS)
+        st.slider("Phase (S2)" + sfx, -180.0, 180.0, 0.0, 10.0, key=keys["s2_phase"], on_change=rerun_fragments, args=CHART_FRAGMENTS)
+    elif operation in OPERATION_PARAMS:
+        label, lo, hi, default, step = OPERATION_PARAMS[operation]
+        st.slider(label + sfx, lo, hi, default, step, key=keys["param"] + operation, on_change=rerun_fragments, args=CHART_FRAGMENTS)
 
-    # 2. Signal 2
-    if y_s2 is not None:
-        if is_discrete:
-            fig.add_trace(go.Bar(x=t_s2, y=y_s2, name="Signal 2", marker_color=NEON_DARK['SIGNAL2'], text=["Signal 2"] * len(t_s2), hovertemplate=hover_temp))
+def add_step():
+    st.session_state.extra_steps = st.session_state.extra_steps + [st.session_state.next_step_id]
+    st.session_state.next_step_id += 1
+    rerun_fragments(*ALL_FRAGMENTS)
+
+def remove_step(sid):
+    st.session_state.extra_steps = [s for s in st.session_state.extra_steps if s != sid]
+    rerun_fragments(*ALL_FRAGMENTS)
+
+@st.fragment(key="controls")
+@timed("controls")
+def control_panel():
+    with st.sidebar:
+        st.write(" **Signal 1**")
+        s1_type = st.selectbox("Signal Type", SIGNAL_TYPES + [RECORDED_SIGNAL, MULTICHANNEL_SIGNAL], key="s1_type", label_visibility="collapsed", on_change=rerun_fragments, args=ALL_FRAGMENTS)
+        
+        if s1_type == CUSTOM_SIGNAL:
+            st.caption("Using equation from Custom Input.")
+        elif s1_type == RECORDED_SIGNAL:
+            st.slider("Amplitude", 0.1, 5.0, 1.0, 0.1, key="s1_amp", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+            recording_controls("s1")
+        elif s1_type == MULTICHANNEL_SIGNAL:
+            st.slider("Amplitude", 0.1, 5.0, 1.0, 0.1, key="s1_amp", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+            channel_controls()
         else:
-            fig.add_trace(go.Scatter(x=t_s2, y=y_s2, name="Signal 2", mode='lines', line=dict(color=NEON_DARK['SIGNAL2'], width=2, dash='dash'), text=["Signal 2"] * len(t_s2), hovertemplate=hover_temp))
+            st.slider("Amplitude", 0.1, 5.0, 1.0, 0.1, key="s1_amp", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+            st.slider("Freq (Hz)", 0.1, 20.0, 1.0, 0.5, key="s1_freq", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+            st.slider("Phase (°)", -180.0, 180.0, 0.0, 10.0, key="s1_phase", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+
+        st.divider()
+        st.write(" **Operation**")
+        operation = st.selectbox("Select Operation", list(OPERATIONS.keys()), key=step_keys(None)["operation"], label_visibility="collapsed", on_change=rerun_fragments, args=ALL_FRAGMENTS)
+        st.latex(OPERATIONS[operation])
+
+        operation_controls(None, operation)
 
-    # 3. Processed
-    label_proc = "Processed"
-    if is_discrete:
-        fig.add_trace(go.Bar(x=t_proc, y=y_proc, name=label_proc, marker_color=NEON_DARK['RESULT'], opacity=0.8, text=[label_proc] * len(t_proc), hovertemplate=hover_temp))
+        for n, sid in enumerate(st.session_state.extra_steps, start=2):
+            st.divider()
+            col_op, col_rm = st.columns([5, 1])
+            with col_op:
+                st.write(f" **Operation {n}**")
+            with col_rm:
+                st.button("✕", key=f"remove_step_{sid}", help="Remove this operation", on_click=remove_step, args=(sid,))
+            keys = step_keys(sid)
+            operation = st.selectbox("Select Operation", list(OPERATIONS.keys()), key=keys["operation"], label_visibility="collapsed", on_change=rerun_fragments, args=ALL_FRAGMENTS)
+            st.latex(OPERATIONS[operation])
+            operation_controls(sid, operation)
+
+        st.button("➕ Add Operation", key="add_step", on_click=add_step, width="stretch")
+
+def draw_main_chart(result, t_input, is_discrete, high_res):
+    for message in result["errors"]:
+        st.error(message)
+    (t_s1_plot, s1_plot), (t_s2_plot, s2_plot), (t_proc_plot, proc_plot), x_range = plot_traces(result)
+
+    layout_key = chart_layout_key(s2_plot, is_discrete, (s1_plot, s2_plot, proc_plot))
+    fig = st.session_state.get("main_fig")
+    with stage("figure"):
+        if fig is None or st.session_state.get("main_fig_layout") != layout_key:
+            fig = create_plotly_chart(
+                t_s1_plot, s1_plot, 
+                t_s2_plot, s2_plot, 
+                t_proc_plot, proc_plot, 
+                result["label"], is_discrete, result["p_val_display"]
+            )
+            st.session_state.main_fig = fig
+            st.session_state.main_fig_layout = layout_key
+        else:
+            update_plotly_chart(fig, t_s1_plot, s1_plot, t_s2_plot, s2_plot, t_proc_plot, proc_plot, result["label"], result["p_val_display"], is_discrete)
+        if x_range is not None:
+            fig.update_xaxes(range=x_range)
+    with stage("plotly_chart"):
+        # The preview and the refined chart share one run, so only the refined one takes the key.
+        st.plotly_chart(fig, width="stretch", key=None if result["preview"] else "main_chart")
+    for info in result["run_info"]:
+        st.caption(f"{info['operation']}: {info['method']} method for {info['n']:,} × {info['m']:,} samples, {info['seconds'] * 1e3:.2f} ms")
+    recording = result["s1_recording"]
+    if recording is not None:
+        st.caption(
+            f"{recording.name}: {len(recording):,} samples @ {recording.sample_rate:g} Hz ({recording.duration:.2f} s), "
+            f"operations computed on {len(t_input):,} grid samples"
+        )
+    mix = result["s1_channels"]
+    if mix is not None:
+        st.caption(f"Signal 1 mixes {mix.describe()}; operations act on the mix, and the component plots can show every channel processed")
+    if high_res:
+        st.caption(f"Figure payload: {figure_payload_bytes(fig) / 1024:.1f} KB")
+
+@st.fragment(key="chart")
+@timed("chart")
+def main_chart(t_input, is_discrete, high_res):
+    controls = read_controls()
+    for message in controls["errors"]:
+        st.error(message)
+    show_result(t_input, controls, functools.partial(draw_main_chart, t_input=t_input, is_discrete=is_discrete, high_res=high_res))
+
+@st.fragment(key="theory")
+@timed("theory")
+def theory_text():
+    shown = set()
+    for step in read_controls()["steps"]:
+        if step.operation in OPERATION_THEORY and step.operation not in shown:
+            shown.add(step.operation)
+            st.markdown(OPERATION_THEORY[step.operation])
+
+@st.fragment(key="components")
+@timed("components")
+def component_plots(t_input, is_discrete):
+    if not st.session_state.get("components_open"):
+        return
+    controls = read_controls()
+    channel_view = None
+    if controls["s1_channels"] is not None:
+        channel_view = st.radio("Channels", ["Input", "Processed"], horizontal=True, key="channel_view",
+                                help="Processed runs the operation chain on every channel at once.")
+    show_result(t_input, controls, functools.partial(draw_components, is_discrete=is_discrete, channel_view=channel_view))
+
+# Samples of the channel stack generated per draw, over all channels.
+CHANNEL_PLOT_SAMPLES = 1 << 22
+
+def draw_channels(result, processed=False):
+    """Every channel of a Multi-channel Signal 1, stacked, as generated or after the operation chain.
+
+    Input channels are regenerated for the visible window only. Processed ones
+    are generated over the whole axis and run through the chain as one
+    (channels, n) bank, at most CHANNEL_PLOT_SAMPLES samples over all channels.
+    """
+    mix = result["s1_channels"]
+    t = result["t"]
+    k = len(mix.channels)
+    samples = min(len(t), max(2, CHANNEL_PLOT_SAMPLES // k))
+    if processed:
+        x_range = view_range(t, result["t_processed"])
+        with stage("generate"):
+            t_grid = time_grid(samples, float(t[0]), float(t[-1]))
+            bank = mix.generate(t_grid)
+        with stage("operation"):
+            t_grid, bank = evaluate_bank(t_grid, bank, result["key"][1])
     else:
-        fig.add_trace(go.Scatter(x=t_proc, y=y_proc, name=label_proc, mode='lines', line=dict(color=NEON_DARK['RESULT'], width=4), text=[label_proc] * len(t_proc), hovertemplate=hover_temp))
-
-    fig.update_layout(
-        title=dict(text=f"Operation: {op_name} (Param: {param_val:.2f})" if param_val else op_name, font=dict(color=NEON_DARK['ACCENT'], size=20)),
-        paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
-        xaxis=dict(title="Time (s)", showgrid=True, gridcolor=NEON_DARK['GRID'], zerolinecolor=NEON_DARK['ACCENT']),
-        yaxis=dict(title="Amplitude", showgrid=True, gridcolor=NEON_DARK['GRID'], zerolinecolor=NEON_DARK['ACCENT']),
-        legend=dict(bgcolor=NEON_DARK['BG'], bordercolor=NEON_DARK['ACCENT'], borderwidth=1),
-        hovermode="x unified", dragmode="zoom", height=500, margin=dict(l=40, r=40, t=60, b=40)
-    )
-    add_watermark(fig)
-    return fig
+        x_range = view_range(t)
+        lo, hi = x_range if x_range is not None else (float(t[0]), float(t[-1]))
+        with stage("generate"):
+            t_grid = time_grid(samples, lo, hi)
+            bank = mix.generate(t_grid)
+    with stage("decimate"):
+        # Keep the whole stack near the payload of one full-resolution trace.
+        max_points = max(250, 8 * st.session_state.get("max_points", DEFAULT_MAX_POINTS) // k)
+        t_plot, bank_plot = decimate_channels(t_grid, bank, max_points, x_range if processed else None)
+    with stage("figure"):
+        labels = [f"{i + 1}. {c.signal} {c.freq:g} Hz" for i, c in enumerate(mix.channels)]
+        fig = create_channel_figure(t_plot, bank_plot, labels)
+    with stage("plotly_chart"):
+        st.plotly_chart(fig, width="stretch", key=None if result["preview"] else "channel_chart")
+
+def draw_components(result, is_discrete, channel_view=None):
+    if result["s1_channels"] is not None:
+        draw_channels(result, processed=channel_view == "Processed")
+    (t_s1_plot, s1_plot), (t_s2_plot, s2_plot), (t_proc_plot, proc_plot), _ = plot_traces(result)
+    with stage("figure"):
+        fig2 = create_component_figure(t_s1_plot, s1_plot, t_s2_plot, s2_plot, t_proc_plot, proc_plot, is_discrete)
+    with stage("plotly_chart"):
+        st.plotly_chart(fig2, width="stretch", key=None if result["preview"] else "component_chart")
+
+def spectrum_signals(result):
+    """(label, color, cache key, t, y) for every signal in the result.
+
+    Cache keys cover only what each signal depends on, so editing a later
+    step does not re-transform Signal 1 or Signal 2.
+    """
+    source_key, steps = result["key"]
+    t = result["t"]
+    preview = result["preview"]
+    signals = [("Signal 1", NEON_DARK['SIGNAL1'], ("s1", source_key, preview), t, result["s1"])]
+    if result["s2"] is not None:
+        spec = next(step.signal2 for step in steps if step.signal2 is not None)
+        t_s2 = result["t_s2"]
+        signals.append(("Signal 2", NEON_DARK['SIGNAL2'], ("s2", source_key[0], len(t_s2), float(t_s2[0]), float(t_s2[-1]), spec), t_s2, result["s2"]))
+    signals.append(("Processed", NEON_DARK['RESULT'], ("processed", result["key"], preview), result["t_processed"], result["s_processed"]))
+    return signals
+
+def filter_size(filt):
+    return f"{len(filt.taps):,} taps" if filt.taps is not None else f"{len(filt.sos)} biquads"
+
+@st.fragment(key="spectrum")
+@timed("spectrum")
+def spectrum_view(t_input):
+    if not st.session_state.get("spectrum_open"):
+        return
+    controls = read_controls()
+    views = ["Magnitude", "Phase", "Spectrogram"]
+    if any(step.operation in FILTER_OPERATIONS for step in controls["steps"]):
+        views.append("Filter Response")
+    col_view, col_win, col_seg = st.columns([2, 1, 1])
+    with col_view:
+        view = st.radio("View", views, horizontal=True, key="spectrum_view")
+    with col_win:
+        window = st.selectbox("Window", SPECTRUM_WINDOWS, key="spectrum_window")
+    if view == "Filter Response":
+        recording = controls["s1_source"]
+        t_axis = shared_grid(len(t_input), 1.0 if recording is None else recording.duration)
+        colors = [NEON_DARK['RESULT'], NEON_DARK['ACCENT'], NEON_DARK['SIGNAL2'], NEON_DARK['SIGNAL1']]
+        with stage("spectrum"):
+            filters = chain_filters(t_axis, controls["steps"])
+            traces = [(f"{i + 1}. {filt.name}", colors[n % len(colors)], *filt.response()) for n, (i, filt) in enumerate(filters)]
+        with stage("figure"):
+            fig = create_filter_response_figure(traces)
+        with stage("plotly_chart"):
+            st.plotly_chart(fig, width="stretch", key="filter_response_chart")
+        st.caption(" · ".join(f"{i + 1}. {filter_size(filt)} at {filt.sample_rate:,.4g} Hz" for i, filt in filters))
+        return
+    if view == "Spectrogram":
+        with col_seg:
+            nperseg = st.select_slider("Segment", SEGMENT_LENGTHS, value=64, key="spectrum_nperseg")
+        label = st.radio("Signal", ["Signal 1"] + (["Signal 2"] if any(step.signal2 is not None for step in controls["steps"]) else []) + ["Processed"],
+                         horizontal=True, key="spectrogram_signal")
+        render = functools.partial(draw_spectrogram, window=window, nperseg=nperseg, label=label)
+    else:
+        render = functools.partial(draw_spectrum, window=window, view=view)
+    show_result(t_input, controls, render)
+
+def draw_spectrogram(result, window, nperseg, label):
+    cache = st.session_state.spectrum_cache
+    _, _, key, t, y = next(sig for sig in spectrum_signals(result) if sig[0] == label)
+    with stage("spectrum"):
+        times, freqs, power_db = cache.spectrogram(key, t, y, window, nperseg)
+    with stage("figure"):
+        fig = create_spectrogram_figure(times, freqs, power_db, label)
+    with stage("plotly_chart"):
+        st.plotly_chart(fig, width="stretch", key=None if result["preview"] else "spectrogram_chart")
+    st.caption(f"{len(times):,} frames × {len(freqs):,} bins · Δf = {freqs[1] - freqs[0]:.3g} Hz")
+
+def draw_spectrum(result, window, view):
+    cache = st.session_state.spectrum_cache
+    traces = []
+    for label, color, key, t, y in spectrum_signals(result):
+        with stage("spectrum"):
+            freqs, magnitude, phase = cache.spectrum(key, t, y, window)
+        with stage("decimate"):
+            f_plot, v_plot = plot_arrays(freqs, phase if view == "Phase" else magnitude, None)
+        traces.append((label, color, f_plot, v_plot))
+    with stage("figure"):
+        fig = create_spectrum_figure(traces, view)
+    with stage("plotly_chart"):
+        st.plotly_chart(fig, width="stretch", key=None if result["preview"] else "spectrum_chart")
+    st.caption(f"{len(result['t']):,}-point rFFT · {window} window · cache hits {cache.hits}, misses {cache.misses}")
+
+def performance_panel():
+    """Stage percentiles of recent runs (all sessions) with metrics downloads."""
+    with st.expander("⏱ Performance", expanded=True):
+        col_page, col_mode = st.columns(2)
+        with col_page:
+            this_page = st.checkbox("This page only", value=True, key="perf_this_page")
+        with col_mode:
+            this_mode = st.checkbox("This compute mode only", value=False, key="perf_this_mode")
+        filters = {"page": st.session_state.page} if this_page else {}
+        if this_mode:
+            filters["compute"] = st.session_state.get("compute_mode", "shared")
+        rows = RECORDER.summary(**filters)
+        if rows:
+            st.dataframe([{k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()} for row in rows], hide_index=True, width="stretch")
+        else:
+            st.caption("No runs recorded yet.")
+        stats = st.session_state.get("compute_stats")
+        if stats:
+            st.caption("Last computation per compute mode (this session); peak is the memory allocated while computing.")
+            st.dataframe(
+                [{**row, "mode": COMPUTE_MODE_LABELS[row["mode"]], **{k: round(v, 2) for k, v in row.items() if isinstance(v, float)}} for row in stats.values()],
+                hide_index=True, width="stretch"
+            )
+        cache = SHARED_CACHE.info()
+        st.caption(
+            f"Shared array cache: {cache['hits']:,} hits · {cache['misses']:,} misses · {cache['entries']} entries · "
+            f"{cache['bytes'] / 2**20:.1f} / {cache['max_bytes'] / 2**20:.0f} MB · {cache['evictions']} evictions"
+        )
+        sandbox = sandbox_info()
+        if sandbox is not None:
+            st.caption(
+                f"Equation sandbox: {sandbox['idle']}/{sandbox['workers']} workers idle · {sandbox['calls']:,} calls · {sandbox['restarts']} restarts · "
+                f"limits {sandbox['timeout']:g} s / {sandbox['memory_mb']:g} MB"
+            )
+        runner = st.session_state.get("background")
+        if runner is not None:
+            jobs = runner.info()
+            st.caption(
+                f"Background jobs (this session): {jobs['submitted']:,} submitted · {jobs['completed']:,} completed · "
+                f"{jobs['cancelled']:,} cancelled as stale{' · one running' if jobs['pending'] else ''}"
+            )
+        col_prom, col_jsonl = st.columns(2)
+        with col_prom:
+            st.download_button("Prometheus metrics", RECORDER.to_prometheus(), "wavelab_metrics.prom", "text/plain")
+        with col_jsonl:
+            st.download_button("JSON lines", RECORDER.to_jsonl(), "wavelab_metrics.jsonl", "application/json")
+
+SWEEP_HEATMAP_COLUMNS = 1000
+SWEEP_WATERFALL_ROWS = 40
+
+def sweep_view(t, values, family, param, view):
+    """Heatmap or waterfall of a one-parameter family of signals (rows of `family`)."""
+    if view == "Heatmap":
+        step = -(-len(t) // SWEEP_HEATMAP_COLUMNS)
+        with stage("figure"):
+            return create_sweep_heatmap(t[::step], values, family[:, ::step], param)
+    rows = np.unique(np.linspace(0, len(values) - 1, min(len(values), SWEEP_WATERFALL_ROWS)).round().astype(int))
+    with stage("decimate"):
+        traces = [(values[i], *plot_arrays(t, family[i], None)) for i in rows]
+    spacing = 1.2 * float(np.max(np.abs(family))) or 1.0
+    with stage("figure"):
+        return create_waterfall_figure(traces, param, spacing)
 
 # SIDEBAR STRUCTURE
 
@@ -352,20 +848,40 @@ with st.sidebar:
 
         if st.button("✏️  Custom Input"):
             nav_to('custom')
+        if st.button("📡  Live Stream"):
+            nav_to('stream')
+        if st.button("🧮  Parameter Sweep"):
+            nav_to('sweep')
 
         col_mode, col_samp = st.columns([1, 1])
         with col_mode:
             st.write("Mode")
             is_discrete = st.toggle("Discrete", value=False)
+            high_res = st.toggle("High Res", value=False, help="Compute up to 20M samples; plots are decimated to screen width.")
         
         with col_samp:
-            if is_discrete:
+            if high_res:
+                st.write("Samples")
+                num_samples = st.select_slider("Resolution", RESOLUTION_STEPS, value=100_000, format_func=lambda n: f"{n:,}", label_visibility="collapsed")
+            elif is_discrete:
                 st.write("Samples")
                 num_samples = st.slider("Samples", 10, 200, 50, label_visibility="collapsed")
-                t_input = np.linspace(0, 1, num_samples)
             else:
                 num_samples = 500
-                t_input = np.linspace(0, 1, 500)
+            t_input = shared_grid(num_samples)
+            st.session_state.num_samples = num_samples
+
+        if high_res:
+            with st.expander("Plot Detail"):
+                st.radio("Decimation", DECIMATION_METHODS, format_func=lambda m: {"minmax": "Min/Max envelope", "lttb": "LTTB"}[m], horizontal=True, key="decimation", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+                st.slider("Points per trace", 500, 10_000, DEFAULT_MAX_POINTS, 500, key="max_points", on_change=rerun_fragments, args=CHART_FRAGMENTS)
+                st.slider("Zoom window (%)", 0.0, 100.0, (0.0, 100.0), 0.1, key="zoom_window", on_change=rerun_fragments, args=CHART_FRAGMENTS, help="Narrow the window to re-decimate only the visible part at full detail.")
+
+        st.selectbox(
+            "Compute", COMPUTE_MODES, format_func=lambda m: COMPUTE_MODE_LABELS[m], key="compute_mode", on_change=rerun_fragments, args=CHART_FRAGMENTS,
+            help="Shared: float64 arrays shared with other sessions. Workspace: this session's reused buffers, no allocation per rerun."
+        )
+        st.toggle("Performance panel", key="perf_panel", help="Show stage timings of recent runs.")
 
 # ==============================================================================
 # VIEW 1: HOME (VISUALIZER)
@@ -379,77 +895,7 @@ if st.session_state.page == 'home':
     # --- SPECIFIC CONTROLS (Appended to Sidebar) ---
     with st.sidebar:
         st.markdown("<div class='sidebar-header'>Control Panel</div>", unsafe_allow_html=True)
-        
-        st.write(" **Signal 1**")
-        signal_options = ["Sine", "Square", "Sawtooth", "Step", "Impulse", "Ramp", "Custom User Signal"]
-        s1_type = st.selectbox("Signal Type", signal_options, key="s1_type", label_visibility="collapsed")
-        
-        if s1_type == "Custom User Signal":
-            st.caption("Using equation from Custom Input.")
-            s1_amp, s1_freq, s1_phase = 1.0, 1.0, 0.0
-        else:
-            s1_amp = st.slider("Amplitude", 0.1, 5.0, 1.0, 0.1, key="s1_amp")
-            s1_freq = st.slider("Freq (Hz)", 0.1, 20.0, 1.0, 0.5, key="s1_freq")
-            s1_phase = st.slider("Phase (°)", -180.0, 180.0, 0.0, 10.0, key="s1_phase")
-
-        st.divider()
-        st.write(" **Operation**")
-        operations_map = {
-            "Time Scaling": "x(at)",
-            "Amplitude Scaling": "A·x(t)",
-            "Time Shifting": "x(t - t₀)",
-            "Time Reversal": "x(-t)",
-            "Signal Addition": "x₁(t) + x₂(t)",
-            "Signal Multiplication": "x₁(t) · x₂(t)"
-        }
-        operation = st.selectbox("Select Operation", list(operations_map.keys()), label_visibility="collapsed")
-        st.latex(operations_map[operation])
-
-        param_val = 1.0
-        s2_generated = None
-        
-        if operation in ["Signal Addition", "Signal Multiplication"]:
-            st.markdown("<div class='sidebar-header'>Signal 2</div>", unsafe_allow_html=True)
-            s2_type = st.selectbox("Type", ["Sine", "Square", "Sawtooth", "Step", "Impulse", "Ramp"], key="s2_type")
-            s2_amp = st.slider("Amp (S2)", 0.1, 5.0, 1.0, 0.1, key="s2_amp")
-            s2_freq = st.slider("Freq (S2)", 0.1, 20.0, 1.0, 0.5, key="s2_freq")
-            s2_phase = st.slider("Phase (S2)", -180.0, 180.0, 0.0, 10.0, key="s2_phase")
-            s2_generated = generate_signal(s2_type, t_input, s2_amp, s2_freq, s2_phase)
-        elif operation == "Time Scaling":
-            param_val = st.slider("Scaling Factor (a)", 0.1, 5.0, 1.0, 0.1)
-        elif operation == "Amplitude Scaling":
-            param_val = st.slider("Amplitude Factor (A)", 0.1, 5.0, 1.0, 0.1)
-        elif operation == "Time Shifting":
-            param_val = st.slider("Shift (t₀)", -5.0, 5.0, 0.0, 0.1)
-
-    # --- CALCULATIONS ---
-    s1_generated = generate_signal(s1_type, t_input, s1_amp, s1_freq, s1_phase)
-    t_processed = t_input
-    s_processed = s1_generated
-    p_val_display = 0
-
-    if operation == "Time Shifting":
-        t_processed = t_input + param_val
-        s_processed = s1_generated
-        p_val_display = param_val
-    elif operation == "Time Scaling":
-        a = param_val
-        p_val_display = param_val
-        if a > 1e-9:
-            t_processed = t_input / a
-        else:
-            t_processed = t_input
-            val_at_zero = generate_signal(s1_type, np.zeros(1), s1_amp, s1_freq, s1_phase)[0]
-            s_processed = np.full_like(t_input, val_at_zero)
-    elif operation == "Time Reversal":
-        t_processed = -t_input
-    elif operation == "Amplitude Scaling":
-        s_processed = param_val * s1_generated
-        p_val_display = param_val
-    elif operation == "Signal Addition" and s2_generated is not None:
-        s_processed = s1_generated + s2_generated
-    elif operation == "Signal Multiplication" and s2_generated is not None:
-        s_processed = s1_generated * s2_generated
+    control_panel()
 
     # --- MAIN CONTENT ---
     # Top-right About Us button
@@ -458,44 +904,21 @@ if st.session_state.page == 'home':
         st.empty()
     with col_about:
         # Text label for About; widen column for single-line fit
-        if st.button("About Us", key="about_btn", help="About Us", use_container_width=True):
+        if st.button("About Us", key="about_btn", help="About Us", width="stretch"):
             nav_to('about')
 
-    fig = create_plotly_chart(
-        t_input, s1_generated, 
-        t_input, s2_generated, 
-        t_processed, s_processed, 
-        operation, is_discrete, p_val_display
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    main_chart(t_input, is_discrete, high_res)
     
     # --- DISPLAY OPERATION THEORY ---
-    if operation in OPERATION_THEORY:
-        st.markdown(OPERATION_THEORY[operation])
-
-    with st.expander("Show Individual Component Plots"):
-        if s2_generated is not None:
-            fig2 = make_subplots(rows=3, cols=1, shared_xaxes=True, subplot_titles=("Signal 1", "Signal 2", "Result"), vertical_spacing=0.1)
-            hover_t = "<b>%{text}</b><br>T: %{x:.2f}<br>Amp: %{y:.2f}<extra></extra>"
-            trace1 = go.Bar(x=t_input, y=s1_generated, marker_color=NEON_DARK['SIGNAL1'], text=["S1"]*len(t_input), hovertemplate=hover_t) if is_discrete else go.Scatter(x=t_input, y=s1_generated, line=dict(color=NEON_DARK['SIGNAL1']), text=["S1"]*len(t_input), hovertemplate=hover_t)
-            fig2.add_trace(trace1, row=1, col=1)
-            trace2 = go.Bar(x=t_input, y=s2_generated, marker_color=NEON_DARK['SIGNAL2'], text=["S2"]*len(t_input), hovertemplate=hover_t) if is_discrete else go.Scatter(x=t_input, y=s2_generated, line=dict(color=NEON_DARK['SIGNAL2']), text=["S2"]*len(t_input), hovertemplate=hover_t)
-            fig2.add_trace(trace2, row=2, col=1)
-            trace3 = go.Bar(x=t_processed, y=s_processed, marker_color=NEON_DARK['RESULT'], text=["Res"]*len(t_processed), hovertemplate=hover_t) if is_discrete else go.Scatter(x=t_processed, y=s_processed, line=dict(color=NEON_DARK['RESULT']), text=["Res"]*len(t_processed), hovertemplate=hover_t)
-            fig2.add_trace(trace3, row=3, col=1)
-        else:
-            fig2 = make_subplots(rows=2, cols=1, shared_xaxes=False, subplot_titles=("Input Signal", "Output Signal"), vertical_spacing=0.15)
-            hover_t = "<b>%{text}</b><br>T: %{x:.2f}<br>Amp: %{y:.2f}<extra></extra>"
-            trace1 = go.Bar(x=t_input, y=s1_generated, marker_color=NEON_DARK['SIGNAL1'], text=["In"]*len(t_input), hovertemplate=hover_t) if is_discrete else go.Scatter(x=t_input, y=s1_generated, line=dict(color=NEON_DARK['SIGNAL1']), text=["In"]*len(t_input), hovertemplate=hover_t)
-            fig2.add_trace(trace1, row=1, col=1)
-            trace2 = go.Bar(x=t_processed, y=s_processed, marker_color=NEON_DARK['RESULT'], text=["Out"]*len(t_processed), hovertemplate=hover_t) if is_discrete else go.Scatter(x=t_processed, y=s_processed, line=dict(color=NEON_DARK['RESULT']), text=["Out"]*len(t_processed), hovertemplate=hover_t)
-            fig2.add_trace(trace2, row=2, col=1)
-
-        add_watermark(fig2)
-        fig2.update_layout(height=600, paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']), showlegend=False)
-        fig2.update_xaxes(showgrid=True, gridcolor=NEON_DARK['GRID'])
-        fig2.update_yaxes(showgrid=True, gridcolor=NEON_DARK['GRID'])
-        st.plotly_chart(fig2, use_container_width=True)
+    theory_text()
+
+    # The panels track their open state and build nothing while collapsed;
+    # opening one reruns only its fragment.
+    with st.expander("Show Individual Component Plots", key="components_open", on_change=rerun_fragments, args=("components",)):
+        component_plots(t_input, is_discrete)
+
+    with st.expander("Show Frequency Domain", key="spectrum_open", on_change=rerun_fragments, args=("spectrum",)):
+        spectrum_view(t_input)
 
     # --- FOOTER ---
     st.markdown("""
@@ -519,25 +942,25 @@ elif st.session_state.page == 'custom':
         user_text = st.text_area("Enter Equation (function of t)", value=st.session_state.custom_eq, height=150)
         st.session_state.custom_eq = user_text
         
-        preview_sig = evaluate_custom_signal(user_text, t_input)
+        try:
+            with stage("generate"):
+                preview_sig = evaluate_sandboxed(user_text, t_input)
+            eq_error = None
+        except ExpressionError as e:
+            preview_sig = np.zeros_like(t_input)
+            eq_error = e
         
-        fig_prev = go.Figure()
-        hover_t = "<b>%{text}</b><br>T: %{x:.2f}<br>Amp: %{y:.2f}<extra></extra>"
-        if is_discrete:
-            fig_prev.add_trace(go.Bar(x=t_input, y=preview_sig, marker_color=NEON_DARK['ACCENT'], text=["Custom"]*len(t_input), hovertemplate=hover_t))
-        else:
-            fig_prev.add_trace(go.Scatter(x=t_input, y=preview_sig, mode='lines', line=dict(color=NEON_DARK['ACCENT'], width=2), text=["Custom"]*len(t_input), hovertemplate=hover_t))
-        add_watermark(fig_prev)
-        fig_prev.update_layout(
-            title="Preview", paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'],
-            font=dict(color=NEON_DARK['TEXT']), height=300,
-            xaxis=dict(showgrid=True, gridcolor=NEON_DARK['GRID']),
-            yaxis=dict(showgrid=True, gridcolor=NEON_DARK['GRID']),
-            margin=dict(l=20, r=20, t=40, b=20)
-        )
-        st.plotly_chart(fig_prev, use_container_width=True)
+        with stage("decimate"):
+            t_prev_plot, prev_plot = plot_arrays(t_input, preview_sig, view_range(t_input))
+        with stage("figure"):
+            fig_prev = create_preview_figure(t_prev_plot, prev_plot, is_discrete)
+        with stage("plotly_chart"):
+            st.plotly_chart(fig_prev, width="stretch")
         
-        st.success("✅ Equation saved! Go to the **Visualizer** and select **'Custom User Signal'** to use it.")
+        if eq_error is None:
+            st.success("✅ Equation saved! Go to the **Visualizer** and select **'Custom User Signal'** to use it.")
+        else:
+            st.error(f"❌ {eq_error}")
         
         if st.button("⬅ Back to Visualizer"):
             nav_to('home')
@@ -558,6 +981,152 @@ elif st.session_state.page == 'custom':
         2. `exp(-2*t) * cos(10*t)`
         """)
 
+# ==============================================================================
+# VIEW 4: LIVE STREAM
+# ==============================================================================
+elif st.session_state.page == 'stream':
+    st.markdown('<div class="custom-title">Live Stream</div>', unsafe_allow_html=True)
+    st.markdown('<div class="custom-subtitle">Real-time scrolling signal</div>', unsafe_allow_html=True)
+
+    with st.sidebar:
+        st.markdown("<div class='sidebar-header'>Stream</div>", unsafe_allow_html=True)
+        stream_type = st.selectbox("Signal Type", SIGNAL_TYPES, key="stream_type")
+        if stream_type == CUSTOM_SIGNAL:
+            st.caption("Using equation from Custom Input.")
+            stream_amp, stream_freq, stream_phase = 1.0, 1.0, 0.0
+        else:
+            stream_amp = st.slider("Amplitude", 0.1, 5.0, 1.0, 0.1, key="stream_amp")
+            stream_freq = st.slider("Freq (Hz)", 0.1, 20.0, 1.0, 0.5, key="stream_freq")
+            stream_phase = st.slider("Phase (°)", -180.0, 180.0, 0.0, 10.0, key="stream_phase")
+        sample_rate = st.select_slider("Sample Rate (Hz)", STREAM_RATES, value=1_000, key="stream_rate")
+        window_seconds = st.slider("Window (s)", 1, 30, 5, key="stream_window")
+        fps = st.slider("Frame Rate (fps)", 1, 30, 10, key="stream_fps")
+        stream_filter = st.selectbox("Filter", ["None"] + FILTER_OPERATIONS, key="stream_filter")
+        if stream_filter != "None":
+            label, lo, hi, default, step = OPERATION_PARAMS[stream_filter]
+            filter_param = st.slider(label, lo, hi, default, step, key=f"stream_filter_{stream_filter}")
+        running = st.toggle("Running", value=False, key="stream_running")
+        if st.button("Reset Stream"):
+            st.session_state.pop("stream_state", None)
+
+    # The stream, its buffer and pacer survive reruns; only a change of signal
+    # type, rate, window or equation starts a new stream.
+    stream_key = (stream_type, sample_rate, window_seconds, st.session_state.custom_eq)
+    state = st.session_state.get("stream_state")
+    if state is None or state["key"] != stream_key:
+        state = {
+            "key": stream_key,
+            "stream": SignalStream(stream_type, stream_amp, stream_freq, stream_phase, sample_rate, st.session_state.custom_eq, evaluate_sandboxed),
+            "buffer": RingBuffer(sample_rate * window_seconds),
+            "pacer": StreamPacer(sample_rate, fps),
+        }
+        st.session_state.stream_state = state
+    state["stream"].set_params(stream_amp, stream_freq, stream_phase)
+    state["pacer"].fps = fps
+    # The filter keeps its state from frame to frame; a new design starts from rest.
+    filter_key = None if stream_filter == "None" else (stream_filter, filter_param)
+    if state.get("filter_key") != filter_key:
+        state["filter_key"] = filter_key
+        state["filter"] = None if filter_key is None else design_filter(stream_filter, filter_param, sample_rate)
+    if not running:
+        state["pacer"].pause()
+
+    if st.button("⬅ Back to Visualizer"):
+        nav_to('home')
+
+    @timed("stream")
+    def live_stream_frame():
+        """Produce the samples due for this frame and redraw the scrolling plot."""
+        if running:
+            try:
+                with stage("generate"):
+                    t_chunk, y_chunk = state["stream"].next_chunk(state["pacer"].samples_due())
+                if state["filter"] is not None:
+                    with stage("filter"):
+                        y_chunk = state["filter"].process(y_chunk)
+                state["buffer"].extend(t_chunk, y_chunk)
+            except ExpressionError as e:
+                st.error(f"Custom equation error: {e}")
+        t_buf, y_buf = state["buffer"].view()
+        with stage("decimate"):
+            t_plot, y_plot = decimate(t_buf, y_buf, DEFAULT_MAX_POINTS)
+        with stage("figure"):
+            fig = create_stream_figure(t_plot, y_plot, window_seconds)
+        with stage("plotly_chart"):
+            st.plotly_chart(fig, width="stretch", key="stream_chart")
+        pacer = state["pacer"]
+        st.caption(
+            f"Streamed {state['stream'].position:,} samples · buffer {state['buffer'].size:,} samples "
+            f"({state['buffer'].nbytes / 2**20:.1f} MB) · throttled frames {pacer.throttled_frames} "
+            f"· lag {pacer.lag_seconds:.2f} s"
+        )
+
+    st.fragment(live_stream_frame, run_every=1 / fps if running else None)()
+
+# ==============================================================================
+# VIEW 5: PARAMETER SWEEP
+# ==============================================================================
+elif st.session_state.page == 'sweep':
+    st.markdown('<div class="custom-title">Parameter Sweep</div>', unsafe_allow_html=True)
+    st.markdown('<div class="custom-subtitle">A whole family of signals in one pass</div>', unsafe_allow_html=True)
+
+    with st.sidebar:
+        st.markdown("<div class='sidebar-header'>Sweep</div>", unsafe_allow_html=True)
+        sweep_type = st.selectbox("Signal Type", SWEEP_SIGNALS, key="sweep_type")
+        swept_names = st.multiselect("Sweep", list(SWEEP_PARAMS), default=["Frequency"], max_selections=2, key="sweep_params")
+        fixed = {}
+        ranges = {}
+        for name, (arg, lo, hi, default) in SWEEP_PARAMS.items():
+            if name in swept_names:
+                ranges[name] = (*st.slider(f"{name} range", lo, hi, default, key=f"sweep_range_{arg}"),
+                                st.slider(f"{name} values", 2, MAX_SWEEP_VALUES, 25, key=f"sweep_count_{arg}"))
+            else:
+                fixed[arg] = st.slider(name, lo, hi, {"amp": 1.0, "freq": 1.0, "phase": 0.0}[arg], key=f"sweep_fixed_{arg}")
+        sweep_samples = st.select_slider("Samples per signal", [100, 250, 500, 1_000, 2_500, 5_000, 10_000], value=500, key="sweep_samples")
+
+    if st.button("⬅ Back to Visualizer"):
+        nav_to('home')
+
+    if not swept_names:
+        st.info("Pick one or two parameters to sweep in the sidebar.")
+    else:
+        t_sweep = shared_grid(sweep_samples)
+        # Sidebar order is the axis order of the sweep array.
+        swept = {name: sweep_values(*ranges[name]) for name in swept_names}
+        sweep_key = ("sweep", sweep_type, sweep_samples, tuple(sorted(fixed.items())), tuple((name, ranges[name]) for name in swept_names))
+        try:
+            with stage("generate"):
+                family = SHARED_CACHE.get_or_compute(sweep_key, lambda: generate_sweep(sweep_type, t_sweep, fixed, swept))
+        except ValueError as e:
+            st.error(str(e))
+            family = None
+
+        if family is not None:
+            names = list(swept)
+            col_view, col_metric = st.columns([2, 1])
+            with col_view:
+                view = st.radio("View", ["Heatmap", "Waterfall"], horizontal=True, key="sweep_view")
+            if len(names) == 1:
+                fig = sweep_view(t_sweep, swept[names[0]], family, names[0], view)
+            else:
+                with col_metric:
+                    metric = st.selectbox("Metric", SWEEP_METRICS, key="sweep_metric")
+                with stage("figure"):
+                    metric_fig = create_sweep_metric_figure(swept[names[0]], swept[names[1]], sweep_metric(family, metric), names[0], names[1], metric)
+                with stage("plotly_chart"):
+                    st.plotly_chart(metric_fig, width="stretch", key="sweep_metric_chart")
+                second = swept[names[1]]
+                index = st.select_slider(f"{names[1]} slice", range(len(second)), format_func=lambda i: f"{second[i]:.3g}", key="sweep_slice")
+                fig = sweep_view(t_sweep, swept[names[0]], family[:, index], names[0], view)
+            with stage("plotly_chart"):
+                st.plotly_chart(fig, width="stretch", key="sweep_chart")
+            st.caption(f"{' × '.join(f'{len(v)} {n.lower()}' for n, v in swept.items())} × {len(t_sweep):,} samples · {family.nbytes / 2**20:.1f} MB")
+            st.download_button(
+                # Built only when clicked; a large sweep is hundreds of MB.
+                "Download sweep (.npz)", functools.partial(sweep_npz, t_sweep, swept, family, sweep_type),
+                f"wavelab_sweep_{sweep_type.lower()}.npz", "application/octet-stream"
+            )
+
 # ==============================================================================
 # VIEW 3: ABOUT US
 # ==============================================================================
@@ -607,4 +1176,10 @@ elif st.session_state.page == 'about':
     st.markdown("""
     <div style='margin-top:32px; text-align:center; color:#aaa; font-size:0.95rem;'>
         <b>Disclaimer:</b> MyWavelab is an educational tool for learning and visualizing signal processing concepts. Results and visualizations are for academic purposes only and by using the app, users acknowledge that all outputs are for informational and experimental purposes only.
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+# --- PERFORMANCE PANEL ---
+if st.session_state.page in ['home', 'custom'] and st.session_state.get("perf_panel"):
+    performance_panel()
+
+script_timings.finish(**metric_tags())
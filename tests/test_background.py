@@ -0,0 +1,73 @@
+"""Background jobs: reuse, cancellation of stale jobs and exclusive buffers."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from wavelab.background import BackgroundRunner, Cancelled
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def blocking(started, release, value):
+    def func(job):
+        started.set()
+        while not release.wait(0.01):
+            job.check()
+        return value
+    return func
+
+
+def test_cancelled_job_reports_its_state(executor):
+    runner = BackgroundRunner(executor)
+    started, release = threading.Event(), threading.Event()
+    old = runner.submit("a", blocking(started, release, "old"))
+    assert started.wait(2.0)
+    new = runner.submit("b", lambda job: "new")
+    assert old.cancelled and not new.cancelled
+    assert new.wait(2.0) and new.result() == "new"
+    with pytest.raises(Cancelled):
+        old.result()
+    info = runner.info()
+    assert (info["submitted"], info["completed"], info["cancelled"], info["pending"]) == (2, 1, 1, False)
+
+
+def test_same_key_reuses_the_running_job(executor):
+    runner = BackgroundRunner(executor)
+    started, release = threading.Event(), threading.Event()
+    job = runner.submit("a", blocking(started, release, 1))
+    assert runner.submit("a", lambda job: 2) is job
+    release.set()
+    assert job.wait(2.0) and job.result() == 1
+    assert runner.info()["submitted"] == 1
+
+
+def test_jobs_dropped_before_they_start_never_run(executor):
+    runner = BackgroundRunner(executor)
+    started, release = threading.Event(), threading.Event()
+    first = runner.submit("a", blocking(started, release, 1))
+    assert started.wait(2.0)
+    calls = []
+    queued = runner.submit("b", calls.append)
+    # "a" is cancelled, but holds the buffers until its next check; "b" waits for them.
+    last = runner.submit("c", lambda job: "c")
+    assert last.wait(2.0) and last.result() == "c"
+    assert queued.wait(2.0) and calls == []
+    with pytest.raises(Cancelled):
+        queued.result()
+    with pytest.raises(Cancelled):
+        first.result()
+
+
+def test_run_in_the_script_thread_cancels_the_background_job(executor):
+    runner = BackgroundRunner(executor)
+    started, release = threading.Event(), threading.Event()
+    job = runner.submit("a", blocking(started, release, 1))
+    assert started.wait(2.0)
+    assert runner.run("b", lambda job: threading.current_thread()) is threading.current_thread()
+    assert job.done() and job.cancelled and runner.current is None
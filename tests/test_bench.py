@@ -0,0 +1,22 @@
+"""Baseline comparison of benchmark results."""
+from wavelab.bench import compare, missing
+
+
+def record(name, best, samples=1000, mode="any"):
+    return {"name": name, "samples": samples, "mode": mode, "best": best, "mean": best}
+
+
+def test_compare_scales_by_calibration():
+    baseline = [record("calibration", 0.010, 0), record("generate/Sine", 0.010)]
+    slower_machine = [record("calibration", 0.020, 0), record("generate/Sine", 0.020)]
+    assert compare(slower_machine, baseline) == []
+    regressed = [record("calibration", 0.010, 0), record("generate/Sine", 0.020)]
+    [flagged] = compare(regressed, baseline)
+    assert flagged["name"] == "generate/Sine" and flagged["ratio"] == 2.0
+
+
+def test_missing_reports_cases_without_baseline():
+    baseline = [record("calibration", 0.010, 0), record("generate/Sine", 0.010)]
+    results = baseline + [record("generate/Multi-channel (32)", 0.05), record("generate/Sine", 0.01, samples=50)]
+    assert [(r["name"], r["samples"]) for r in missing(results, baseline)] == [("generate/Multi-channel (32)", 1000), ("generate/Sine", 50)]
+    assert compare(results, baseline) == []
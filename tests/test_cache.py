@@ -0,0 +1,79 @@
+"""Byte budget and LRU order of the shared array cache."""
+import threading
+
+import numpy as np
+
+from wavelab.cache import SharedArrayCache, is_file_backed
+from wavelab.signals import time_grid
+
+KB = 1024
+
+
+def array(kb, value=0.0):
+    return np.full(kb * KB // 8, value)
+
+
+def test_lru_eviction_stays_within_budget():
+    cache = SharedArrayCache(max_bytes=10 * KB)
+    for key in "abcd":
+        cache.put(key, array(3))
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.get("a") is None and cache.get("b") is not None
+    cache.get("b")                  # most recently used now
+    cache.put("e", array(3))
+    assert cache.get("c") is None and cache.get("b") is not None
+    assert cache.info()["evictions"] == 2
+
+
+def test_values_are_read_only_and_oversized_ones_are_not_kept():
+    cache = SharedArrayCache(max_bytes=4 * KB)
+    kept = cache.put("small", array(1))
+    assert not kept.flags.writeable
+    big = cache.put("big", array(8))
+    assert big is not None and cache.get("big") is None
+    assert cache.nbytes == 1 * KB
+
+
+def test_views_and_time_grids_are_counted():
+    cache = SharedArrayCache(max_bytes=10 * KB)
+    for n in range(5):
+        grid = time_grid(512 + n)
+        assert grid.base is not None
+        cache.put(("grid", n), grid)
+        cache.put(("view", n), array(8)[::2])
+        assert cache.nbytes <= cache.max_bytes
+    # Only the newest grid and view fit in the budget.
+    assert cache.info()["bytes"] == cache.get(("grid", 4)).nbytes + cache.get(("view", 4)).nbytes
+    assert cache.info()["entries"] == 2
+
+
+def test_memory_mapped_arrays_are_free(tmp_path):
+    path = tmp_path / "take.npy"
+    np.save(path, np.arange(4 * KB, dtype=float))
+    mapped = np.load(path, mmap_mode="r")
+    assert is_file_backed(mapped[::2]) and not is_file_backed(np.asarray(mapped) * 2)
+    cache = SharedArrayCache(max_bytes=4 * KB)
+    cache.put("recording", (mapped[::2], mapped[:, None][:, 0]))
+    assert cache.nbytes == 0 and cache.get("recording") is not None
+
+
+def test_get_or_compute_runs_once_across_threads():
+    cache = SharedArrayCache(max_bytes=64 * KB)
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.wait(1.0)
+        return array(1, 2.0)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
@@ -0,0 +1,101 @@
+"""Channel banks, mixes and processed banks against one signal at a time."""
+import numpy as np
+import pytest
+
+from wavelab import channels
+from wavelab.channels import CHANNEL_PRESETS, Channel, ChannelMix, channel_preset, generate_channels
+from wavelab.operations import OPERATIONS
+from wavelab.pipeline import OperationChain, Step, evaluate_bank
+from wavelab.signals import BASIC_SIGNALS, generate_signal, time_grid
+
+
+def reference(t, channel):
+    if channel.signal == "Impulse":
+        out = np.zeros_like(t)
+        out[np.abs(t - channel.shift).argmin()] = channel.amp
+        return out
+    return generate_signal(channel.signal, t - channel.shift, channel.amp, channel.freq, channel.phase)
+
+
+def random_channels(rng, k):
+    return [Channel(BASIC_SIGNALS[rng.integers(len(BASIC_SIGNALS))], rng.uniform(0.2, 2.0), rng.uniform(0.5, 8.0),
+                    rng.uniform(-180, 180), rng.uniform(-0.3, 0.3)) for _ in range(k)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_bank_matches_per_channel_signals(seed):
+    rng = np.random.default_rng(seed)
+    t = time_grid(1001, -1.0, 1.0)
+    chans = random_channels(rng, 12)
+    bank = generate_channels(t, chans)
+    for row, channel in zip(bank, chans):
+        np.testing.assert_allclose(row, reference(t, channel), atol=1e-9, err_msg=channel.signal)
+
+
+@pytest.mark.parametrize("mode", ["Sum", "Product"])
+def test_mix_is_block_invariant(monkeypatch, mode):
+    rng = np.random.default_rng(3)
+    t = time_grid(5000, -1.0, 1.0)
+    mix = ChannelMix(random_channels(rng, 8), mode)
+    whole = mix.sample_at(t)
+    reduce = np.sum if mode == "Sum" else np.prod
+    np.testing.assert_allclose(whole, reduce([reference(t, c) for c in mix.channels], axis=0), atol=1e-9)
+    monkeypatch.setattr(channels, "MAX_BLOCK_ELEMENTS", 8 * 333)
+    np.testing.assert_array_equal(mix.sample_at(t), whole)
+
+
+@pytest.mark.parametrize("name, jumps", [(CHANNEL_PRESETS[0], 0.5), (CHANNEL_PRESETS[1], 1.0), (CHANNEL_PRESETS[2], None)])
+def test_fourier_presets_approach_their_waveform(name, jumps):
+    t = time_grid(2000, 0.0, 1.0)
+    targets = {
+        CHANNEL_PRESETS[0]: generate_signal("Square", t, 1.0, 1.0, 0.0),
+        CHANNEL_PRESETS[1]: generate_signal("Sawtooth", t, 1.0, 1.0, 0.0),
+        CHANNEL_PRESETS[2]: 2 / np.pi * np.arcsin(np.sin(2 * np.pi * t)),
+    }
+    error = np.abs(ChannelMix(channel_preset(name, 64)).sample_at(t) - targets[name])
+    if jumps is not None:
+        # Gibbs ringing stays next to the discontinuities (at multiples of `jumps`, offset for the sawtooth).
+        offset = 0.5 if name == CHANNEL_PRESETS[1] else 0.0
+        phase = (t - offset) % jumps
+        error = error[np.minimum(phase, jumps - phase) > 0.05]
+    assert error.max() < 0.05
+
+
+def test_mix_validates_channels():
+    with pytest.raises(ValueError):
+        ChannelMix([])
+    with pytest.raises(ValueError):
+        ChannelMix([Channel()], "Mean")
+    with pytest.raises(ValueError):
+        Channel("Custom User Signal")
+
+
+def random_steps(rng, operations, length):
+    params = {"Time Scaling": (0.5, 2.0), "Time Shifting": (-0.3, 0.3), "FIR Low-pass": (5.0, 40.0), "IIR High-pass": (1.0, 10.0)}
+    return [Step(op, rng.uniform(*params.get(op, (0.02, 2.0))), ("Square", 1.0, 3.0, 0.0))
+            for op in rng.choice(operations, length)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bank_chain_matches_each_channel(seed):
+    rng = np.random.default_rng(seed)
+    t = time_grid(400, -1.0, 1.0)
+    chans = random_channels(rng, 5)
+    steps = random_steps(rng, list(OPERATIONS), int(rng.integers(1, 5)))
+    t_out, bank = evaluate_bank(t, generate_channels(t, chans), steps)
+    assert bank.shape[0] == len(chans)
+    for row, channel in zip(bank, chans):
+        t_ref, y_ref = OperationChain().evaluate(t, reference(t, channel), steps)
+        np.testing.assert_allclose(t_out, t_ref, atol=1e-9)
+        np.testing.assert_allclose(row, y_ref, atol=1e-9, err_msg=str(steps))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_linear_chains_commute_with_the_sum(seed):
+    rng = np.random.default_rng(seed)
+    t = time_grid(500, 0.0, 1.0)
+    mix = ChannelMix(random_channels(rng, 6))
+    steps = random_steps(rng, ["Time Shifting", "Time Scaling", "Time Reversal", "Amplitude Scaling", "FIR Low-pass", "IIR High-pass"], 4)
+    _, bank = evaluate_bank(t, mix.generate(t), steps)
+    _, mixed = OperationChain().evaluate(t, mix.sample_at(t), steps)
+    np.testing.assert_allclose(bank.sum(axis=0), mixed, atol=1e-9)
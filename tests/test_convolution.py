@@ -0,0 +1,50 @@
+"""Convolution methods against np.convolve, and the method choice."""
+import numpy as np
+import pytest
+
+from wavelab.convolution import CONVOLUTION_METHODS, choose_method, convolution_operation, convolve, next_fast_len
+
+
+@pytest.mark.parametrize("method", CONVOLUTION_METHODS)
+@pytest.mark.parametrize("n, m", [(1, 1), (5, 3), (1000, 31), (31, 1000), (4097, 4096), (20_000, 7)])
+def test_methods_match_np_convolve(method, n, m):
+    rng = np.random.default_rng(n + m)
+    a, b = rng.standard_normal(n), rng.standard_normal(m)
+    out, used, seconds = convolve(a, b, method)
+    assert used == method and seconds >= 0
+    np.testing.assert_allclose(out, np.convolve(a, b), atol=1e-9)
+
+
+def test_choice_follows_the_lengths():
+    assert choose_method(100, 10) == "direct"
+    assert choose_method(100_000, 100_000) == "fft"
+    assert choose_method(1_000_000, 200) == "overlap-add"
+    assert choose_method(200, 1_000_000) == "overlap-add"
+    with pytest.raises(ValueError):
+        convolve([1.0], [1.0], "winograd")
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 97, 1000, 1025, 65_537])
+def test_fast_lengths_are_5_smooth(n):
+    size = next_fast_len(n)
+    assert size >= n
+    for p in (2, 3, 5):
+        while size % p == 0:
+            size //= p
+    assert size == 1
+
+
+def test_correlation_peaks_at_the_delay():
+    dt = 1e-3
+    t = np.arange(1000) * dt
+    pulse = np.exp(-((t - 0.2) / 0.01) ** 2)
+    delayed = np.exp(-((t - 0.5) / 0.01) ** 2)
+    t_out, r, info = convolution_operation("Cross-correlation", t, delayed, t, pulse)
+    assert t_out[np.argmax(r)] == pytest.approx(0.3)
+    assert (info["n"], info["m"]) == (1000, 1000)
+    t_auto, auto, _ = convolution_operation("Auto-correlation", t[::-1], pulse[::-1])
+    assert t_auto[np.argmax(auto)] == pytest.approx(0.0, abs=dt / 2)
+    # Sums are scaled by dt, so a unit box convolved with itself peaks at its width.
+    box = np.ones(100)
+    _, tri, _ = convolution_operation("Convolution", t[:100], box, t[:100], box)
+    assert tri.max() == pytest.approx(100 * dt)
@@ -0,0 +1,68 @@
+"""Invariants of min/max and LTTB decimation."""
+import numpy as np
+import pytest
+
+from wavelab.decimate import decimate, decimate_channels, lttb_decimate, minmax_decimate
+
+
+def trace(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0.0, 1.0, n)
+    return x, np.cumsum(rng.standard_normal(n))
+
+
+@pytest.mark.parametrize("n, max_points", [(10_001, 2000), (12_345, 500), (999, 100), (100, 100), (50, 200)])
+def test_minmax_keeps_extremes_in_order(n, max_points):
+    x, y = trace(n)
+    xd, yd = minmax_decimate(x, y, max_points)
+    assert len(xd) <= max_points + 2
+    assert np.all(np.diff(xd) >= 0)
+    assert yd.max() == y.max() and yd.min() == y.min()
+    # Every kept point is an original sample.
+    np.testing.assert_array_equal(np.interp(xd, x, y), yd)
+
+
+@pytest.mark.parametrize("n, max_points", [(10_001, 2000), (5_000, 3), (999, 100)])
+def test_minmax_envelope_covers_every_bucket(n, max_points):
+    x, y = trace(n, seed=1)
+    xd, yd = minmax_decimate(x, y, max_points)
+    size = -(-n // (max_points // 2))
+    for lo in range(0, n, size):
+        bucket = y[lo:lo + size]
+        kept = yd[(xd >= x[lo]) & (xd <= x[min(lo + size, n) - 1])]
+        assert kept.max() == bucket.max() and kept.min() == bucket.min()
+
+
+@pytest.mark.parametrize("n, max_points", [(10_001, 2000), (1000, 3), (500, 499)])
+def test_lttb_keeps_endpoints_and_count(n, max_points):
+    x, y = trace(n, seed=2)
+    xd, yd = lttb_decimate(x, y, max_points)
+    assert len(xd) == max_points
+    assert (xd[0], yd[0], xd[-1], yd[-1]) == (x[0], y[0], x[-1], y[-1])
+    assert np.all(np.diff(xd) > 0)
+    np.testing.assert_array_equal(np.interp(xd, x, y), yd)
+
+
+def test_lttb_passes_short_traces_through():
+    x, y = trace(100)
+    xd, yd = lttb_decimate(x, y, 200)
+    assert xd is x and yd is y
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_window_keeps_one_neighbour_each_side(method):
+    x, y = trace(10_000, seed=3)
+    xd, _ = decimate(x, y, 10_000, method, (0.25, 0.5))
+    assert xd[0] < 0.25 <= xd[1] and xd[-2] <= 0.5 < xd[-1]
+    xr, _ = decimate(x[::-1], y[::-1], 10_000, method, (0.25, 0.5))
+    assert xr[0] > 0.5 >= xr[1] and xr[-2] >= 0.25 > xr[-1]
+
+
+def test_channels_match_per_row_minmax():
+    x = np.linspace(0.0, 1.0, 7001)
+    bank = np.stack([trace(7001, seed=s)[1] for s in range(5)])
+    xs, ys = decimate_channels(x, bank, 400, (0.1, 0.9))
+    for row, xr, yr in zip(bank, xs, ys):
+        xe, ye = decimate(x, row, 400, "minmax", (0.1, 0.9))
+        np.testing.assert_array_equal(xr, xe)
+        np.testing.assert_array_equal(yr, ye)
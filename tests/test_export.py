@@ -0,0 +1,51 @@
+"""Streamed and in-memory exports against compute_job."""
+import numpy as np
+import pytest
+
+from wavelab.export import export_job
+from wavelab.jobs import compute_job
+
+JOBS = [
+    {"signal": "Sine", "freq": 5.0, "operation": "Amplitude Scaling", "param": 2.0},
+    {"signal": "Sawtooth", "freq": 3.0, "steps": [
+        {"operation": "Time Shifting", "param": 0.3},
+        {"operation": "Signal Addition", "signal2": {"signal": "Ramp", "amp": 0.5}},
+        {"operation": "Time Scaling", "param": 2.0},
+        {"operation": "Signal Multiplication", "signal2": {"signal": "Square", "freq": 4.0}},
+    ]},
+    {"signal": "Square", "freq": 2.0, "steps": [
+        {"operation": "FIR Low-pass", "param": 20.0},
+        {"operation": "Time Reversal"},
+        {"operation": "Amplitude Scaling", "param": 0.5},
+    ]},
+    {"signal": "Custom User Signal", "expression": "sin(2*pi*5*t) * exp(-2*t)", "operation": "IIR High-pass", "param": 5.0},
+    {"signal": "Multi-channel", "mix": "Product", "channels": [{"signal": "Sine", "freq": 1.0}, {"signal": "Ramp", "amp": 2.0}],
+     "operation": "Moving Average", "param": 0.02},
+    # Computed in memory: convolution output is longer than the input.
+    {"signal": "Square", "operation": "Convolution", "signal2": {"signal": "Sine", "freq": 2.0}},
+]
+
+
+@pytest.mark.parametrize("spec", JOBS, ids=lambda spec: spec["signal"])
+@pytest.mark.parametrize("samples", [257, 3000])
+def test_npz_export_matches_compute_job(tmp_path, spec, samples):
+    spec = {**spec, "samples": samples}
+    path = str(tmp_path / "job.npz")
+    export_job(spec, path, chunk_samples=100)
+    expected = compute_job(spec)
+    with np.load(path) as saved:
+        for name in ("t", "s1", "t_processed", "s_processed"):
+            np.testing.assert_allclose(saved[name], expected[name], rtol=1e-12, atol=1e-12, err_msg=name)
+        if expected["s2"] is not None:
+            np.testing.assert_allclose(saved["s2"], expected["s2"], rtol=1e-12, atol=1e-12)
+
+
+def test_csv_export_pads_short_columns(tmp_path):
+    spec = {"signal": "Square", "operation": "Auto-correlation", "samples": 50}
+    path = str(tmp_path / "job.csv")
+    export_job(spec, path, chunk_samples=16)
+    expected = compute_job(spec)
+    table = np.genfromtxt(path, delimiter=",", names=True)
+    assert len(table) == len(expected["s_processed"])
+    np.testing.assert_allclose(table["s_processed"], expected["s_processed"], atol=1e-9)
+    assert np.isnan(table["s1"][len(expected["s1"]):]).all()
@@ -0,0 +1,74 @@
+"""Validation, caching and the evaluation backends of custom signal equations."""
+import numpy as np
+import pytest
+
+from wavelab.expressions import (CHUNK_SAMPLES, PARALLEL_MIN_SAMPLES, ExpressionError, compile_expression,
+                                 evaluate_custom_signal, expression_cache_info, is_elementwise, validate_expression)
+
+
+@pytest.mark.parametrize("expression, node", [
+    ("(lambda x: x)(t)", "Lambda"),
+    ("[x for x in t]", "ListComp"),
+    ("{x for x in t}", "SetComp"),
+    ("{x: x for x in t}", "DictComp"),
+    ("np.sum(x for x in t)", "GeneratorExp"),
+    ("(x := t) + x", "NamedExpr"),
+    ("f'{t}'", "JoinedStr"),
+])
+def test_forbidden_syntax_is_rejected(expression, node):
+    error = validate_expression(expression)
+    assert isinstance(error, ExpressionError) and error.kind == "syntax"
+    assert node in error.message
+
+
+@pytest.mark.parametrize("expression", ["open('x')", "__import__('os')", "t.__class__", "np._core",
+                                        "sin.__call__(t)", "().__class__"])
+def test_names_outside_the_whitelist_are_rejected(expression):
+    error = validate_expression(expression)
+    assert isinstance(error, ExpressionError) and error.kind == "name"
+
+
+def test_errors_report_kind_and_column():
+    error = validate_expression("sin(t) + cosh(t)")
+    assert (error.kind, error.offset) == ("name", 10)
+    assert "column 10" in str(error)
+    assert validate_expression("sin(t").kind == "syntax"
+    assert validate_expression("   ").kind == "syntax"
+
+
+def test_spellings_share_one_compiled_entry():
+    code = compile_expression("sin(2*pi*t)   +  cos(t)")
+    hits = expression_cache_info().hits
+    assert compile_expression(" sin(2*pi*t) + cos(t) ") is code
+    assert expression_cache_info().hits == hits + 1
+
+
+def test_evaluation_results_match_numpy():
+    t = np.linspace(-1.0, 1.0, 101)
+    np.testing.assert_array_equal(evaluate_custom_signal("exp(-t**2) * np.cos(3*t)", t), np.exp(-t**2) * np.cos(3 * t))
+    np.testing.assert_array_equal(evaluate_custom_signal("2", t), np.full_like(t, 2.0))
+    out = np.empty_like(t)
+    assert evaluate_custom_signal("abs(t)", t, out=out) is out
+    with pytest.raises(ExpressionError) as info:
+        evaluate_custom_signal("t[:3]", t)
+    assert info.value.kind == "evaluation"
+
+
+@pytest.mark.parametrize("expression", ["sin(2*pi*50*t) * exp(-t) + (t > 0.5)", "np.hypot(t, 1) - heaviside(t - 0.3, 0.5)", "3"])
+def test_threads_backend_matches_numpy(expression):
+    t = np.linspace(0.0, 1.0, PARALLEL_MIN_SAMPLES + CHUNK_SAMPLES // 3)
+    np.testing.assert_array_equal(evaluate_custom_signal(expression, t, backend="threads"),
+                                  evaluate_custom_signal(expression, t, backend="numpy"))
+
+
+def test_whole_array_equations_are_not_chunked():
+    assert is_elementwise("sin(t) ** 2 + np.maximum(t, 0.5)")
+    for expression in ("np.cumsum(t)", "t[0] + t", "np.sum(t) * t", "t @ t + t", "np.round(t, decimals=2)"):
+        assert not is_elementwise(expression)
+    t = np.linspace(0.0, 1.0, PARALLEL_MIN_SAMPLES + 1)
+    np.testing.assert_array_equal(evaluate_custom_signal("np.cumsum(t)", t, backend="threads"), np.cumsum(t))
+
+
+def test_unknown_backend_is_refused():
+    with pytest.raises(ValueError):
+        evaluate_custom_signal("t", np.zeros(3), backend="gpu")
@@ -0,0 +1,55 @@
+"""Trace encodings of the visualizer figures."""
+import numpy as np
+import json
+
+import plotly.graph_objects as go
+
+from wavelab.figures import WEBGL_THRESHOLD, create_component_figure, create_plotly_chart, figure_payload_bytes
+
+
+def test_discrete_signals_are_one_stem_trace():
+    t = np.linspace(0.0, 1.0, 50)
+    fig = create_plotly_chart(t, np.sin(t), t, None, t, np.cos(t), "Amplitude Scaling", True, 1.0)
+    trace = fig.data[0]
+    assert len(fig.data) == 2 and isinstance(trace, go.Scatter)
+    assert len(trace.x) == 3 * len(t)
+    np.testing.assert_array_equal(trace.y[0::3], np.sin(t).astype(np.float32))
+    assert np.all(trace.y[1::3] == 0) and np.all(np.isnan(trace.y[2::3]))
+    np.testing.assert_array_equal(trace.marker.size[0::3] > 0, True)
+    np.testing.assert_array_equal(trace.marker.size[1::3], 0)
+
+
+def test_stems_stay_on_their_samples_at_large_times():
+    t = 1e4 + np.arange(10) / 48_000
+    fig = create_plotly_chart(t, np.ones(10), t, None, t, np.ones(10), "Amplitude Scaling", True, 1.0)
+    np.testing.assert_array_equal(fig.data[0].x[0::3], t)
+    assert len(np.unique(fig.data[0].x)) == 10
+
+
+def test_long_traces_use_webgl():
+    short = np.linspace(0.0, 1.0, WEBGL_THRESHOLD)
+    long = np.linspace(0.0, 1.0, WEBGL_THRESHOLD + 1)
+    fig = create_plotly_chart(long, long, short, short, short, short, "Signal Addition", False, 0.0)
+    assert [type(trace) for trace in fig.data] == [go.Scattergl, go.Scatter, go.Scatter]
+
+
+def test_even_axes_are_sent_as_x0_dx():
+    t = np.linspace(-1.0, 1.0, 500)
+    uneven = np.sort(np.random.default_rng(0).uniform(-1.0, 1.0, 500))
+    fig = create_plotly_chart(t, np.sin(t), uneven, np.cos(uneven), t[::-1] + 0.5, np.sin(t), "Time Reversal", False, 0.0)
+    s1, s2, processed = fig.data
+    assert s1.x is None and s1.x0 == -1.0 and np.isclose(s1.dx, 2.0 / 499)
+    np.testing.assert_array_equal(s2.x, uneven)
+    assert processed.x is None and processed.x0 == 1.5 and processed.dx < 0
+
+
+def test_payload_has_no_text_arrays_and_typed_data():
+    t = np.linspace(0.0, 1.0, 500)
+    fig = create_plotly_chart(t, np.sin(t), t, np.cos(t), t, np.sin(t) + np.cos(t), "Signal Addition", False, 0.0)
+    data = json.loads(fig.to_json(validate=False))["data"]
+    assert all("text" not in trace for trace in data)
+    assert all(set(trace["y"]) == {"dtype", "bdata"} for trace in data)
+    # Well under the same traces as JSON number lists.
+    assert figure_payload_bytes(fig) < len(json.dumps([t.tolist()] * 6))
+    components = create_component_figure(t, np.sin(t), t, np.cos(t), t, np.sin(t), False)
+    assert all("text" not in trace for trace in json.loads(components.to_json(validate=False))["data"])
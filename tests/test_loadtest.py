@@ -0,0 +1,67 @@
+"""Load-test scripts, summaries and one short run against a real server."""
+import os
+import random
+import subprocess
+import sys
+import time
+
+import pytest
+
+from wavelab import loadtest
+from wavelab.loadtest import DRAG_STEPS, DRAG_SLIDERS, SCRIPTS, format_level, process_rss, run_load_test, summarize
+from wavelab.operations import OPERATION_PARAMS
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_drags_stay_on_the_slider(seed):
+    rng = random.Random(seed)
+    steps = SCRIPTS["drag"](rng, 1.0)
+    assert len(steps) == DRAG_STEPS
+    [(key, lo, hi, step)] = [s for s in DRAG_SLIDERS if s[0] == steps[0][0]]
+    values = [value for _, value, _ in steps]
+    assert all(lo <= v <= hi for v in values)
+    assert len({round(abs(b - a), 6) for a, b in zip(values, values[1:])}) == 1
+    assert steps[-1][2] == 1.0 and all(pause == loadtest.DRAG_INTERVAL for _, _, pause in steps[:-1])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_operation_scripts_drag_that_operations_slider(seed):
+    steps = SCRIPTS["operation"](random.Random(seed), 1.0)
+    operation = steps[0][1]
+    _, lo, hi, _, _ = OPERATION_PARAMS[operation]
+    assert steps[0][0] == "operation"
+    assert all(key == f"param_{operation}" and lo <= value <= hi for key, value, _ in steps[1:])
+
+
+def test_summary_counts_errors_and_per_session_memory():
+    records = [{"script": "drag", "action": "s1_freq", "latency": 0.1 * i, "first_chart": 0.05, "error": None} for i in range(1, 11)]
+    records.append({"script": "equation", "action": "Back", "latency": 60.0, "first_chart": None, "error": "timeout"})
+    level = summarize(2, records, wall=5.5, start_rss=100 * 2**20, peak_rss=120 * 2**20)
+    assert (level["reruns"], level["errors"], level["throughput"]) == (11, 1, 2.0)
+    assert level["error_samples"] == ["Back: timeout"]
+    assert level["latency"]["p50"] == pytest.approx(0.55)
+    assert list(level["by_script"]) == ["drag"]
+    assert level["rss_per_session"] == 10 * 2**20
+    assert "2 sessions" in format_level(level) and "n/a" not in format_level(level)
+    assert "n/a" in format_level(summarize(1, [], wall=1.0, start_rss=None, peak_rss=None))
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+def test_process_rss_includes_children():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        while loadtest._rss(child.pid) == 0:
+            time.sleep(0.01)
+        assert process_rss(os.getpid()) > loadtest._rss(os.getpid())
+    finally:
+        child.kill()
+        child.wait()
+    assert process_rss(2**22 + 1) is None
+
+
+def test_short_run_against_a_real_server():
+    pytest.importorskip("websockets")
+    results = run_load_test(levels=[1], seconds=2.0, think=0.1, scripts=["drag", "operation"])
+    [level] = results["levels"]
+    assert level["reruns"] > 1 and level["errors"] == 0, level["error_samples"]
+    assert level["first_chart"]["p50"] is not None
@@ -0,0 +1,88 @@
+"""Stage timing, summaries and the JSON-lines and Prometheus exports."""
+import json
+import time
+
+import numpy as np
+
+from wavelab.metrics import TOTAL_STAGE, MetricsRecorder, peak_memory, stage, start_run
+
+
+def timed_run(recorder, scope="script", **tags):
+    run = start_run(scope, recorder)
+    with stage("compute"):
+        time.sleep(0.002)
+    with stage("compute"):
+        pass
+    return run.finish(**tags)
+
+
+def test_stages_add_up_inside_a_run_and_are_free_outside():
+    recorder = MetricsRecorder()
+    with stage("ignored"):
+        pass
+    record = timed_run(recorder, page="home")
+    assert set(record["stages"]) == {"compute", TOTAL_STAGE}
+    assert 0.002 <= record["stages"]["compute"] <= record["stages"][TOTAL_STAGE]
+    assert record["tags"] == {"page": "home"}
+    assert recorder.runs() == [record]
+
+
+def test_nested_runs_restore_the_outer_run():
+    recorder = MetricsRecorder()
+    outer = start_run("script", recorder)
+    inner = start_run("fragment", recorder)
+    with stage("figure"):
+        pass
+    inner.finish()
+    with stage("export"):
+        pass
+    record = outer.finish()
+    assert set(record["stages"]) == {"export", TOTAL_STAGE}
+    assert [run["scope"] for run in recorder.runs()] == ["fragment", "script"]
+
+
+def test_summary_filters_by_tag():
+    recorder = MetricsRecorder(history=3)
+    for page in ("home", "home", "sweep", "home"):
+        timed_run(recorder, page=page)
+    rows = recorder.summary(page="home")
+    assert {row["stage"] for row in rows} == {"compute", TOTAL_STAGE}
+    assert all(row["count"] == 2 for row in rows)
+    row = rows[0]
+    assert row["p50_ms"] <= row["p90_ms"] <= row["p99_ms"]
+
+
+def test_prometheus_text_has_quantiles_sum_and_count(tmp_path):
+    recorder = MetricsRecorder()
+    for _ in range(3):
+        timed_run(recorder, page='a "quoted" page')
+    text = recorder.to_prometheus()
+    assert text.startswith("# HELP wavelab_stage_seconds")
+    labels = '{scope="script",stage="compute",page="a \\"quoted\\" page"'
+    for q in ("0.5", "0.9", "0.99"):
+        assert f'wavelab_stage_seconds{labels},quantile="{q}"}} ' in text
+    assert f"wavelab_stage_seconds_count{labels}}} 3\n" in text
+    path = tmp_path / "wavelab.prom"
+    recorder.write_prometheus(path)
+    assert path.read_text() == text
+
+
+def test_exports_are_written_as_runs_finish(tmp_path):
+    jsonl, prom = tmp_path / "runs.jsonl", tmp_path / "runs.prom"
+    recorder = MetricsRecorder(jsonl_path=jsonl, prometheus_path=prom, prometheus_interval=3600)
+    first = timed_run(recorder)
+    timed_run(recorder)
+    lines = jsonl.read_text().splitlines()
+    assert len(lines) == 2 and json.loads(lines[0]) == first
+    assert recorder.to_jsonl().splitlines() == lines
+    # Rewritten at most once per interval: only the first run is in the file.
+    assert "wavelab_stage_seconds_count{scope=\"script\",stage=\"compute\"} 1\n" in prom.read_text()
+
+
+def test_peak_memory_sees_array_buffers():
+    with peak_memory() as result:
+        np.ones(2**20).sum()
+    assert result["peak_bytes"] >= 8 * 2**20
+    with peak_memory() as small:
+        pass
+    assert small["peak_bytes"] < 2**20
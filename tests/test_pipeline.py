@@ -0,0 +1,83 @@
+"""OperationChain against step-by-step apply_operation."""
+import numpy as np
+import pytest
+
+from wavelab.operations import apply_operation
+from wavelab.pipeline import OperationChain, Step
+from wavelab.signals import generate_signal, time_grid
+
+# Operations whose sequential meaning is unambiguous; convolutions place Signal 2 on its own axis.
+CHAIN_OPERATIONS = [
+    "Time Scaling", "Amplitude Scaling", "Time Shifting", "Time Reversal", "Signal Addition",
+    "Signal Multiplication", "Auto-correlation", "Moving Average", "FIR Low-pass", "IIR High-pass",
+]
+SIGNAL2_TYPES = ["Sine", "Square", "Ramp", "Sawtooth"]
+
+
+def sequential(t, s1, steps):
+    """Apply `steps` one at a time, sampling Signal 2 on the axis each step sees."""
+    for step in steps:
+        s2 = None
+        if step.signal2 is not None:
+            s2 = generate_signal(step.signal2[0], t, *step.signal2[1:4])
+        t, s1, _ = apply_operation(step.operation, t, s1, s2, step.param)
+    return t, s1
+
+
+def random_chain(rng, length):
+    steps = []
+    for _ in range(length):
+        op = CHAIN_OPERATIONS[rng.integers(len(CHAIN_OPERATIONS))]
+        param = {"Time Scaling": rng.uniform(0.2, 4.0), "Time Shifting": rng.uniform(-2.0, 2.0),
+                 "Moving Average": 0.02, "FIR Low-pass": 20.0, "IIR High-pass": 5.0}.get(op, rng.uniform(0.5, 2.0))
+        signal2 = (SIGNAL2_TYPES[rng.integers(len(SIGNAL2_TYPES))], rng.uniform(0.5, 2.0), rng.uniform(0.5, 5.0), 0.0)
+        steps.append(Step(op, param, signal2))
+    return steps
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_chain_matches_sequential(seed):
+    rng = np.random.default_rng(seed)
+    t = time_grid(400)
+    s1 = generate_signal("Sine", t, 1.0, 3.0, 30.0)
+    steps = random_chain(rng, int(rng.integers(1, 6)))
+    t_ref, y_ref = sequential(t, s1, steps)
+    t_out, y_out = OperationChain().evaluate(t, s1, steps)
+    np.testing.assert_allclose(t_out, t_ref, atol=1e-9)
+    np.testing.assert_allclose(y_out, y_ref, atol=1e-9)
+
+
+@pytest.mark.parametrize("first", [Step("Time Shifting", 0.5), Step("Time Scaling", 2.0), Step("Time Reversal")])
+@pytest.mark.parametrize("operation", ["Signal Addition", "Signal Multiplication"])
+def test_signal2_sampled_on_transformed_axis(first, operation):
+    t = time_grid(200)
+    s1 = generate_signal("Sine", t, 1.0, 2.0, 0.0)
+    steps = [first, Step(operation, signal2=("Ramp", 1.0, 1.0, 0.0))]
+    t_out, y_out = OperationChain().evaluate(t, s1, steps)
+    x1 = sequential(t, s1, steps[:1])[1]
+    expected = x1 + t_out if operation == "Signal Addition" else x1 * t_out
+    np.testing.assert_allclose(y_out, expected, atol=1e-12)
+
+
+def test_checkpoints_do_not_change_results():
+    rng = np.random.default_rng(7)
+    t = time_grid(300)
+    s1 = generate_signal("Square", t, 1.0, 2.0, 0.0)
+    chain = OperationChain()
+    steps = random_chain(rng, 4)
+    for param in np.linspace(0.5, 2.0, 5):
+        edited = steps[:2] + [steps[2]._replace(param=float(param))] + steps[3:]
+        t_ref, y_ref = sequential(t, s1, edited)
+        t_out, y_out = chain.evaluate(t, s1, edited, source_key="s1")
+        np.testing.assert_allclose(t_out, t_ref, atol=1e-9)
+        np.testing.assert_allclose(y_out, y_ref, atol=1e-9)
+
+
+def test_checkpoints_respect_max_bytes():
+    t = time_grid(20_000)
+    s1 = np.sin(t)
+    chain = OperationChain(max_checkpoints=64, max_bytes=2**20)
+    for i in range(30):
+        steps = [Step("Amplitude Scaling", 1.0 + i), Step("Time Shifting", 0.1), Step("Amplitude Scaling", 2.0)]
+        chain.evaluate(t, s1, steps, source_key=("s1", i))
+    assert 0 < chain._cached_bytes() <= chain.max_bytes
@@ -0,0 +1,36 @@
+"""Recording sampling on the app's time grid and CSV parsing."""
+import os
+
+import numpy as np
+import pytest
+
+from wavelab import recordings
+from wavelab.recordings import load_csv, open_recording
+from wavelab.signals import RECORDED_SIGNAL, generate_signal, time_grid
+
+
+def test_sample_at_reads_last_sample_at_duration(tmp_path):
+    data = np.arange(1.0, 101.0)
+    np.save(tmp_path / "ramp.npy", data)
+    recording = open_recording(str(tmp_path / "ramp.npy"), 100.0)
+    t = time_grid(1000, 0.0, recording.duration)
+    y = recording.sample_at(t)
+    assert y[-1] == data[-1]
+    assert np.all(y > 0)
+
+
+def test_sample_at_is_zero_outside_recording(tmp_path):
+    np.save(tmp_path / "ones.npy", np.ones(50))
+    recording = open_recording(str(tmp_path / "ones.npy"), 50.0)
+    y = generate_signal(RECORDED_SIGNAL, np.array([-0.5, 0.0, 1.0, 1.02, 2.0]), 2.0, 1.0, 0.0, source=recording)
+    np.testing.assert_array_equal(y, [0.0, 2.0, 2.0, 0.0, 0.0])
+
+
+def test_csv_parse_failure_leaves_no_partial_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(recordings, "CSV_CACHE_DIR", str(tmp_path / "cache"))
+    (tmp_path / "good.csv").write_text("t,v\n0,1.5\n1,2.5\n")
+    (tmp_path / "bad.csv").write_text("0,1\n1,oops\n")
+    np.testing.assert_array_equal(load_csv(str(tmp_path / "good.csv"), 10.0, 1).data, [1.5, 2.5])
+    with pytest.raises(ValueError):
+        load_csv(str(tmp_path / "bad.csv"), 10.0, 1)
+    assert [name.endswith(".f8") for name in sorted(os.listdir(tmp_path / "cache"))] == [True]
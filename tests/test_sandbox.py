@@ -0,0 +1,59 @@
+"""Custom equations in the sandbox pool."""
+import numpy as np
+import pytest
+
+from wavelab import sandbox
+from wavelab.expressions import ExpressionError, evaluate_custom_signal
+from wavelab.sandbox import SandboxPool
+
+pytestmark = pytest.mark.skipif(not sandbox.SANDBOX_ENABLED, reason="the sandbox needs POSIX")
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SandboxPool(workers=1, timeout=2.0, memory_mb=256)
+    yield pool
+    pool.close()
+
+
+def test_grids_too_large_for_shared_memory_run_in_process(pool, monkeypatch):
+    monkeypatch.setattr(sandbox, "_shm_has_room", lambda nbytes: False)
+    t = np.linspace(0.0, 1.0, 1000)
+    calls = pool.calls
+    np.testing.assert_array_equal(pool.evaluate("sin(2*pi*t)", t), evaluate_custom_signal("sin(2*pi*t)", t))
+    assert pool.calls == calls
+
+
+def test_shm_free_space_is_checked(monkeypatch):
+    monkeypatch.setattr(sandbox, "SHM_DIR", "/nonexistent")
+    assert sandbox._shm_has_room(2**60)
+    usage = type("usage", (), {"free": 100 * 2**20})
+    monkeypatch.setattr(sandbox.shutil, "disk_usage", lambda path: usage)
+    assert sandbox._shm_has_room(50 * 2**20) and not sandbox._shm_has_room(90 * 2**20)
+
+
+def test_matches_in_process_evaluation(pool):
+    t = np.linspace(-1.0, 1.0, 5000)
+    np.testing.assert_allclose(pool.evaluate("exp(-t**2) * cos(10*t)", t), evaluate_custom_signal("exp(-t**2) * cos(10*t)", t))
+
+
+def test_errors_come_back_with_their_kind(pool):
+    with pytest.raises(ExpressionError) as info:
+        pool.evaluate("undefined_name * t", np.zeros(10))
+    assert info.value.kind == "name"
+
+
+def test_runaway_equations_hit_the_limits_and_workers_are_replaced(pool):
+    restarts = pool.restarts
+    with pytest.raises(ExpressionError) as info:
+        pool.evaluate("t + np.sum(np.ones(10**10))", np.zeros(10))
+    assert info.value.kind == "limit"
+    assert pool.restarts == restarts + 1
+    # The replacement worker serves the next call.
+    np.testing.assert_array_equal(pool.evaluate("2*t", np.arange(3.0)), [0.0, 2.0, 4.0])
+
+
+def test_cancelled_evaluation_stops_the_worker(pool):
+    with pytest.raises(ExpressionError) as info:
+        pool.evaluate("t + np.sum(np.sort(np.tile(t, 500)))", np.random.default_rng(0).random(10**4), cancelled=lambda: True)
+    assert info.value.kind == "cancelled"
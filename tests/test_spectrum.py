@@ -0,0 +1,45 @@
+"""Spectra and the bounded caches behind them."""
+from wavelab.signals import generate_signal, time_grid
+from wavelab.spectrum import MAX_CACHED_WINDOW, SpectrumCache, compute_spectrum, get_window
+
+
+def test_spectrum_finds_sine_amplitude():
+    t = time_grid(4001, 0.0, 4.0)
+    freqs, magnitude, _ = compute_spectrum(t, generate_signal("Sine", t, 2.0, 50.0, 0.0), "Rectangular")
+    peak = magnitude.argmax()
+    assert abs(freqs[peak] - 50.0) < 0.5
+    assert abs(magnitude[peak] - 2.0) < 0.05
+
+
+def test_only_short_windows_are_shared():
+    assert get_window("Hann", 256) is get_window("Hann", 256)
+    assert get_window("Hann", MAX_CACHED_WINDOW + 1) is not get_window("Hann", MAX_CACHED_WINDOW + 1)
+
+
+def test_spectrum_cache_evicts_by_bytes():
+    t = time_grid(1000)
+    y = generate_signal("Sine", t, 1.0, 5.0, 0.0)
+    one = sum(a.nbytes for a in compute_spectrum(t, y))
+    cache = SpectrumCache(max_bytes=int(2.5 * one), keep_latest=1)
+    for key in range(3):
+        cache.spectrum(key, t, y)
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.misses == 3
+    cache.spectrum(2, t, y)
+    cache.spectrum(1, t, y)
+    assert cache.hits == 2
+    cache.spectrum(0, t, y)     # evicted first
+    assert cache.misses == 4
+
+
+def test_spectrum_cache_keeps_newest_oversized_result():
+    t = time_grid(1000)
+    y = generate_signal("Sine", t, 1.0, 5.0, 0.0)
+    cache = SpectrumCache(max_bytes=100, keep_latest=1)
+    freqs, _, _ = cache.spectrum("s1", t, y)
+    assert len(freqs) == 501
+    assert cache.spectrum("s1", t, y)[0] is freqs and cache.hits == 1
+    cache.spectrum("s2", t, y)
+    assert len(cache._entries) == 1 and cache.nbytes == sum(a.nbytes for a in compute_spectrum(t, y))
+    cache.spectrum("s1", t, y)
+    assert cache.misses == 3
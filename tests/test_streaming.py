@@ -0,0 +1,84 @@
+"""Live streams: seamless chunks, the ring buffer and the frame pacer."""
+import numpy as np
+import pytest
+
+from wavelab.signals import CUSTOM_SIGNAL
+from wavelab.streaming import RingBuffer, SignalStream, StreamPacer
+
+
+@pytest.mark.parametrize("sig_type", ["Sine", "Square", "Sawtooth", "Ramp"])
+def test_chunks_join_into_one_signal(sig_type):
+    whole = SignalStream(sig_type, amp=2.0, freq=2.7, phase=45.0, sample_rate=1000)
+    chunked = SignalStream(sig_type, amp=2.0, freq=2.7, phase=45.0, sample_rate=1000)
+    t, y = whole.next_chunk(2000)
+    parts = [chunked.next_chunk(n) for n in (1, 17, 500, 999, 483)]
+    np.testing.assert_array_equal(np.concatenate([p[0] for p in parts]), t)
+    np.testing.assert_allclose(np.concatenate([p[1] for p in parts]), y, atol=1e-9)
+
+
+def test_sine_stays_exact_after_a_long_run():
+    stream = SignalStream("Sine", freq=7.0, sample_rate=1000)
+    stream.position = 10**9
+    t, y = stream.next_chunk(100)
+    np.testing.assert_allclose(y, np.sin(2 * np.pi * 7.0 * np.arange(100) / 1000), atol=1e-9)
+    assert t[0] == 10**6
+
+
+def test_parameter_changes_keep_the_phase():
+    stream = SignalStream("Sine", freq=1.0, sample_rate=100)
+    _, before = stream.next_chunk(25)
+    stream.set_params(amp=3.0, phase=90.0)
+    _, after = stream.next_chunk(1)
+    assert before[-1] == pytest.approx(np.sin(2 * np.pi * 0.24))
+    assert after[0] == pytest.approx(3.0 * np.sin(2 * np.pi * 0.25 + np.pi / 2))
+
+
+def test_custom_equations_use_the_given_evaluator():
+    calls = []
+    stream = SignalStream(CUSTOM_SIGNAL, expression="2*t", sample_rate=10,
+                          evaluate=lambda expression, t: calls.append(expression) or 2 * t)
+    stream.next_chunk(5)
+    _, y = stream.next_chunk(5)
+    np.testing.assert_allclose(y, 2 * np.arange(5, 10) / 10)
+    assert calls == ["2*t", "2*t"]
+
+
+@pytest.mark.parametrize("sizes", [(3, 4, 5, 6), (1,) * 25, (30,), (9, 1, 10, 2)])
+def test_ring_buffer_keeps_the_newest_samples_contiguous(sizes):
+    buf = RingBuffer(10)
+    data = np.arange(float(sum(sizes)))
+    lo = 0
+    for n in sizes:
+        buf.extend(data[lo:lo + n], -data[lo:lo + n])
+        lo += n
+        t, y = buf.view()
+        expected = data[max(lo - 10, 0):lo]
+        np.testing.assert_array_equal(t, expected)
+        np.testing.assert_array_equal(y, -expected)
+        assert not t.flags.writeable and t.base is not None
+    assert buf.nbytes == 2 * 2 * 10 * 8
+    buf.clear()
+    assert len(buf.view()[0]) == 0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_pacer_caps_the_backlog_and_reports_lag():
+    clock = FakeClock()
+    pacer = StreamPacer(sample_rate=1000, fps=10, max_lag_frames=2, clock=clock)
+    assert pacer.samples_due() == 100
+    clock.now += 0.1
+    assert pacer.samples_due() == 100
+    clock.now += 1.0                 # a slow frame
+    assert pacer.samples_due() == 200
+    assert pacer.lag_seconds == pytest.approx(0.8)
+    assert (pacer.frames, pacer.throttled_frames) == (3, 1)
+    pacer.pause()
+    clock.now += 60.0
+    assert pacer.samples_due() == 100 and pacer.throttled_frames == 1
@@ -0,0 +1,55 @@
+"""Broadcasted parameter sweeps against one signal at a time."""
+import io
+
+import numpy as np
+import pytest
+
+from wavelab.signals import generate_signal, time_grid
+from wavelab.sweep import MAX_SWEEP_VALUES, SWEEP_PARAMS, generate_sweep, run_sweep, sweep_metric, sweep_npz, sweep_values
+
+PARAMS = {"amp": 1.5, "freq": 3.0, "phase": 30.0}
+
+
+@pytest.mark.parametrize("sig_type", ["Sine", "Square", "Sawtooth", "Ramp"])
+@pytest.mark.parametrize("names", [("Frequency",), ("Amplitude", "Phase"), ("Phase", "Frequency")])
+def test_each_row_matches_a_single_signal(sig_type, names):
+    t = time_grid(300)
+    swept = {name: sweep_values(*SWEEP_PARAMS[name][3], count) for name, count in zip(names, (4, 3))}
+    sweep = generate_sweep(sig_type, t, PARAMS, swept)
+    assert sweep.shape == tuple(len(v) for v in swept.values()) + (len(t),)
+    assert sweep.flags.c_contiguous
+    for index in np.ndindex(sweep.shape[:-1]):
+        args = dict(PARAMS)
+        for name, i in zip(swept, index):
+            args[SWEEP_PARAMS[name][0]] = swept[name][i]
+        np.testing.assert_allclose(sweep[index], generate_signal(sig_type, t, **args), atol=1e-12)
+
+
+def test_metrics_reduce_over_time():
+    t, swept, sweep = run_sweep("Sine", PARAMS, {"Amplitude": (1.0, 2.0, 3)}, num_samples=10_000)
+    np.testing.assert_allclose(sweep_metric(sweep, "RMS"), swept["Amplitude"] / np.sqrt(2), rtol=1e-3)
+    np.testing.assert_allclose(sweep_metric(sweep, "Peak"), swept["Amplitude"], rtol=1e-3)
+    np.testing.assert_allclose(sweep_metric(sweep, "Mean"), 0.0, atol=1e-3)
+    with pytest.raises(ValueError):
+        sweep_metric(sweep, "Median")
+
+
+def test_limits_are_enforced():
+    t = time_grid(100)
+    with pytest.raises(ValueError):
+        sweep_values(0.0, 1.0, MAX_SWEEP_VALUES + 1)
+    with pytest.raises(ValueError):
+        generate_sweep("Custom", t, PARAMS, {"Amplitude": [1.0]})
+    with pytest.raises(ValueError):
+        generate_sweep("Sine", t, PARAMS, {})
+    with pytest.raises(ValueError):
+        generate_sweep("Sine", time_grid(10**6), PARAMS, {"Amplitude": np.ones(50)})
+
+
+def test_npz_round_trip():
+    t, swept, sweep = run_sweep("Square", PARAMS, {"Frequency": (1.0, 5.0, 5), "Phase": (0.0, 90.0, 2)}, num_samples=64)
+    data = np.load(io.BytesIO(sweep_npz(t, swept, sweep, "Square")))
+    np.testing.assert_array_equal(data["sweep"], sweep)
+    np.testing.assert_array_equal(data["t"], t)
+    np.testing.assert_array_equal(data["freq"], swept["Frequency"])
+    assert list(data["params"]) == ["Frequency", "Phase"] and str(data["signal"]) == "Square"
@@ -0,0 +1,93 @@
+"""run_chain (workspace path) against OperationChain.evaluate."""
+import numpy as np
+import pytest
+
+from wavelab.export import is_streamable
+from wavelab.operations import CONVOLUTION_OPERATIONS, OPERATIONS
+from wavelab.pipeline import OperationChain, Step
+from wavelab.signals import generate_signal, time_grid
+from wavelab.workspace import Workspace, generate_into, run_chain
+
+SIGNAL2_TYPES = ["Sine", "Square", "Ramp", "Sawtooth", "Step"]
+PARAMS = {"Time Scaling": (0.2, 4.0), "Time Shifting": (-2.0, 2.0), "Moving Average": (0.01, 0.05),
+          "FIR Low-pass": (5.0, 40.0), "FIR High-pass": (5.0, 40.0), "IIR Low-pass": (5.0, 40.0), "IIR High-pass": (5.0, 40.0)}
+
+
+def random_chain(rng, length, operations):
+    steps = []
+    for _ in range(length):
+        op = operations[rng.integers(len(operations))]
+        signal2 = (SIGNAL2_TYPES[rng.integers(len(SIGNAL2_TYPES))], rng.uniform(0.5, 2.0), rng.uniform(0.5, 5.0), rng.uniform(-90, 90))
+        steps.append(Step(op, rng.uniform(*PARAMS.get(op, (0.5, 2.0))), signal2))
+    return steps
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_run_chain_matches_operation_chain(seed):
+    rng = np.random.default_rng(seed)
+    t = time_grid(300)
+    s1 = generate_signal("Sine", t, 1.0, 3.0, 30.0)
+    steps = random_chain(rng, int(rng.integers(1, 6)), list(OPERATIONS))
+    chain = OperationChain()
+    t_ref, y_ref = chain.evaluate(t, s1, steps)
+    t_out, y_out, signal2, _ = run_chain(Workspace("float64"), t, s1, steps)
+    np.testing.assert_allclose(t_out, t_ref, atol=1e-9)
+    np.testing.assert_allclose(y_out, y_ref, atol=1e-9)
+    expected = chain.second_signals(None, steps)
+    assert len(signal2) == len(expected)
+    for (t2, s2), (t2_ref, s2_ref) in zip(signal2, expected):
+        np.testing.assert_allclose(t2, t2_ref, atol=1e-9)
+        np.testing.assert_allclose(s2, s2_ref, atol=1e-9)
+
+
+def test_signal2_buffers_follow_the_chain():
+    t = time_grid(1000)
+    s1 = generate_signal("Sine", t, 1.0, 3.0, 0.0)
+    ws = Workspace("float64")
+    spec = ("Sawtooth", 1.0, 2.0, 0.0)
+    steps = [Step("Time Shifting", 0.25), Step("Signal Addition", signal2=spec), Step("Signal Multiplication", signal2=spec)]
+    _, _, signal2, _ = run_chain(ws, t, s1, steps)
+    # Signal 2 is sampled once per step, on the shifted axis only.
+    np.testing.assert_allclose(signal2[0][0], t + 0.25)
+    np.testing.assert_allclose(signal2[0][1], generate_signal(*spec[:1], t + 0.25, *spec[1:]))
+    held = ws.nbytes
+    # y and t_processed, and per Signal 2 step its axis, Signal 2 and the Sawtooth scratch.
+    assert held == 8 * len(t) * (2 + 2 * 3)
+    run_chain(ws, t, s1, steps[:2])
+    assert ws.nbytes == held - 8 * len(t) * 3
+    run_chain(ws, t, s1, [Step("Amplitude Scaling", 2.0)])
+    assert ws.nbytes == 8 * len(t) * 2
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_float32_workspace_stays_close(seed):
+    rng = np.random.default_rng(seed)
+    t = time_grid(300)
+    s1 = generate_signal("Sine", t, 1.0, 3.0, 30.0)
+    steps = random_chain(rng, 3, ["Time Shifting", "Time Scaling", "Amplitude Scaling", "Signal Addition", "Signal Multiplication"])
+    t_ref, y_ref = OperationChain().evaluate(t, s1, steps)
+    ws = Workspace("float32")
+    t_out, y_out, _, _ = run_chain(ws, ws.grid(len(t)), generate_into("Sine", ws.grid(len(t)), 1.0, 3.0, 30.0, ws.buffer("s1", len(t))), steps)
+    assert y_out.dtype == np.float32
+    np.testing.assert_allclose(t_out, t_ref, atol=1e-5)
+    np.testing.assert_allclose(y_out, y_ref, atol=1e-3)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_chunked_run_chain_matches_whole(seed):
+    rng = np.random.default_rng(seed)
+    n, chunk = 1000, 137
+    t = time_grid(n)
+    s1 = generate_signal("Square", t, 1.0, 4.0, 0.0)
+    operations = [op for op in OPERATIONS if op not in CONVOLUTION_OPERATIONS]
+    steps = random_chain(rng, int(rng.integers(1, 6)), operations)
+    while not is_streamable({"signal": "Square"}, steps):
+        steps = random_chain(rng, int(rng.integers(1, 6)), operations)
+    t_ref, y_ref = OperationChain().evaluate(t, s1, steps)
+    ws, filters, dt = Workspace("float64"), {}, (t[-1] - t[0]) / (n - 1)
+    parts = []
+    for lo in range(0, n, chunk):
+        t_out, y_out, _, _ = run_chain(ws, t[lo:lo + chunk], s1[lo:lo + chunk], steps, filters, dt)
+        parts.append((t_out.copy(), y_out.copy()))
+    np.testing.assert_allclose(np.concatenate([p[0] for p in parts]), t_ref, atol=1e-9)
+    np.testing.assert_allclose(np.concatenate([p[1] for p in parts]), y_ref, atol=1e-9)
@@ -0,0 +1,88 @@
+"""Core signal-processing logic for WaveLab, importable without Streamlit.
+
+Figure builders live in `wavelab.figures` and are loaded on first access so that
+workers which only compute arrays never import Plotly.
+"""
+from .background import BACKGROUND_ENABLED, PREVIEW_SAMPLES, BackgroundRunner, Cancelled, Job
+from .cache import SHARED_CACHE, SharedArrayCache, expression_key, signal_key
+from .channels import (
+    CHANNEL_FIELDS,
+    CHANNEL_PRESETS,
+    CHANNEL_SIGNALS,
+    MAX_CHANNELS,
+    MIX_MODES,
+    Channel,
+    ChannelMix,
+    channel_preset,
+    generate_channels,
+    mix_channels,
+)
+from .decimate import DECIMATION_METHODS, DEFAULT_MAX_POINTS, decimate, decimate_channels
+from .expressions import (
+    ALLOWED_NAMES,
+    EVAL_BACKENDS,
+    ExpressionError,
+    compile_expression,
+    evaluate_custom_signal,
+    expression_cache_info,
+    is_elementwise,
+    validate_expression,
+)
+from .filters import FILTER_OPERATIONS, Filter, butterworth, design_filter, filter_signal, moving_average, windowed_sinc
+from .metrics import RECORDER, MetricsRecorder, RunTimings, peak_memory, stage, start_run
+from .operations import (
+    OPERATION_PARAMS,
+    OPERATION_THEORY,
+    OPERATIONS,
+    TWO_SIGNAL_OPERATIONS,
+    apply_operation,
+    needs_second_signal,
+)
+from .pipeline import OperationChain, Step, chain_filters, chain_label, evaluate_bank, param_display
+from .recordings import RECORDING_FORMATS, RECORDINGS_DIR, Recording, list_recordings, open_recording
+from .sandbox import SANDBOX_ENABLED, SandboxPool, evaluate_sandboxed, sandbox_info
+from .signals import (
+    BASIC_SIGNALS,
+    CUSTOM_SIGNAL,
+    MULTICHANNEL_SIGNAL,
+    RECORDED_SIGNAL,
+    RESOLUTION_STEPS,
+    SIGNAL_TYPES,
+    generate_signal,
+    time_grid,
+)
+from .spectrum import (
+    SEGMENT_LENGTHS,
+    SPECTRUM_WINDOWS,
+    SpectrumCache,
+    compute_spectrogram,
+    compute_spectrum,
+    get_window,
+)
+from .streaming import STREAM_RATES, RingBuffer, SignalStream, StreamPacer
+from .sweep import (
+    MAX_SWEEP_VALUES,
+    SWEEP_METRICS,
+    SWEEP_PARAMS,
+    SWEEP_SIGNALS,
+    generate_sweep,
+    run_sweep,
+    sweep_metric,
+    sweep_npz,
+    sweep_values,
+)
+from .theme import NEON_DARK
+from .workspace import COMPUTE_MODES, Workspace, generate_into, run_chain
+
+_FIGURE_EXPORTS = (
+    "add_watermark", "create_plotly_chart", "create_channel_figure", "create_component_figure", "create_preview_figure", "figure_payload_bytes",
+    "chart_layout_key", "update_plotly_chart", "create_stream_figure", "create_spectrum_figure",
+    "create_spectrogram_figure", "create_filter_response_figure", "create_sweep_heatmap", "create_waterfall_figure", "create_sweep_metric_figure", "use_webgl"
+)
+
+
+def __getattr__(name):
+    if name in _FIGURE_EXPORTS:
+        from . import figures
+        return getattr(figures, name)
+    raise AttributeError(f"module 'wavelab' has no attribute {name!r}")
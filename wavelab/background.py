@@ -0,0 +1,138 @@
+"""Background computation with cancellation of stale runs.
+
+Heavy work (long signals, custom equations, convolutions) runs on a
+process-wide thread pool instead of the Streamlit script thread; NumPy and the
+sandbox release the GIL, so the script stays free to draw a coarse preview and
+to notice newer input. Each session has a BackgroundRunner:
+
+- `submit(key, func)` starts `func(job)` for `key`, or returns the job already
+  running for it; the job it replaces is cancelled;
+- jobs of one runner never overlap, because they share the session's buffers
+  and checkpoints;
+- cancellation is cooperative: `func` calls `job.check()` between stages, which
+  raises Cancelled once a newer job was submitted. A job that has not started
+  is dropped without running.
+
+Set WAVELAB_BACKGROUND=0 to compute everything in the script thread.
+"""
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+
+BACKGROUND_ENABLED = os.environ.get("WAVELAB_BACKGROUND", "1") != "0"
+BACKGROUND_WORKERS = int(os.environ.get("WAVELAB_BACKGROUND_WORKERS", max(2, os.cpu_count() or 1)))
+# Results with fewer samples are computed in the script thread, without a preview.
+BACKGROUND_SAMPLES = int(os.environ.get("WAVELAB_BACKGROUND_SAMPLES", 50_000))
+PREVIEW_SAMPLES = int(os.environ.get("WAVELAB_PREVIEW_SAMPLES", 2_000))
+# How often a page waiting for a job checks on it (and gives Streamlit a chance to stop the run).
+REFINE_POLL = 0.1
+
+
+class Cancelled(Exception):
+    """The job was replaced by a newer one before it finished."""
+
+
+class Job:
+    """One background computation; `future` holds its result."""
+
+    def __init__(self, key):
+        self.key = key
+        self.future = None
+        self.submitted = time.perf_counter()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        """Raise Cancelled if the job was cancelled; call it between stages of the work."""
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def wait(self, timeout=None):
+        """Wait up to `timeout` seconds; True once the job has finished (or been dropped)."""
+        wait_futures([self.future], timeout)
+        return self.future.done()
+
+    def result(self):
+        """The job's return value; raises Cancelled if it was cancelled before it finished."""
+        try:
+            return self.future.result()
+        except CancelledError:
+            raise Cancelled() from None
+
+
+class BackgroundRunner:
+    """Runs one session's computations off the script thread, newest first (see the module docstring)."""
+
+    def __init__(self, executor=None):
+        self._executor = executor
+        self._lock = threading.Lock()      # held by the job using the session's buffers
+        self.current = None
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+
+    def _replace(self, job):
+        old, self.current = self.current, job
+        if old is not None and not old.done():
+            old.cancel()
+            if old.future is not None and old.future.cancelled():     # dropped before it started
+                self.cancelled += 1
+
+    def submit(self, key, func):
+        """The job computing `func(job)` for `key`: the current one if it matches, else a new one."""
+        current = self.current
+        if current is not None and current.key == key and not current.cancelled:
+            return current
+        job = Job(key)
+        self._replace(job)
+        self.submitted += 1
+        job.future = (self._executor or get_executor()).submit(self._run, job, func)
+        return job
+
+    def run(self, key, func):
+        """Call `func(job)` in this thread once any background job has stopped."""
+        job = Job(key)
+        self._replace(None)
+        with self._lock:
+            return func(job)
+
+    def _run(self, job, func):
+        with self._lock:
+            try:
+                job.check()
+                result = func(job)
+            except Cancelled:
+                self.cancelled += 1
+                raise
+            self.completed += 1
+            return result
+
+    def info(self):
+        return {"submitted": self.submitted, "completed": self.completed, "cancelled": self.cancelled,
+                "pending": self.current is not None and not self.current.done()}
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The process-wide thread pool, started on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(BACKGROUND_WORKERS, thread_name_prefix="wavelab-background")
+        return _executor
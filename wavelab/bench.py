@@ -0,0 +1,243 @@
+"""Benchmark suite for signal generation, operations and figure building.
+
+    python -m wavelab bench -o bench.json --baseline benchmarks/baseline.json
+    python -m wavelab bench --groups signals operations figures compute --save-baseline benchmarks/baseline.json
+
+Every case is timed at each sample count (50 to 10M by default) and recorded
+with its best and mean time over a few repeats. Signal generation and
+operations do not depend on the display mode, so they run once per sample
+count; figure building and JSON serialization run in both continuous and
+discrete mode, on traces decimated the way the app decimates them.
+
+A fixed calibration workload is timed with every run. When comparing against
+a baseline, times are first divided by the ratio of the two calibration times,
+so a slower or busier machine does not show up as a regression everywhere.
+Sample counts with flagged cases are measured a second time and only cases
+that are slow in both runs are reported.
+
+The "compute" group times one full rerun computation (Signal 1, a Signal 2
+and a two-step chain) in every compute mode of wavelab.workspace, and records
+the peak memory it allocates as measured by tracemalloc.
+
+Results are written as JSON. Comparing against a stored baseline flags every
+case whose best time grew by more than its group's threshold (and by more than
+a small absolute floor, so timer noise on microsecond cases is not reported).
+Cases the baseline has no entry for are reported as well: a new case fails the
+comparison until the baseline is regenerated with it.
+"""
+import gc
+import json
+import platform
+import time
+
+import numpy as np
+
+from .channels import ChannelMix, channel_preset
+from .decimate import DEFAULT_MAX_POINTS, decimate
+from .expressions import evaluate_custom_signal
+from .metrics import peak_memory
+from .operations import OPERATIONS, apply_operation, needs_second_signal
+from .pipeline import OperationChain, Step
+from .signals import SIGNAL_TYPES, generate_signal, time_grid
+from .workspace import COMPUTE_MODES, Workspace, generate_into, run_chain
+
+BENCH_SIZES = [50, 500, 5_000, 50_000, 500_000, 5_000_000, 10_000_000]
+QUICK_SIZES = [50, 500, 5_000, 50_000]
+BENCH_EXPRESSION = "sin(2*pi*5*t) * exp(-2*t)"
+# Allowed slowdown per case group before a case is flagged; Plotly figure
+# building allocates many small objects and is noisier than the NumPy cases.
+DEFAULT_THRESHOLDS = {"generate": 0.25, "operation": 0.25, "figure": 0.5, "compute": 0.25}
+MIN_REGRESSION_SECONDS = 1e-4
+
+
+def time_call(fn, min_time=0.2, min_repeat=3, max_repeat=50):
+    """(best, mean) wall time of fn() after one warm-up call, repeated until `min_time` has passed.
+
+    Garbage collection is paused while timing, as `timeit` does, so a
+    collection triggered by an earlier case is not charged to this one.
+    """
+    fn()    # warm-up: first-call imports and caches are not part of the measurement
+    times = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(times) < max_repeat and (len(times) < min_repeat or sum(times) < min_time):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+            if times[0] > min_time:
+                break   # slow case: one run is representative
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return min(times), sum(times) / len(times)
+
+
+def _record(name, n, mode, fn):
+    best, mean = time_call(fn)
+    return {"name": name, "samples": n, "mode": mode, "best": best, "mean": mean}
+
+
+def _calibration_workload():
+    # Mixes interpreter-bound work (like figure building) with NumPy kernels.
+    data = [{"x": i, "y": i * 0.5} for i in range(20_000)]
+    sum(d["x"] * d["y"] for d in data)
+    np.sin(np.linspace(0, 1, 200_000)).sum()
+
+
+def calibrate():
+    best, mean = time_call(_calibration_workload, min_time=1.0)
+    return {"name": "calibration", "samples": 0, "mode": "any", "best": best, "mean": mean}
+
+
+def bench_signals(n):
+    t = time_grid(n)
+    for sig in SIGNAL_TYPES:
+        yield _record(f"generate/{sig}", n, "any", lambda sig=sig: generate_signal(sig, t, 1.0, 5.0, 30.0, BENCH_EXPRESSION))
+    # The same equation without the chunked, multithreaded backend.
+    yield _record("generate/Custom User Signal (numpy)", n, "any", lambda: evaluate_custom_signal(BENCH_EXPRESSION, t, backend="numpy"))
+    mix = ChannelMix(channel_preset("Square (odd harmonics)", 32, 5.0))
+    yield _record("generate/Multi-channel (32)", n, "any", lambda: mix.sample_at(t))
+
+
+def bench_operations(n):
+    t = time_grid(n)
+    s1 = generate_signal("Sine", t, 1.0, 5.0, 0.0)
+    s2 = generate_signal("Square", t, 1.0, 3.0, 0.0)
+    for op in OPERATIONS:
+        yield _record(f"operation/{op}", n, "any", lambda op=op: apply_operation(op, t, s1, s2 if needs_second_signal(op) else None, 0.5))
+
+
+def bench_figures(n, is_discrete):
+    # Imported here so the signal benchmarks run without Plotly.
+    from .figures import create_component_figure, create_plotly_chart
+
+    mode = "discrete" if is_discrete else "continuous"
+    t = time_grid(n)
+    s1 = generate_signal("Sine", t, 1.0, 5.0, 0.0)
+    s2 = generate_signal("Square", t, 1.0, 3.0, 0.0)
+    s_processed = s1 + s2
+    yield _record("figure/decimate", n, mode, lambda: decimate(t, s_processed, DEFAULT_MAX_POINTS))
+    traces = [decimate(t, y, DEFAULT_MAX_POINTS) for y in (s1, s2, s_processed)]
+    args = [a for pair in traces for a in pair]
+
+    def build():
+        return create_plotly_chart(*args, "Signal Addition", is_discrete, 0)
+
+    fig = build()
+    yield _record("figure/build", n, mode, build)
+    yield _record("figure/json", n, mode, fig.to_json)
+    yield _record("figure/components", n, mode, lambda: create_component_figure(*args, is_discrete).to_json())
+
+
+BENCH_STEPS = (Step("Amplitude Scaling", 2.0), Step("Signal Addition", signal2=("Square", 1.0, 3.0, 0.0)))
+
+
+def _compute_case(mode, n):
+    """One rerun's computation in `mode`, as the visualizer runs it on a cache miss."""
+    if mode == "shared":
+        def compute():
+            t = time_grid(n)
+            return OperationChain().evaluate(t, generate_signal("Sine", t, 1.0, 5.0, 30.0), BENCH_STEPS)
+        return compute
+    ws = Workspace(mode)
+
+    def compute():
+        t = ws.grid(n)
+        return run_chain(ws, t, generate_into("Sine", t, 1.0, 5.0, 30.0, ws.buffer("s1", n)), BENCH_STEPS)
+    return compute
+
+
+def bench_compute(n):
+    for mode in COMPUTE_MODES:
+        compute = _compute_case(mode, n)
+        record = _record("compute/Sine → Scaling → Addition", n, mode, compute)
+        with peak_memory() as peak:
+            compute()   # workspace buffers already exist after the timed runs
+        yield {**record, "peak_bytes": peak["peak_bytes"]}
+
+
+def run_suite(sizes=BENCH_SIZES, groups=("signals", "operations", "figures"), progress=None):
+    """Run the selected benchmark groups and return the list of result records."""
+    results = [calibrate()]
+    if progress:
+        progress(results[0])
+    for n in sizes:
+        cases = []
+        if "signals" in groups:
+            cases.append(bench_signals(n))
+        if "operations" in groups:
+            cases.append(bench_operations(n))
+        if "figures" in groups:
+            cases += [bench_figures(n, False), bench_figures(n, True)]
+        if "compute" in groups:
+            cases.append(bench_compute(n))
+        for case in cases:
+            for record in case:
+                results.append(record)
+                if progress:
+                    progress(record)
+    return results
+
+
+def environment():
+    import plotly
+    return {
+        "python": platform.python_version(), "numpy": np.__version__, "plotly": plotly.__version__,
+        "machine": platform.machine(), "system": platform.system(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(results, path):
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=1)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def _case_key(record):
+    return (record["name"], record["samples"], record["mode"])
+
+
+def compare(results, baseline, threshold=None, min_seconds=MIN_REGRESSION_SECONDS):
+    """Records slower than the baseline by more than the threshold, each with its baseline time and ratio.
+
+    `threshold` overrides DEFAULT_THRESHOLDS for every group when given.
+    """
+    reference = {_case_key(r): r for r in baseline}
+    calib = reference.get(("calibration", 0, "any"))
+    calib_now = next((r for r in results if r["name"] == "calibration"), None)
+    speed = calib_now["best"] / calib["best"] if calib and calib_now else 1.0
+    regressions = []
+    for record in results:
+        base = reference.get(_case_key(record))
+        if base is None or record["name"] == "calibration":
+            continue
+        ratio = record["best"] / (base["best"] * speed) if base["best"] > 0 else float("inf")
+        allowed = threshold if threshold is not None else DEFAULT_THRESHOLDS.get(record["name"].split("/")[0], 0.25)
+        if ratio > 1 + allowed and record["best"] - base["best"] * speed > min_seconds:
+            regressions.append({**record, "baseline": base["best"], "ratio": ratio})
+    return regressions
+
+
+def missing(results, baseline):
+    """Records of cases the baseline has no entry for, so they cannot be checked."""
+    reference = {_case_key(r) for r in baseline}
+    return [r for r in results if _case_key(r) not in reference]
+
+
+def merge_best(results, rerun):
+    """Keep the faster measurement of each case; a regression must show up in both runs."""
+    faster = {_case_key(r): r for r in rerun}
+    return [min(r, faster.get(_case_key(r), r), key=lambda rec: rec["best"]) for r in results]
+
+
+def format_record(record):
+    line = f"{record['name']:<36} {record['samples']:>11,} {record['mode']:<10} {record['best'] * 1e3:>10.3f} ms"
+    if "peak_bytes" in record:
+        line += f" {record['peak_bytes'] / 2**20:>9.1f} MB peak"
+    return line
+
@@ -0,0 +1,148 @@
+"""Process-wide cache of generated and processed arrays, shared by all sessions.
+
+Streamlit runs every browser session in the same process, and most sessions
+start from the same presets. Arrays computed by one session are stored here
+read-only, so other sessions reuse the very same buffers instead of computing
+and holding their own copies.
+
+The cache is bounded by a byte budget (WAVELAB_CACHE_MB, default 512 MB) and
+evicts least-recently-used entries. When several sessions ask for the same
+missing key at once, one computes it and the others wait for its result.
+"""
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .expressions import normalize_expression
+
+DEFAULT_CACHE_BYTES = int(float(os.environ.get("WAVELAB_CACHE_MB", 512)) * 2**20)
+
+
+def expression_key(expression):
+    """Short, stable hash of a custom equation for use in cache keys."""
+    if expression is None:
+        return None
+    return hashlib.sha1(normalize_expression(expression).encode()).hexdigest()[:16]
+
+
+def signal_key(sig_type, amp, freq, phase, t, expression=None, source=None):
+    """Key of a generated signal on the time grid `t`.
+
+    The grid is identified by its length and end points; the display mode is
+    not part of the key because continuous and discrete mode share the grid.
+    """
+    return ("signal", sig_type, float(amp), float(freq), float(phase), len(t), float(t[0]), float(t[-1]), expression_key(expression), source)
+
+
+def _arrays(value):
+    return [v for v in (value if isinstance(value, tuple) else (value,)) if isinstance(v, np.ndarray)]
+
+
+def is_file_backed(arr):
+    """True if `arr` (or the array it is a view of) lives in a memory-mapped file such as a recording."""
+    while isinstance(arr, np.ndarray):
+        if isinstance(arr, np.memmap):
+            return True
+        arr = arr.base
+    return isinstance(arr, mmap.mmap)
+
+
+def array_nbytes(arrays):
+    """Memory held by `arrays`; each array counts once and file-backed ones are free."""
+    return sum(a.nbytes for a in {id(a): a for a in arrays}.values() if not is_file_backed(a))
+
+
+def _nbytes(value):
+    return array_nbytes(_arrays(value))
+
+
+class SharedArrayCache:
+    """Thread-safe LRU cache of read-only arrays (or tuples containing arrays) with a byte budget."""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (value, nbytes)
+        self._pending = {}              # key -> Event set when its computation finishes
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store `value` read-only; values larger than the whole budget are returned but not kept."""
+        for arr in _arrays(value):
+            arr.flags.writeable = False
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries[key][1]
+            self._entries[key] = (value, size)
+            self._entries.move_to_end(key)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Cached value for `key`, calling compute() once across all threads on a miss."""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._pending[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                pending.wait()
+                if key in self._entries:
+                    continue
+                # The computation failed or was too large to keep; compute our own.
+                with self._lock:
+                    self.misses += 1
+                return compute()
+            try:
+                return self.put(key, compute())
+            finally:
+                with self._lock:
+                    del self._pending[key]
+                pending.set()
+
+    def info(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries), "bytes": self.nbytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+SHARED_CACHE = SharedArrayCache()
@@ -0,0 +1,171 @@
+"""Multi-channel signals: any number of built-in signals held in one 2-D array.
+
+A channel is a built-in signal with its own amplitude, frequency, phase and
+time shift. A bank of k channels is generated into one C-contiguous (k, n)
+array without a Python loop over channels: the amplitudes, frequencies and
+phases of a run of channels of one type become (k_run, 1) columns that
+broadcast against the time axis (as in wavelab.sweep), and the in-place
+generators of wavelab.workspace write the whole run with one ufunc per stage.
+
+A ChannelMix reduces the bank over the channel axis:
+
+- "Sum": the superposition Σ xᵢ(t - τᵢ);
+- "Product": Π xᵢ(t - τᵢ) (ring modulation, envelopes).
+
+Mixed signals are generated and reduced in blocks of columns of at most
+MAX_BLOCK_ELEMENTS samples, so the bank stays in cache between the passes of
+each stage and memory does not grow with the channel count. An Impulse
+channel is placed at the sample of the whole axis nearest to its shift, not of
+each block.
+
+A ChannelMix is a Signal 1 source like a Recording: the visualizer's operation
+chain runs once on the mixed signal. To see every channel processed,
+wavelab.pipeline.evaluate_bank runs the chain on the whole (k, n) bank at once:
+time-axis and value steps (shifts, scalings, reversal, sums and products with
+Signal 2) are single broadcast operations over the channel axis.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .signals import BASIC_SIGNALS
+from .workspace import generate_into
+
+CHANNEL_SIGNALS = BASIC_SIGNALS
+MIX_MODES = ["Sum", "Product"]
+CHANNEL_PRESETS = ["Square (odd harmonics)", "Sawtooth (all harmonics)", "Triangle (odd harmonics)", "Beats"]
+MAX_CHANNELS = 64
+# Samples per block of the bank: small enough for the block to stay in cache between passes.
+MAX_BLOCK_ELEMENTS = 1 << 18
+CHANNEL_FIELDS = ["signal", "amp", "freq", "phase", "shift"]
+
+
+class Channel(namedtuple("Channel", CHANNEL_FIELDS)):
+    """One component of a ChannelMix: `signal`(t - shift) with its amp, freq (Hz) and phase (°)."""
+    __slots__ = ()
+
+    def __new__(cls, signal="Sine", amp=1.0, freq=1.0, phase=0.0, shift=0.0):
+        if signal not in CHANNEL_SIGNALS:
+            raise ValueError(f"Unknown channel signal '{signal}', expected one of {CHANNEL_SIGNALS}")
+        return super().__new__(cls, signal, float(amp), float(freq), float(phase), float(shift))
+
+
+def _impulse_index(t, shifts):
+    """Index of the sample of `t` nearest to each shift (the first one on a tie, like argmin)."""
+    t = np.asarray(t)
+    if len(t) > 1 and t[0] <= t[-1]:
+        hi = np.clip(np.searchsorted(t, shifts), 1, len(t) - 1)
+        return np.where(np.abs(t[hi - 1] - shifts) <= np.abs(t[hi] - shifts), hi - 1, hi)
+    return np.array([np.abs(t - s).argmin() for s in shifts], dtype=np.intp)
+
+
+def _runs(channels):
+    """(signal type, first, stop) of every run of consecutive channels with the same signal type."""
+    runs, lo = [], 0
+    for i in range(1, len(channels) + 1):
+        if i == len(channels) or channels[i].signal != channels[lo].signal:
+            runs.append((channels[lo].signal, lo, i))
+            lo = i
+    return runs
+
+
+def generate_channels(t, channels, out=None, impulse_index=None):
+    """The (len(channels), len(t)) bank of every channel over `t`.
+
+    Each run of consecutive channels with the same signal type is written by
+    one broadcasted `generate_into` call straight into its rows of the bank.
+    For Sine and Square the shift is folded into the phase, so the time axis
+    stays 1-D. `impulse_index` gives the sample of `t` at which each
+    channel's impulse sits (only Impulse entries are read, and they may fall
+    outside `t`); by default it is the sample nearest to the channel's shift.
+    """
+    t = np.asarray(t)
+    shape = (len(channels), len(t))
+    if out is None:
+        out = np.empty(shape, dtype=np.result_type(t.dtype, np.float32))
+    elif out.shape != shape:
+        raise ValueError(f"Channel bank needs shape {shape}, got {out.shape}")
+    params = np.array([c[1:] for c in channels], dtype=float).reshape(-1, 4)
+    for sig_type, lo, hi in _runs(channels):
+        rows = out[lo:hi]
+        amp, freq, phase, shift = (params[lo:hi, j, None] for j in range(4))
+        if sig_type == "Impulse":
+            index = _impulse_index(t, shift[:, 0]) if impulse_index is None else np.asarray(impulse_index)[lo:hi]
+            rows.fill(0)
+            inside = np.flatnonzero((index >= 0) & (index < len(t)))
+            rows[inside, index[inside]] = amp[inside, 0]
+        elif sig_type in ("Sine", "Square"):
+            generate_into(sig_type, t, amp, freq, phase - 360.0 * freq * shift, rows)
+        else:
+            t_rows = t - shift if shift.any() else t
+            scratch = np.empty_like(rows) if sig_type == "Sawtooth" else None
+            generate_into(sig_type, t_rows, amp, freq, phase, rows, scratch)
+    return out
+
+
+def mix_channels(bank, mode="Sum", out=None):
+    """Reduce a channel bank over its channel axis."""
+    if mode == "Sum":
+        return np.sum(bank, axis=0, out=out)
+    if mode == "Product":
+        return np.prod(bank, axis=0, out=out)
+    raise ValueError(f"Unknown mix '{mode}', expected one of {MIX_MODES}")
+
+
+class ChannelMix(namedtuple("ChannelMix", ["channels", "mode"])):
+    """Channels combined by `mode`; hashable, so it can be part of a cache key like a Recording."""
+    __slots__ = ()
+
+    def __new__(cls, channels, mode="Sum"):
+        channels = tuple(c if isinstance(c, Channel) else Channel(*c) if isinstance(c, (list, tuple)) else Channel(**c)
+                         for c in channels)
+        if not 1 <= len(channels) <= MAX_CHANNELS:
+            raise ValueError(f"A multi-channel signal has 1 to {MAX_CHANNELS} channels, got {len(channels)}")
+        if mode not in MIX_MODES:
+            raise ValueError(f"Unknown mix '{mode}', expected one of {MIX_MODES}")
+        return super().__new__(cls, channels, mode)
+
+    def describe(self):
+        return f"{len(self.channels)} channels, {self.mode.lower()}"
+
+    def generate(self, t):
+        """The full (channels, len(t)) bank."""
+        return generate_channels(t, self.channels)
+
+    def sample_at(self, t, out=None):
+        """The mixed signal over `t`, generated and reduced in blocks of columns."""
+        t = np.asarray(t)
+        n, k = len(t), len(self.channels)
+        if out is None:
+            out = np.empty(n, dtype=np.result_type(t.dtype, np.float32))
+        impulses = [i for i, c in enumerate(self.channels) if c.signal == "Impulse"]
+        index = np.zeros(k, dtype=np.intp)
+        if impulses:
+            index[impulses] = _impulse_index(t, [self.channels[i].shift for i in impulses])
+        block = max(1, MAX_BLOCK_ELEMENTS // k)
+        bank = np.empty((k, min(block, n)), dtype=out.dtype)
+        for lo in range(0, n, block):
+            hi = min(lo + block, n)
+            rows = bank if hi - lo == bank.shape[1] else np.empty((k, hi - lo), dtype=out.dtype)
+            generate_channels(t[lo:hi], self.channels, rows, index - lo)
+            mix_channels(rows, self.mode, out[lo:hi])
+        return out
+
+
+def channel_preset(name, count, f0=1.0):
+    """`count` channels that add up to a classic waveform with fundamental `f0` (Hz)."""
+    k = np.arange(1, int(count) + 1)
+    if name == "Square (odd harmonics)":
+        n = 2 * k - 1
+        rows = zip(4 / (np.pi * n), f0 * n, np.zeros(len(k)))
+    elif name == "Sawtooth (all harmonics)":
+        rows = zip(2 / (np.pi * k), f0 * k, np.where(k % 2, 0.0, 180.0))
+    elif name == "Triangle (odd harmonics)":
+        n = 2 * k - 1
+        rows = zip(8 / (np.pi * n) ** 2, f0 * n, np.where(k % 2, 0.0, 180.0))
+    elif name == "Beats":
+        rows = zip(np.full(len(k), 1.0 / len(k)), f0 * (1 + 0.05 * (k - 1)), np.zeros(len(k)))
+    else:
+        raise ValueError(f"Unknown preset '{name}', expected one of {CHANNEL_PRESETS}")
+    return [Channel("Sine", amp, freq, phase) for amp, freq, phase in rows]
+
@@ -0,0 +1,243 @@
+"""Command-line entry point for running WaveLab computations without Streamlit.
+
+    python -m wavelab run --signal Sine --freq 5 --operation "Time Shifting" --param 0.2 -o out.npz
+    python -m wavelab batch jobs.json --out-dir results/ --format csv --workers 4
+    python -m wavelab bench -o bench.json --baseline benchmarks/baseline.json
+    python -m wavelab sweep --signal Sine --sweep freq=1:10:25 --sweep phase=-180:180:13 -o sweep.npz
+    python -m wavelab loadtest --sessions 1,2,4,8,16 --duration 30 -o load.json
+
+A batch file is a JSON list of job specs (see wavelab.jobs), each with an
+optional "output" path:
+
+    [{"signal": "Sine", "freq": 5.0, "operation": "Time Shifting", "param": 0.2, "output": "shifted.npz"}]
+
+The output extension picks the format: .npz, .npy or .csv for arrays, .html or
+.json for the figure. Outputs are written in chunks so long signals do not need
+to fit in memory, and batch jobs run on a process pool (see wavelab.export).
+"""
+import argparse
+import json
+import os
+import sys
+
+from .channels import MIX_MODES
+from .expressions import ExpressionError
+from .jobs import JOB_SIGNALS
+from .operations import OPERATIONS
+from .signals import RECORDED_SIGNAL, SIGNAL_TYPES
+from .sweep import SWEEP_PARAMS, SWEEP_SIGNALS, run_sweep, sweep_npz
+
+
+def _job_from_args(args):
+    spec = {
+        "signal": args.signal, "amp": args.amp, "freq": args.freq, "phase": args.phase,
+        "expression": args.expression, "operation": args.operation, "param": args.param,
+        "recording": args.recording, "sample_rate": args.sample_rate, "channels": args.channel, "mix": args.mix,
+        "samples": args.samples, "discrete": args.discrete
+    }
+    if args.signal2:
+        spec["signal2"] = {
+            "signal": args.signal2, "amp": args.amp2, "freq": args.freq2, "phase": args.phase2,
+            "recording": args.recording2, "sample_rate": args.sample_rate
+        }
+    return spec
+
+
+def _parse_channel(text):
+    """TYPE:AMP:FREQ[:PHASE[:SHIFT]], e.g. Sine:0.5:3 or Square:1:2:90:0.1."""
+    parts = text.split(":")
+    if not 3 <= len(parts) <= 5:
+        raise argparse.ArgumentTypeError(f"expected TYPE:AMP:FREQ[:PHASE[:SHIFT]], got '{text}'")
+    try:
+        return {"signal": parts[0], **{name: float(v) for name, v in zip(("amp", "freq", "phase", "shift"), parts[1:])}}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"channel values must be numbers, got '{text}'") from None
+
+
+def _export_options(args):
+    return {"chunk_samples": args.chunk_samples, "plotlyjs": True if args.standalone else "cdn"}
+
+
+def _run_one(spec, output, args):
+    from .export import export_job, format_summary
+
+    print(format_summary(export_job(spec, output, **_export_options(args))))
+
+
+def _batch(args):
+    from .export import export_batch, format_summary
+
+    with open(args.jobs) as f:
+        jobs = json.load(f)
+    os.makedirs(args.out_dir, exist_ok=True)
+    tasks = []
+    for i, spec in enumerate(jobs):
+        output = spec.pop("output", None) or f"job_{i:04d}.{args.format}"
+        tasks.append((spec, os.path.join(args.out_dir, output)))
+    failed = 0
+    for path, summary, error in export_batch(tasks, args.workers, **_export_options(args)):
+        if error is None:
+            print(format_summary(summary))
+        else:
+            failed += 1
+            print(f"{path}: error: {error}", file=sys.stderr)
+    if failed:
+        print(f"wavelab: {failed} of {len(tasks)} job(s) failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _add_export_options(parser):
+    parser.add_argument("--chunk-samples", type=int, default=1 << 18, help="samples computed and written per chunk")
+    parser.add_argument("--standalone", action="store_true", help="embed plotly.js in .html outputs instead of loading it from a CDN")
+
+
+def _bench(args):
+    from . import bench
+
+    sizes = [int(n) for n in args.sizes.split(",")] if args.sizes else bench.QUICK_SIZES if args.quick else bench.BENCH_SIZES
+    results = bench.run_suite(sizes, args.groups, progress=lambda r: print(bench.format_record(r)))
+    if args.output:
+        bench.write_results(results, args.output)
+    if args.save_baseline:
+        bench.write_results(results, args.save_baseline)
+        print(f"baseline written to {args.save_baseline}")
+    if args.baseline:
+        baseline = bench.load_results(args.baseline)
+        regressions = bench.compare(results, baseline, args.threshold)
+        if regressions:
+            sizes = sorted({r["samples"] for r in regressions})
+            print(f"re-measuring {len(regressions)} flagged case(s) at {', '.join(f'{n:,}' for n in sizes)} samples")
+            results = bench.merge_best(results, bench.run_suite(sizes, args.groups))
+            regressions = bench.compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {bench.format_record(r)} (baseline {r['baseline'] * 1e3:.3f} ms, x{r['ratio']:.2f})")
+        uncovered = bench.missing(results, baseline)
+        for r in uncovered:
+            print(f"NO BASELINE {bench.format_record(r)}")
+        print(f"{len(regressions)} regression(s), {len(uncovered)} case(s) without a baseline in {args.baseline}")
+        return 1 if regressions or uncovered else 0
+    return 0
+
+
+def _loadtest(args):
+    from . import loadtest
+
+    if args.url is None and args.pid is not None:
+        raise ValueError("--pid only applies to a server given with --url")
+    levels = [int(n) for n in args.sessions.split(",")]
+    if min(levels) < 1:
+        raise ValueError("--sessions must be positive")
+    results = loadtest.run_load_test(levels, args.duration, args.think, args.scripts, args.url, args.pid,
+                                     args.app or loadtest.GUI_SCRIPT, args.seed,
+                                     progress=lambda level: print(loadtest.format_level(level), flush=True))
+    for level in results["levels"]:
+        for error in level["error_samples"]:
+            print(f"{level['sessions']} sessions: {error}")
+    if args.output:
+        loadtest.write_results(results, args.output)
+    return 1 if any(level["errors"] for level in results["levels"]) else 0
+
+
+def _parse_sweep(text):
+    """'freq=1:10:25' -> ('Frequency', (1.0, 10.0, 25))."""
+    names = {arg: name for name, (arg, _, _, _) in SWEEP_PARAMS.items()}
+    try:
+        arg, spec = text.split("=")
+        lo, hi, count = spec.split(":")
+        return names[arg], (float(lo), float(hi), int(count))
+    except (KeyError, ValueError):
+        raise argparse.ArgumentTypeError(f"expected PARAM=LO:HI:COUNT with PARAM one of {', '.join(names)}, got '{text}'")
+
+
+def _sweep(args):
+    ranges = dict(args.sweep)
+    if len(ranges) != len(args.sweep) or len(ranges) > 2:
+        raise ValueError("Sweep one or two different parameters")
+    params = {"amp": args.amp, "freq": args.freq, "phase": args.phase}
+    t, swept, family = run_sweep(args.signal, params, ranges, args.samples)
+    with open(args.output, "wb") as f:
+        f.write(sweep_npz(t, swept, family, args.signal))
+    print(f"{args.output}: {args.signal} sweep of shape {family.shape}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="wavelab", description="Headless WaveLab signal computations.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="compute a single signal/operation")
+    run.add_argument("--signal", default="Sine", choices=JOB_SIGNALS)
+    run.add_argument("--amp", type=float, default=1.0)
+    run.add_argument("--freq", type=float, default=1.0)
+    run.add_argument("--phase", type=float, default=0.0)
+    run.add_argument("--expression", help="equation for 'Custom User Signal'")
+    run.add_argument("--recording", help="WAV/NPY/CSV file for 'Recorded File'")
+    run.add_argument("--sample-rate", type=float, default=1000.0, help="sample rate of NPY/CSV recordings")
+    run.add_argument("--channel", type=_parse_channel, action="append", metavar="TYPE:AMP:FREQ[:PHASE[:SHIFT]]",
+                     help="a channel of a 'Multi-channel' signal; repeat for each channel")
+    run.add_argument("--mix", default="Sum", choices=MIX_MODES, help="how 'Multi-channel' channels are combined")
+    run.add_argument("--operation", default="Amplitude Scaling", choices=list(OPERATIONS))
+    run.add_argument("--param", type=float, default=1.0)
+    run.add_argument("--signal2", choices=SIGNAL_TYPES[:-1] + [RECORDED_SIGNAL])
+    run.add_argument("--recording2", help="WAV/NPY/CSV file for a 'Recorded File' signal 2")
+    run.add_argument("--amp2", type=float, default=1.0)
+    run.add_argument("--freq2", type=float, default=1.0)
+    run.add_argument("--phase2", type=float, default=0.0)
+    run.add_argument("--samples", type=int, default=500)
+    run.add_argument("--discrete", action="store_true")
+    run.add_argument("-o", "--output", required=True, help="output file (.npz, .npy, .csv, .html or .json)")
+    _add_export_options(run)
+
+    batch = sub.add_parser("batch", help="run a JSON list of job specs")
+    batch.add_argument("jobs", help="JSON file containing a list of job specs")
+    batch.add_argument("--out-dir", default=".", help="directory for outputs without an explicit path")
+    batch.add_argument("--format", default="npz", choices=["npz", "npy", "csv", "html", "json"], help="default output format")
+    batch.add_argument("--workers", type=int, help="parallel worker processes (default: one per CPU)")
+    _add_export_options(batch)
+
+    bench = sub.add_parser("bench", help="time generation, operations and figure building")
+    bench.add_argument("--sizes", help="comma-separated sample counts (default 50 to 10M)")
+    bench.add_argument("--quick", action="store_true", help="only sample counts up to 50k")
+    bench.add_argument("--groups", nargs="+", default=["signals", "operations", "figures"], choices=["signals", "operations", "figures", "compute"])
+    bench.add_argument("-o", "--output", help="write results as JSON")
+    bench.add_argument("--baseline", help="compare against a stored results file; exit 1 on regressions or cases it does not cover")
+    bench.add_argument("--threshold", type=float, help="allowed slowdown before a case is flagged, e.g. 0.25 for 25%% (default: per group)")
+    bench.add_argument("--save-baseline", help="also write the results as a new baseline")
+
+    sweep = sub.add_parser("sweep", help="evaluate a one- or two-parameter sweep and save it as .npz")
+    sweep.add_argument("--signal", default="Sine", choices=SWEEP_SIGNALS)
+    sweep.add_argument("--sweep", type=_parse_sweep, action="append", required=True, metavar="PARAM=LO:HI:COUNT",
+                       help="swept parameter (amp, freq or phase); give once or twice")
+    sweep.add_argument("--amp", type=float, default=1.0)
+    sweep.add_argument("--freq", type=float, default=1.0)
+    sweep.add_argument("--phase", type=float, default=0.0)
+    sweep.add_argument("--samples", type=int, default=500)
+    sweep.add_argument("-o", "--output", required=True, help="output .npz file")
+
+    load = sub.add_parser("loadtest", help="measure latency, throughput and memory of the app under concurrent sessions")
+    load.add_argument("--sessions", default="1,2,4,8,16", help="comma-separated concurrency levels")
+    load.add_argument("--duration", type=float, default=30.0, help="seconds each level runs")
+    load.add_argument("--think", type=float, default=1.0, help="seconds a user pauses between steps (0 for back-to-back reruns)")
+    load.add_argument("--scripts", nargs="+", choices=["drag", "operation", "equation", "navigate"], help="interaction scripts to replay (default: all)")
+    load.add_argument("--url", help="websocket URL of a running server, e.g. ws://127.0.0.1:8501 (default: start one)")
+    load.add_argument("--pid", type=int, help="process id of the --url server, for memory figures")
+    load.add_argument("--app", help="Streamlit script to serve when no --url is given (default: gui.py)")
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("-o", "--output", help="write results as JSON")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "bench":
+            return _bench(args)
+        if args.command == "loadtest":
+            return _loadtest(args)
+        if args.command == "sweep":
+            return _sweep(args)
+        if args.command == "batch":
+            return _batch(args)
+        _run_one(_job_from_args(args), args.output, args)
+    except (ExpressionError, ValueError, OSError, RuntimeError) as e:
+        print(f"wavelab: error: {e}", file=sys.stderr)
+        return 1
+    return 0
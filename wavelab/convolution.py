@@ -0,0 +1,137 @@
+"""Convolution and correlation with automatic choice of algorithm.
+
+Three equivalent ways to compute a full linear convolution of lengths n and m:
+
+- "direct": `np.convolve`, O(n·m); fastest when either signal is short;
+- "fft": one zero-padded rfft/irfft of length >= n + m - 1, O(L log L);
+- "overlap-add": the long signal is cut into blocks that are transformed in
+  one batched rfft against the short signal's spectrum; best when one signal
+  is much longer than the other.
+
+`choose_method` compares rough operation counts for the given lengths, and
+`convolve` reports which method ran and how long it took.
+"""
+import time
+
+import numpy as np
+
+CONVOLUTION_METHODS = ["direct", "fft", "overlap-add"]
+# Relative costs, in units of one multiply-add of np.convolve: per L·log2(L)
+# element of an FFT, and fixed per FFT call.
+_FFT_COST = 5.0
+_FFT_CALL_COST = 50_000
+
+
+def next_fast_len(n):
+    """Smallest 2^a·3^b·5^c >= n; pocketfft is fastest on these sizes."""
+    best = 1 << max(int(n - 1).bit_length(), 0)
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            q = p35
+            while q < n:
+                q *= 2
+            best = min(best, q)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def _fft_cost(length):
+    return _FFT_COST * length * np.log2(max(length, 2)) + _FFT_CALL_COST
+
+
+def _oa_block(m):
+    """Block (FFT) size for overlap-add with a kernel of length m."""
+    return next_fast_len(8 * m)
+
+
+def choose_method(n, m):
+    """Cheapest method for a full convolution of lengths n and m."""
+    short, long_ = sorted((n, m))
+    costs = {
+        "direct": float(n) * m,
+        "fft": 3 * _fft_cost(next_fast_len(n + m - 1)),
+    }
+    block = _oa_block(short)
+    if long_ > 2 * block:
+        n_blocks = -(-long_ // (block - short + 1))
+        costs["overlap-add"] = 2 * (n_blocks * _FFT_COST * block * np.log2(block) + _FFT_CALL_COST) + _fft_cost(block)
+    return min(costs, key=costs.get)
+
+
+def _fft_convolve(a, b):
+    size = len(a) + len(b) - 1
+    nfft = next_fast_len(size)
+    spec = np.fft.rfft(a, nfft)
+    spec *= np.fft.rfft(b, nfft)
+    return np.fft.irfft(spec, nfft)[:size]
+
+
+def _overlap_add(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    n, m = len(a), len(b)
+    block = _oa_block(m)
+    step = block - m + 1
+    n_blocks = -(-n // step)
+    padded = np.zeros(n_blocks * step)
+    padded[:n] = a
+    segments = np.fft.rfft(padded.reshape(n_blocks, step), block, axis=1)
+    segments *= np.fft.rfft(b, block)
+    pieces = np.fft.irfft(segments, block, axis=1)
+    out = np.zeros((n_blocks + 1) * step)
+    out[:n_blocks * step] = pieces[:, :step].ravel()
+    # Each block's tail (m - 1 samples) overlaps the start of the next block.
+    out[step:].reshape(n_blocks, step)[:, :m - 1] += pieces[:, step:step + m - 1]
+    return out[:n + m - 1]
+
+
+def convolve(a, b, method=None):
+    """Full linear convolution; returns (result, method, seconds)."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    method = method or choose_method(len(a), len(b))
+    start = time.perf_counter()
+    if method == "direct":
+        out = np.convolve(a, b)
+    elif method == "fft":
+        out = _fft_convolve(a, b)
+    elif method == "overlap-add":
+        out = _overlap_add(a, b)
+    else:
+        raise ValueError(f"Unknown convolution method '{method}', expected one of {CONVOLUTION_METHODS}")
+    return out, method, time.perf_counter() - start
+
+
+def _ascending(t, y):
+    if len(t) > 1 and t[-1] < t[0]:
+        return t[::-1], y[::-1]
+    return t, y
+
+
+def convolution_operation(operation, t1, y1, t2=None, y2=None, method=None):
+    """Apply Convolution, Cross-correlation or Auto-correlation on uniform grids.
+
+    Sums are scaled by the sample spacing so they approximate the continuous
+    integrals. Returns (t_out, y_out, info) where info describes the run.
+    """
+    t1, y1 = _ascending(np.asarray(t1), np.asarray(y1))
+    dt = (t1[-1] - t1[0]) / (len(t1) - 1) if len(t1) > 1 else 1.0
+    if operation == "Auto-correlation":
+        t2, y2 = t1, y1
+    else:
+        t2, y2 = _ascending(np.asarray(t2), np.asarray(y2))
+
+    if operation == "Convolution":
+        out, used, seconds = convolve(y1, y2, method)
+        t0 = t1[0] + t2[0]
+    else:
+        # r[k] = sum_n y1[n + k] · y2[n], for lags k = -(m - 1) .. n - 1.
+        out, used, seconds = convolve(y1, y2[::-1], method)
+        t0 = t1[0] - t2[0] - (len(y2) - 1) * dt
+    out *= dt
+    t_out = t0 + np.arange(len(out)) * dt
+    info = {"operation": operation, "method": used, "seconds": seconds, "n": len(y1), "m": len(y2)}
+    return t_out, out, info
@@ -0,0 +1,111 @@
+"""Reduce long traces to roughly screen width before they are plotted.
+
+Computation always happens at full resolution; only the arrays handed to the
+figure builders are decimated. Two methods are available:
+
+- "minmax": keeps the minimum and maximum of each bucket, so peaks and the
+  signal envelope survive exactly. Fully vectorized.
+- "lttb": Largest-Triangle-Three-Buckets, which keeps the visually most
+  significant point per bucket and gives smoother-looking lines.
+
+`decimate_channels` applies the min/max envelope to every row of a
+multi-channel bank at once.
+"""
+import numpy as np
+
+DECIMATION_METHODS = ["minmax", "lttb"]
+DEFAULT_MAX_POINTS = 2000
+
+
+def _window(x, x_range):
+    """Index range [lo, hi) of `x` inside `x_range`, for monotonic `x`."""
+    n = len(x)
+    if x_range is None or n == 0:
+        return 0, n
+    lo_val, hi_val = min(x_range), max(x_range)
+    if x[0] <= x[-1]:
+        lo = np.searchsorted(x, lo_val, side="left")
+        hi = np.searchsorted(x, hi_val, side="right")
+    else:
+        # Descending axis, e.g. after time reversal.
+        lo = n - np.searchsorted(x[::-1], hi_val, side="right")
+        hi = n - np.searchsorted(x[::-1], lo_val, side="left")
+    # Keep one neighbour on each side so the line reaches the window edges.
+    return max(lo - 1, 0), min(hi + 1, n)
+
+
+def minmax_decimate(x, y, max_points):
+    """Min/max envelope: at most `max_points` points, in original order."""
+    if len(y) <= max_points:
+        return x, y
+    idx = _minmax_index(y, max_points)
+    return x[idx], y[idx]
+
+
+def _minmax_index(y, max_points):
+    """Indices (along the last axis) of the min/max envelope of each row of `y`, in original order."""
+    n = y.shape[-1]
+    size = -(-n // max(max_points // 2, 1))
+    n_full = n // size
+    body = y[..., :n_full * size].reshape(*y.shape[:-1], n_full, size)
+    offsets = np.arange(n_full) * size
+    idx_min = body.argmin(axis=-1) + offsets
+    idx_max = body.argmax(axis=-1) + offsets
+    idx = np.stack([np.minimum(idx_min, idx_max), np.maximum(idx_min, idx_max)], axis=-1).reshape(*y.shape[:-1], -1)
+    if n_full * size < n:
+        tail = y[..., n_full * size:]
+        tail_idx = np.sort(np.stack([tail.argmin(axis=-1), tail.argmax(axis=-1)], axis=-1), axis=-1) + n_full * size
+        idx = np.concatenate([idx, tail_idx], axis=-1)
+    return idx
+
+
+def lttb_decimate(x, y, max_points):
+    """Largest-Triangle-Three-Buckets down-sampling to `max_points` points."""
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return x, y
+    xf = np.asarray(x, dtype=float)
+    yf = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    out = np.empty(max_points, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    prev = 0
+    for i in range(max_points - 2):
+        start, stop = edges[i], max(edges[i + 1], edges[i] + 1)
+        nxt_start, nxt_stop = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        nxt_stop = max(nxt_stop, nxt_start + 1)
+        avg_x = xf[nxt_start:nxt_stop].mean()
+        avg_y = yf[nxt_start:nxt_stop].mean()
+        bx, by = xf[start:stop], yf[start:stop]
+        area = np.abs((xf[prev] - avg_x) * (by - yf[prev]) - (xf[prev] - bx) * (avg_y - yf[prev]))
+        prev = start + int(area.argmax())
+        out[i + 1] = prev
+    return x[out], y[out]
+
+
+def decimate(x, y, max_points=DEFAULT_MAX_POINTS, method="minmax", x_range=None):
+    """Crop to `x_range` (if given) and reduce the trace to about `max_points` points."""
+    if y is None:
+        return x, None
+    x = np.asarray(x)
+    y = np.asarray(y)
+    lo, hi = _window(x, x_range)
+    x, y = x[lo:hi], y[lo:hi]
+    if method == "lttb":
+        return lttb_decimate(x, y, max_points)
+    return minmax_decimate(x, y, max_points)
+
+
+def decimate_channels(x, bank, max_points=DEFAULT_MAX_POINTS, x_range=None):
+    """Min/max envelope of every row of a (channels, n) bank sharing the axis `x`, in one vectorized pass.
+
+    Returns (x, bank) arrays of shape (channels, m) with m at most about `max_points`.
+    """
+    x = np.asarray(x)
+    bank = np.asarray(bank)
+    lo, hi = _window(x, x_range)
+    x, bank = x[lo:hi], bank[:, lo:hi]
+    if len(x) <= max_points:
+        return np.broadcast_to(x, bank.shape), bank
+    idx = _minmax_index(bank, max_points)
+    return x[idx], np.take_along_axis(bank, idx, axis=1)
@@ -0,0 +1,304 @@
+"""Streaming export of job specs to NPZ, NPY, CSV or figure files.
+
+A job (see wavelab.jobs) is computed and written in chunks of `chunk_samples`
+samples, so memory stays flat however long the signal is:
+
+- the time axis of each chunk is the matching slice of `time_grid`;
+- signals are generated and the operation chain is run with the allocation-free
+  workspace functions, reusing one set of buffers for every chunk;
+- every chunk is appended to the output before the next one is computed.
+
+Chunks are independent only when every output sample depends on the same input
+sample. Filters are the exception: they carry their state from one chunk to the
+next, unless a Time Reversal before them makes them run from the last sample
+back. Jobs with convolution or correlation, a Time Scaling factor of zero, an
+Impulse (also as a channel of a multi-channel signal), a filter on a reversed
+axis, or a custom equation that is not element-wise (e.g. uses `np.cumsum`)
+are computed in memory and then written through the same writers.
+
+Output formats, picked by the file extension:
+
+- .npz: one array per column, like `np.savez` (columns keep their own lengths);
+- .npy: one structured array with a field per column;
+- .csv: a header row and one row per sample;
+
+Signal 2 is written with its own axis `t_s2`, the axis the chain sampled it on.
+- .html/.json: the chart, built from a min/max envelope of each trace.
+
+In .npy and .csv files, columns shorter than the longest one (the input after a
+convolution) are padded with NaN. `export_batch` runs many jobs on a process pool.
+"""
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .decimate import DEFAULT_MAX_POINTS, minmax_decimate
+from .expressions import is_elementwise
+from .jobs import DEFAULT_JOB, build_figure, compute_job, job_channels, job_recording, job_steps, validate_job
+from .operations import CONVOLUTION_OPERATIONS, FILTER_OPERATIONS
+from .pipeline import chain_label, param_display
+from .signals import CUSTOM_SIGNAL, MULTICHANNEL_SIGNAL
+from .workspace import Workspace, generate_into, run_chain
+
+EXPORT_FORMATS = [".npz", ".npy", ".csv", ".html", ".json"]
+EXPORT_CHUNK = 1 << 18
+COLUMNS = ("t", "s1", "t_s2", "s2", "t_processed", "s_processed")
+# (x column, y column) of each figure trace.
+_FIGURE_TRACES = (("t", "s1"), ("t_s2", "s2"), ("t_processed", "s_processed"))
+
+
+def is_streamable(spec, steps):
+    """True if the job can be computed chunk by chunk (see the module docstring)."""
+    signals = [spec["signal"]] + [step.signal2[0] for step in steps if step.signal2 is not None]
+    if spec["signal"] == MULTICHANNEL_SIGNAL:
+        signals += [channel.signal for channel in job_channels(spec).channels]
+    if "Impulse" in signals:
+        return False
+    if spec["signal"] == CUSTOM_SIGNAL and not is_elementwise(spec["expression"]):
+        return False
+    reversed_axis = False
+    for step in steps:
+        reversed_axis ^= step.operation == "Time Reversal"
+        if reversed_axis and step.operation in FILTER_OPERATIONS:
+            return False
+    return not any(
+        step.operation in CONVOLUTION_OPERATIONS or (step.operation == "Time Scaling" and step.param <= 1e-9)
+        for step in steps
+    )
+
+
+def _grid_chunk(out, num_samples, start, stop, lo):
+    """Samples lo..lo+len(out) of time_grid(num_samples, start, stop), bit for bit."""
+    out[:] = np.arange(lo, lo + len(out))
+    out *= (stop - start) / (num_samples - 1)
+    out += start
+    if lo + len(out) == num_samples:
+        out[-1] = stop
+    return out
+
+
+def _streamed_chunks(spec, steps, source, num_samples, stop, chunk_samples):
+    ws = Workspace()
+    filters = {}
+    dt = stop / (num_samples - 1) if num_samples > 1 else 0.0
+    for lo in range(0, num_samples, chunk_samples):
+        n = min(chunk_samples, num_samples - lo)
+        t = _grid_chunk(ws.buffer("t_chunk", n), num_samples, 0.0, stop, lo)
+        scratch = ws.buffer("s1_scratch", n) if spec["signal"] == "Sawtooth" else None
+        s1 = generate_into(spec["signal"], t, spec["amp"], spec["freq"], spec["phase"], ws.buffer("s1", n), scratch,
+                           spec["expression"], source)
+        t_processed, s_processed, signal2, _ = run_chain(ws, t, s1, steps, filters, dt)
+        t_s2, s2 = signal2[0] if signal2 else (None, None)
+        yield {"t": t, "s1": s1, "t_s2": t_s2, "s2": s2, "t_processed": t_processed, "s_processed": s_processed}
+
+
+def _sliced_chunks(result, rows, chunk_samples):
+    for lo in range(0, rows, chunk_samples):
+        yield {name: result[name][lo:lo + chunk_samples] if result[name] is not None else None for name in COLUMNS}
+
+
+class _ArrayWriter:
+    """Base for writers that receive columns chunk by chunk; `lengths` gives each column's total length."""
+
+    def __init__(self, path, lengths):
+        self.path = path
+        self.lengths = lengths
+        self.rows = max(lengths.values())
+
+    def close(self):
+        pass
+
+
+class _NpzWriter(_ArrayWriter):
+    """Each column goes to a temporary .npy file; close() stores them in the archive."""
+
+    def __init__(self, path, lengths):
+        super().__init__(path, lengths)
+        self._dir = tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path)))
+        self._files = {}
+        for name, length in lengths.items():
+            f = self._files[name] = open(os.path.join(self._dir.name, f"{name}.npy"), "wb")
+            np.lib.format.write_array_header_1_0(f, {"descr": "<f8", "fortran_order": False, "shape": (length,)})
+
+    def write(self, columns):
+        for name, f in self._files.items():
+            np.ascontiguousarray(columns[name], dtype="<f8").tofile(f)
+
+    def close(self):
+        try:
+            with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for name, f in self._files.items():
+                    f.close()
+                    archive.write(f.name, f"{name}.npy")
+        finally:
+            for f in self._files.values():
+                f.close()
+            self._dir.cleanup()
+
+
+def _padded(columns, names, rows, dtype):
+    """One structured chunk of `rows` rows; missing values are NaN."""
+    block = np.full(rows, np.nan, dtype=dtype)
+    for name in names:
+        values = columns[name]
+        block[name][:len(values)] = values
+    return block
+
+
+class _NpyWriter(_ArrayWriter):
+    def __init__(self, path, lengths):
+        super().__init__(path, lengths)
+        self.dtype = np.dtype([(name, "<f8") for name in lengths])
+        self._file = open(path, "wb")
+        np.lib.format.write_array_header_1_0(self._file, {
+            "descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": (self.rows,)
+        })
+
+    def write(self, columns):
+        rows = max(len(columns[name]) for name in self.lengths)
+        _padded(columns, self.lengths, rows, self.dtype).tofile(self._file)
+
+    def close(self):
+        self._file.close()
+
+
+class _CsvWriter(_ArrayWriter):
+    def __init__(self, path, lengths):
+        super().__init__(path, lengths)
+        self.dtype = np.dtype([(name, "<f8") for name in lengths])
+        self._file = open(path, "w", newline="")
+        self._file.write(",".join(lengths) + "\n")
+
+    def write(self, columns):
+        rows = max(len(columns[name]) for name in self.lengths)
+        block = _padded(columns, self.lengths, rows, self.dtype)
+        np.savetxt(self._file, block.view("<f8").reshape(rows, -1), fmt="%.10g", delimiter=",")
+
+    def close(self):
+        self._file.close()
+
+
+class _FigureWriter(_ArrayWriter):
+    """Keeps a min/max envelope of about `max_points` points per trace and writes the chart on close()."""
+
+    def __init__(self, path, lengths, result, max_points=DEFAULT_MAX_POINTS, plotlyjs="cdn"):
+        super().__init__(path, lengths)
+        self.result = result
+        self.max_points = max_points
+        self.plotlyjs = plotlyjs
+        self._traces = {y: ([], []) for x, y in _FIGURE_TRACES if y in lengths}
+
+    def write(self, columns):
+        for x_name, y_name in _FIGURE_TRACES:
+            if y_name not in self._traces:
+                continue
+            x, y = columns[x_name], columns[y_name]
+            n = min(len(x), len(y))
+            if n == 0:
+                continue
+            budget = max(2, -(-self.max_points * n // self.lengths[y_name]))
+            x, y = minmax_decimate(x[:n], y[:n], budget)
+            self._traces[y_name][0].append(np.array(x))
+            self._traces[y_name][1].append(np.array(y))
+
+    def close(self):
+        traces = {name: (np.concatenate(xs), np.concatenate(ys)) for name, (xs, ys) in self._traces.items()}
+        none = (None, None)
+        fig = build_figure({
+            **self.result, "t": traces["s1"][0], "s1": traces["s1"][1], "t_s2": traces.get("s2", none)[0], "s2": traces.get("s2", none)[1],
+            "t_processed": traces["s_processed"][0], "s_processed": traces["s_processed"][1]
+        })
+        if self.path.lower().endswith(".html"):
+            fig.write_html(self.path, include_plotlyjs=self.plotlyjs)
+        else:
+            with open(self.path, "w") as f:
+                f.write(fig.to_json())
+
+
+def _open_writer(path, lengths, result, plotlyjs):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npz":
+        return _NpzWriter(path, lengths)
+    if ext == ".npy":
+        return _NpyWriter(path, lengths)
+    if ext == ".csv":
+        return _CsvWriter(path, lengths)
+    if ext in (".html", ".json"):
+        return _FigureWriter(path, lengths, result, plotlyjs=plotlyjs)
+    raise ValueError(f"Unsupported output format '{ext}' (use {', '.join(EXPORT_FORMATS)})")
+
+
+def _write(path, chunks, lengths, result, plotlyjs):
+    writer = _open_writer(path, lengths, result, plotlyjs)
+    try:
+        for columns in chunks:
+            writer.write({name: columns[name] for name in lengths})
+    finally:
+        writer.close()
+
+
+def write_result(result, path, chunk_samples=EXPORT_CHUNK, plotlyjs="cdn"):
+    """Write an in-memory job result (see wavelab.jobs.compute_job) to `path`."""
+    lengths = {name: len(result[name]) for name in COLUMNS if result[name] is not None}
+    rows = max(lengths.values())
+    _write(path, _sliced_chunks(result, rows, chunk_samples), lengths, result, plotlyjs)
+
+
+def export_job(spec, path, chunk_samples=EXPORT_CHUNK, plotlyjs="cdn"):
+    """Compute the job `spec` and write it to `path`, streaming when possible.
+
+    Returns a summary dict: signal, label, samples and whether it was streamed.
+    `plotlyjs` is passed to Plotly's write_html ("cdn", or True to embed it).
+    """
+    spec = {**DEFAULT_JOB, **spec}
+    validate_job(spec)
+    steps = job_steps(spec)
+    summary = {"path": path, "signal": spec["signal"], "label": chain_label(steps), "samples": int(spec["samples"])}
+    if not is_streamable(spec, steps):
+        result = compute_job(spec)
+        write_result(result, path, chunk_samples, plotlyjs)
+        return {**summary, "label": result["label"], "streamed": False}
+
+    recording = job_recording(spec)
+    num_samples = int(spec["samples"])
+    stop = recording.duration if recording else 1.0
+    names = [name for name in COLUMNS if name not in ("t_s2", "s2") or any(step.signal2 is not None for step in steps)]
+    lengths = dict.fromkeys(names, num_samples)
+    result = {"spec": spec, "label": summary["label"], "param_display": param_display(steps)}
+    chunks = _streamed_chunks(spec, steps, recording or job_channels(spec), num_samples, stop, int(chunk_samples))
+    _write(path, chunks, lengths, result, plotlyjs)
+    return {**summary, "streamed": True}
+
+
+def _export_task(spec, path, chunk_samples, plotlyjs):
+    """export_job for a pool worker: (summary, None) or (None, error message); exceptions may not pickle."""
+    try:
+        return export_job(spec, path, chunk_samples, plotlyjs), None
+    except (ValueError, OSError) as e:
+        return None, str(e)
+
+
+def export_batch(tasks, workers=None, chunk_samples=EXPORT_CHUNK, plotlyjs="cdn"):
+    """Run (spec, path) tasks on a process pool; yields (path, summary or None, error or None) as jobs finish.
+
+    `workers` defaults to the number of CPUs; with 1 the jobs run in this process.
+    """
+    tasks = list(tasks)
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1 or len(tasks) <= 1:
+        for spec, path in tasks:
+            yield (path, *_export_task(spec, path, chunk_samples, plotlyjs))
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(_export_task, spec, path, chunk_samples, plotlyjs): path for spec, path in tasks}
+        for future in as_completed(futures):
+            yield (futures[future], *future.result())
+
+
+def format_summary(summary):
+    note = "" if summary["streamed"] else ", in memory"
+    return f"{summary['path']}: {summary['signal']} -> {summary['label']} ({summary['samples']:,} samples{note})"
+
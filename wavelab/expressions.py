@@ -0,0 +1,209 @@
+"""Compiled, cached evaluation of user-defined signal equations.
+
+Equations are parsed once into an AST, checked against the allowed names and
+compiled to a code object. Code objects are kept in a bounded LRU cache keyed by
+the normalized expression text, so Streamlit reruns only pay for evaluation.
+This lives outside gui.py on purpose: Streamlit re-executes the script on every
+rerun, which would throw away any cache defined at its module level.
+
+Long time axes are evaluated by the "threads" backend when the equation is
+element-wise (only arithmetic, comparisons and NumPy ufuncs of `t`): `t` is cut
+into cache-sized chunks that a thread pool evaluates in parallel, each chunk
+writing into its slice of one preallocated output. Ufuncs release the GIL, so
+the chunks run on all cores, and temporaries stay chunk-sized instead of one
+full-length array per operator. Anything else (`np.cumsum(t)`, `t[0]`, ...)
+falls back to evaluating the whole array at once, as does WAVELAB_EVAL_BACKEND=numpy.
+"""
+import ast
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+# --- ALLOWED NAMES ---
+# `t` is bound per call; everything else is fixed.
+ALLOWED_NAMES = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "exp": np.exp, "sqrt": np.sqrt, "log": np.log,
+    "pi": np.pi, "np": np, "abs": np.abs,
+    "sign": np.sign, "heaviside": np.heaviside
+}
+TIME_VARIABLE = "t"
+EXPRESSION_CACHE_SIZE = 256
+
+# --- EVALUATION BACKENDS ---
+EVAL_BACKENDS = ["numpy", "threads"]
+EVAL_BACKEND = os.environ.get("WAVELAB_EVAL_BACKEND", "threads")
+EVAL_THREADS = int(os.environ.get("WAVELAB_EVAL_THREADS", 0)) or min(os.cpu_count() or 1, 8)
+CHUNK_SAMPLES = 1 << 16             # 512 KB per float64 temporary, about an L2 cache
+PARALLEL_MIN_SAMPLES = 1 << 18
+
+# Syntax that has no place in a signal equation and could be used to escape the
+# name whitelist (comprehensions and lambdas bind their own names).
+_FORBIDDEN_NODES = (
+    ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp,
+    ast.NamedExpr, ast.Await, ast.Yield, ast.YieldFrom, ast.JoinedStr
+)
+
+
+class ExpressionError(ValueError):
+    """A custom equation that could not be parsed, validated or evaluated."""
+
+    def __init__(self, message, expression, kind="syntax", offset=None):
+        super().__init__(message)
+        self.message = message
+        self.expression = expression
+        self.kind = kind          # "syntax", "name", "evaluation", "memory", "limit" or "cancelled" (see wavelab.sandbox)
+        self.offset = offset      # 1-based column, when known
+
+    def __str__(self):
+        if self.offset:
+            return f"{self.message} (column {self.offset})"
+        return self.message
+
+
+def normalize_expression(expression):
+    """Collapse whitespace so trivially different spellings share a cache entry."""
+    return " ".join(str(expression).split())
+
+
+def _validate(tree, expression):
+    for node in ast.walk(tree):
+        offset = getattr(node, "col_offset", None)
+        offset = offset + 1 if offset is not None else None
+        if isinstance(node, _FORBIDDEN_NODES):
+            raise ExpressionError(f"'{type(node).__name__}' is not allowed in an equation", expression, "syntax", offset)
+        if isinstance(node, ast.Name) and node.id != TIME_VARIABLE and node.id not in ALLOWED_NAMES:
+            raise ExpressionError(f"Unknown name '{node.id}'", expression, "name", offset)
+        if isinstance(node, ast.Attribute):
+            if node.attr.startswith("_"):
+                raise ExpressionError(f"Private attribute '{node.attr}' is not allowed", expression, "name", offset)
+            if not (isinstance(node.value, ast.Name) and node.value.id == "np"):
+                raise ExpressionError("Attribute access is only allowed on 'np'", expression, "name", offset)
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def _compile_normalized(expression):
+    if not expression:
+        raise ExpressionError("Equation is empty", expression, "syntax")
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Syntax error: {e.msg}", expression, "syntax", e.offset) from None
+    _validate(tree, expression)
+    return compile(tree, "<custom signal>", "eval")
+
+
+def compile_expression(expression):
+    """Return the cached code object for an equation, raising ExpressionError if invalid."""
+    return _compile_normalized(normalize_expression(expression))
+
+
+def validate_expression(expression):
+    """Return None if the equation compiles, otherwise the ExpressionError."""
+    try:
+        compile_expression(expression)
+    except ExpressionError as e:
+        return e
+    return None
+
+
+def _is_elementwise_node(node):
+    if isinstance(node, ast.MatMult):
+        return False
+    if isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Load, ast.operator, ast.unaryop, ast.cmpop)):
+        return True
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, (int, float))
+    if isinstance(node, ast.Name):
+        # `np` itself is fine: the Attribute check decides what is taken from it.
+        return node.id in (TIME_VARIABLE, "np") or isinstance(ALLOWED_NAMES.get(node.id), (float, np.ufunc))
+    if isinstance(node, ast.Attribute):
+        return isinstance(getattr(np, node.attr, None), (float, np.ufunc))
+    if isinstance(node, ast.Call):
+        return not node.keywords
+    return False
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def _elementwise_normalized(expression):
+    tree = ast.parse(expression, mode="eval")
+    return all(_is_elementwise_node(node) for node in ast.walk(tree))
+
+
+def is_elementwise(expression):
+    """True if every output sample depends only on the same sample of `t`, so the equation can be chunked.
+
+    The equation must already be valid (see compile_expression).
+    """
+    return _elementwise_normalized(normalize_expression(expression))
+
+
+def _evaluate(code, expression, t):
+    namespace = dict(ALLOWED_NAMES)
+    namespace[TIME_VARIABLE] = t
+    try:
+        with np.errstate(all='ignore'):
+            return eval(code, {"__builtins__": None}, namespace)
+    except MemoryError as e:
+        raise ExpressionError(f"Out of memory: {e}", expression, "memory") from None
+    except Exception as e:
+        raise ExpressionError(f"{type(e).__name__}: {e}", expression, "evaluation") from None
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _chunk_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(EVAL_THREADS, thread_name_prefix="wavelab-eval")
+        return _executor
+
+
+def _evaluate_chunked(code, expression, t, out):
+    def run(lo):
+        # errstate is per thread, so _evaluate sets it inside each chunk.
+        out[lo:lo + CHUNK_SAMPLES] = _evaluate(code, expression, t[lo:lo + CHUNK_SAMPLES])
+
+    for _ in _chunk_executor().map(run, range(0, len(t), CHUNK_SAMPLES)):
+        pass
+    return out
+
+
+def evaluate_custom_signal(expression, t, out=None, backend=None):
+    """Evaluate a user equation over `t`, raising ExpressionError on failure.
+
+    `out` (a float array shaped like `t`) receives the result if given.
+    `backend` overrides EVAL_BACKEND; the "threads" backend is only used for
+    element-wise equations over at least PARALLEL_MIN_SAMPLES samples.
+    """
+    code = compile_expression(expression)
+    backend = backend or EVAL_BACKEND
+    if backend not in EVAL_BACKENDS:
+        raise ValueError(f"Unknown evaluation backend '{backend}', expected one of {EVAL_BACKENDS}")
+    if backend == "threads" and np.ndim(t) == 1 and len(t) >= PARALLEL_MIN_SAMPLES and is_elementwise(expression):
+        return _evaluate_chunked(code, expression, t, np.empty(len(t)) if out is None else out)
+
+    result = _evaluate(code, expression, t)
+    if np.isscalar(result):
+        result = np.full_like(t, result, dtype=float)
+    result = np.asarray(result, dtype=float)
+    if result.shape != np.shape(t):
+        try:
+            result = np.broadcast_to(result, np.shape(t)).copy()
+        except ValueError:
+            raise ExpressionError(f"Equation produced shape {result.shape}, expected {np.shape(t)}", expression, "evaluation") from None
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+
+def expression_cache_info():
+    """Hit/miss statistics of the compiled-expression cache."""
+    return _compile_normalized.cache_info()
@@ -0,0 +1,365 @@
+"""Plotly figure builders for the visualizer.
+
+Traces are kept small on the wire: constant labels go into the trace name and
+hover template instead of per-point `text` arrays, evenly spaced time axes are
+sent as `x0`/`dx` rather than as arrays, and NumPy data is passed through so
+Plotly encodes it as base64 typed arrays.
+
+Traces with more than WEBGL_THRESHOLD points (env WAVELAB_WEBGL_POINTS) are
+drawn with WebGL (`Scattergl`) instead of SVG. Discrete signals are a single
+stem trace, NaN-separated stems plus markers on the tips, rather than one bar
+per sample. The channels of a multi-channel signal are likewise one
+NaN-separated trace, however many there are.
+"""
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+from .theme import NEON_DARK
+
+WEBGL_THRESHOLD = int(os.environ.get("WAVELAB_WEBGL_POINTS", 2000))
+STEM_MARKER_SIZE = 6
+
+
+def add_watermark(fig, text="MyWavelab"):
+    """Add a faint centered watermark to a Plotly figure."""
+    fig.add_annotation(
+        text=text,
+        x=0.5,
+        y=0.5,
+        xref="paper",
+        yref="paper",
+        showarrow=False,
+        font=dict(size=50, color="rgba(255,255,255,0.08)", family="Montserrat, sans-serif"),
+        align="center"
+    )
+
+
+def figure_payload_bytes(fig):
+    """Size of the JSON Streamlit sends to the browser for this figure."""
+    return len(fig.to_json(validate=False).encode("utf-8"))
+
+
+def _coords(x, y):
+    """x0/dx for an evenly spaced axis, otherwise the x array itself."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) > 2:
+        dx = (x[-1] - x[0]) / (len(x) - 1)
+        if dx != 0 and np.allclose(np.diff(x), dx, rtol=1e-6, atol=0):
+            return dict(x0=float(x[0]), dx=float(dx), y=y)
+    return dict(x=x, y=y)
+
+
+def _stem_coords(x, y):
+    """x, y and marker sizes of a stem plot: tip, baseline and a NaN gap per sample, markers on the tips only.
+
+    y is sent as float32 to keep the tripled arrays small on the wire; x stays float64,
+    since float32 would move stems off their samples at large absolute times.
+    """
+    y = np.asarray(y, dtype=np.float32)
+    xs = np.repeat(np.asarray(x, dtype=np.float64), 3)
+    ys = np.empty(3 * len(y), dtype=np.float32)
+    ys[0::3] = y
+    ys[1::3] = 0.0
+    ys[2::3] = np.nan
+    sizes = np.tile(np.array([STEM_MARKER_SIZE, 0, 0], dtype=np.uint8), len(y))
+    return xs, ys, sizes
+
+
+def use_webgl(n_points):
+    """Whether a trace of `n_points` points is drawn with Scattergl."""
+    return n_points > WEBGL_THRESHOLD
+
+
+def _scatter_type(n_points):
+    return go.Scattergl if use_webgl(n_points) else go.Scatter
+
+
+def _set_coords(trace, x, y, is_discrete=False):
+    """Replace a trace's data in place, clearing whichever x encoding is unused."""
+    if is_discrete:
+        xs, ys, sizes = _stem_coords(x, y)
+        trace.update(x=xs, x0=0, dx=1, y=ys, marker_size=sizes)
+        return
+    coords = _coords(x, y)
+    trace.update(x=coords.get("x"), x0=coords.get("x0", 0), dx=coords.get("dx", 1), y=coords["y"])
+
+
+def _chart_title(op_name, param_val):
+    return f"Operation: {op_name} (Param: {param_val:.2f})" if param_val else op_name
+
+
+def _hover(label, time_label="Time"):
+    return f"<b>{label}</b><br>{time_label}: %{{x:.2f}}<br>Amp: %{{y:.2f}}<extra></extra>"
+
+
+def _trace(x, y, label, color, is_discrete, time_label="Time", line=None, **kwargs):
+    """Stem (discrete) or line (continuous) trace with a constant hover label, in WebGL when it is long."""
+    scatter = _scatter_type(len(y))
+    if is_discrete:
+        xs, ys, sizes = _stem_coords(x, y)
+        return scatter(
+            x=xs, y=ys, mode='lines+markers', line=dict(color=color, width=1.5), marker=dict(color=color, size=sizes),
+            hovertemplate=_hover(label, time_label), **kwargs
+        )
+    return scatter(**_coords(x, y), mode='lines', line=dict(color=color, **(line or {})), hovertemplate=_hover(label, time_label), **kwargs)
+
+
+def create_plotly_chart(t_s1, y_s1, t_s2, y_s2, t_proc, y_proc, op_name, is_discrete, param_val):
+    fig = go.Figure()
+
+    # 1. Signal 1
+    fig.add_trace(_trace(t_s1, y_s1, "Signal 1", NEON_DARK['SIGNAL1'], is_discrete, name="Signal 1", line=dict(width=2)))
+
+    # 2. Signal 2
+    if y_s2 is not None:
+        fig.add_trace(_trace(t_s2, y_s2, "Signal 2", NEON_DARK['SIGNAL2'], is_discrete, name="Signal 2", line=dict(width=2, dash='dash')))
+
+    # 3. Processed
+    label_proc = "Processed"
+    if is_discrete:
+        fig.add_trace(_trace(t_proc, y_proc, label_proc, NEON_DARK['RESULT'], is_discrete, name=label_proc, opacity=0.8))
+    else:
+        fig.add_trace(_trace(t_proc, y_proc, label_proc, NEON_DARK['RESULT'], is_discrete, name=label_proc, line=dict(width=4)))
+
+    fig.update_layout(
+        title=dict(text=_chart_title(op_name, param_val), font=dict(color=NEON_DARK['ACCENT'], size=20)),
+        paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
+        xaxis=dict(title="Time (s)", showgrid=True, gridcolor=NEON_DARK['GRID'], zerolinecolor=NEON_DARK['ACCENT']),
+        yaxis=dict(title="Amplitude", showgrid=True, gridcolor=NEON_DARK['GRID'], zerolinecolor=NEON_DARK['ACCENT']),
+        legend=dict(bgcolor=NEON_DARK['BG'], bordercolor=NEON_DARK['ACCENT'], borderwidth=1),
+        hovermode="x unified", dragmode="zoom", height=500, margin=dict(l=40, r=40, t=60, b=40)
+    )
+    add_watermark(fig)
+    return fig
+
+
+def chart_layout_key(y_s2, is_discrete, traces=()):
+    """Figures with the same key have the same trace types and can be updated in place.
+
+    `traces` are the plotted y arrays; each one's length decides SVG or WebGL.
+    """
+    return (y_s2 is not None, bool(is_discrete), tuple(use_webgl(len(y)) for y in traces if y is not None))
+
+
+def update_plotly_chart(fig, t_s1, y_s1, t_s2, y_s2, t_proc, y_proc, op_name, param_val, is_discrete=False):
+    """Swap new data into a figure from create_plotly_chart without rebuilding it."""
+    pairs = [(t_s1, y_s1)] + ([(t_s2, y_s2)] if y_s2 is not None else []) + [(t_proc, y_proc)]
+    with fig.batch_update():
+        for trace, (x, y) in zip(fig.data, pairs):
+            _set_coords(trace, x, y, is_discrete)
+        fig.layout.title.text = _chart_title(op_name, param_val)
+        fig.layout.xaxis.range = None
+    return fig
+
+
+def create_component_figure(t_s1, s1, t_s2, s2, t_processed, s_processed, is_discrete):
+    """Stacked subplots of each input and the result."""
+    # plotly.subplots is only needed once the component expander is opened.
+    from plotly.subplots import make_subplots
+
+    if s2 is not None:
+        fig2 = make_subplots(rows=3, cols=1, shared_xaxes=True, subplot_titles=("Signal 1", "Signal 2", "Result"), vertical_spacing=0.1)
+        fig2.add_trace(_trace(t_s1, s1, "S1", NEON_DARK['SIGNAL1'], is_discrete, "T", name="S1"), row=1, col=1)
+        fig2.add_trace(_trace(t_s2, s2, "S2", NEON_DARK['SIGNAL2'], is_discrete, "T", name="S2"), row=2, col=1)
+        fig2.add_trace(_trace(t_processed, s_processed, "Res", NEON_DARK['RESULT'], is_discrete, "T", name="Res"), row=3, col=1)
+    else:
+        fig2 = make_subplots(rows=2, cols=1, shared_xaxes=False, subplot_titles=("Input Signal", "Output Signal"), vertical_spacing=0.15)
+        fig2.add_trace(_trace(t_s1, s1, "In", NEON_DARK['SIGNAL1'], is_discrete, "T", name="In"), row=1, col=1)
+        fig2.add_trace(_trace(t_processed, s_processed, "Out", NEON_DARK['RESULT'], is_discrete, "T", name="Out"), row=2, col=1)
+
+    add_watermark(fig2)
+    fig2.update_layout(height=600, paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']), showlegend=False)
+    fig2.update_xaxes(showgrid=True, gridcolor=NEON_DARK['GRID'])
+    fig2.update_yaxes(showgrid=True, gridcolor=NEON_DARK['GRID'])
+    return fig2
+
+
+def _stacked_coords(x, bank, spacing):
+    """x and y of every row of `bank` as one NaN-separated trace, row i drawn `i * spacing` below row 0."""
+    k, m = bank.shape
+    # Time stays float64, as for stems; float32 would merge samples at large absolute times.
+    xs = np.empty((k, m + 1))
+    ys = np.empty((k, m + 1), dtype=np.float32)
+    xs[:, :m] = x
+    np.subtract(bank, spacing * np.arange(k)[:, None], out=ys[:, :m])
+    xs[:, m] = ys[:, m] = np.nan
+    return xs.ravel(), ys.ravel()
+
+
+def create_channel_figure(x, bank, labels):
+    """Every channel of a (channels, n) bank stacked top to bottom in a single trace.
+
+    `x` is the shared time axis, or one axis per channel as returned by
+    wavelab.decimate.decimate_channels.
+    """
+    bank = np.asarray(bank)
+    peak = float(np.abs(bank).max()) if bank.size else 0.0
+    spacing = 2.2 * peak if peak > 0 else 1.0
+    xs, ys = _stacked_coords(x, bank, spacing)
+    fig = go.Figure(_scatter_type(len(ys))(
+        x=xs, y=ys, mode='lines', line=dict(color=NEON_DARK['SIGNAL1'], width=1.5),
+        hovertemplate="Time: %{x:.3f} s<extra></extra>"
+    ))
+    add_watermark(fig)
+    fig.update_layout(
+        title="Channels", paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
+        xaxis=dict(title="Time (s)", showgrid=True, gridcolor=NEON_DARK['GRID']),
+        yaxis=dict(
+            showgrid=True, gridcolor=NEON_DARK['GRID'], zeroline=False,
+            tickvals=[-i * spacing for i in range(len(labels))], ticktext=list(labels)
+        ),
+        showlegend=False, height=max(300, 28 * len(labels)), margin=dict(l=40, r=40, t=40, b=40)
+    )
+    return fig
+
+
+def create_preview_figure(t_input, preview_sig, is_discrete):
+    """Preview of a custom equation on the Custom Input page."""
+    fig_prev = go.Figure()
+    fig_prev.add_trace(_trace(t_input, preview_sig, "Custom", NEON_DARK['ACCENT'], is_discrete, "T", name="Custom", line=dict(width=2)))
+    add_watermark(fig_prev)
+    fig_prev.update_layout(
+        title="Preview", paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'],
+        font=dict(color=NEON_DARK['TEXT']), height=300,
+        xaxis=dict(showgrid=True, gridcolor=NEON_DARK['GRID']),
+        yaxis=dict(showgrid=True, gridcolor=NEON_DARK['GRID']),
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig_prev
+
+
+def create_stream_figure(t, y, window_seconds, label="Live"):
+    """Scrolling plot of the most recent `window_seconds` of a stream."""
+    fig = go.Figure()
+    fig.add_trace(_trace(t, y, label, NEON_DARK['RESULT'], False, name=label, line=dict(width=2)))
+    t_end = float(t[-1]) if len(t) else 0.0
+    add_watermark(fig)
+    fig.update_layout(
+        paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
+        xaxis=dict(title="Time (s)", range=[max(t_end - window_seconds, 0.0), max(t_end, window_seconds)], showgrid=True, gridcolor=NEON_DARK['GRID']),
+        yaxis=dict(title="Amplitude", showgrid=True, gridcolor=NEON_DARK['GRID'], zerolinecolor=NEON_DARK['ACCENT']),
+        height=450, margin=dict(l=40, r=40, t=30, b=40), uirevision="stream"
+    )
+    return fig
+
+
+def create_spectrum_figure(traces, view="Magnitude"):
+    """Magnitude or phase spectra; `traces` is a list of (label, color, freqs, values)."""
+    fig = go.Figure()
+    for label, color, freqs, values in traces:
+        fig.add_trace(_scatter_type(len(values))(
+            **_coords(freqs, values), mode='lines', name=label, line=dict(color=color, width=2),
+            hovertemplate=f"<b>{label}</b><br>Freq: %{{x:.2f}} Hz<br>{view}: %{{y:.3g}}<extra></extra>"
+        ))
+    add_watermark(fig)
+    fig.update_layout(
+        paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
+        xaxis=dict(title="Frequency (Hz)", showgrid=True, gridcolor=NEON_DARK['GRID']),
+        yaxis=dict(title="Phase (°)" if view == "Phase" else "Magnitude", showgrid=True, gridcolor=NEON_DARK['GRID']),
+        legend=dict(bgcolor=NEON_DARK['BG'], bordercolor=NEON_DARK['ACCENT'], borderwidth=1),
+        height=400, margin=dict(l=40, r=40, t=30, b=40)
+    )
+    return fig
+
+
+def create_filter_response_figure(traces):
+    """Magnitude (dB) and phase of filter responses; `traces` is a list of (label, color, freqs, response)."""
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08)
+    for label, color, freqs, response in traces:
+        # 0 Hz has no place on a log axis.
+        freqs, response = freqs[1:], response[1:]
+        magnitude = 20 * np.log10(np.maximum(np.abs(response), 1e-12))
+        phase = np.degrees(np.unwrap(np.angle(response)))
+        for row, values, unit in ((1, magnitude, "dB"), (2, phase, "°")):
+            fig.add_trace(_scatter_type(len(values))(
+                **_coords(freqs, values), mode='lines', name=label, legendgroup=label, showlegend=row == 1,
+                line=dict(color=color, width=2),
+                hovertemplate=f"<b>{label}</b><br>Freq: %{{x:.3g}} Hz<br>%{{y:.3g}} {unit}<extra></extra>"
+            ), row=row, col=1)
+    add_watermark(fig)
+    fig.update_layout(
+        paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
+        legend=dict(bgcolor=NEON_DARK['BG'], bordercolor=NEON_DARK['ACCENT'], borderwidth=1),
+        height=500, margin=dict(l=40, r=40, t=30, b=40)
+    )
+    fig.update_xaxes(type="log", showgrid=True, gridcolor=NEON_DARK['GRID'])
+    fig.update_xaxes(title="Frequency (Hz)", row=2, col=1)
+    fig.update_yaxes(showgrid=True, gridcolor=NEON_DARK['GRID'])
+    fig.update_yaxes(title="Magnitude (dB)", range=[-100, 10], row=1, col=1)
+    fig.update_yaxes(title="Phase (°)", row=2, col=1)
+    return fig
+
+
+def create_spectrogram_figure(times, freqs, power_db, label):
+    """Heatmap of a spectrogram in dB."""
+    fig = go.Figure(go.Heatmap(
+        z=power_db, x=times, y=freqs,
+        colorscale="Viridis", colorbar=dict(title="dB"),
+        hovertemplate=f"<b>{label}</b><br>Time: %{{x:.3f}} s<br>Freq: %{{y:.1f}} Hz<br>%{{z:.1f}} dB<extra></extra>"
+    ))
+    add_watermark(fig)
+    fig.update_layout(
+        paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
+        xaxis=dict(title="Time (s)"), yaxis=dict(title="Frequency (Hz)"),
+        height=400, margin=dict(l=40, r=40, t=30, b=40)
+    )
+    return fig
+
+
+def create_sweep_heatmap(t, values, sweep, param, label="Sweep"):
+    """Heatmap of a one-parameter sweep: time across, swept value up, amplitude as colour."""
+    fig = go.Figure(go.Heatmap(
+        z=sweep, x=t, y=values,
+        colorscale="Viridis", colorbar=dict(title="Amp"),
+        hovertemplate=f"<b>{label}</b><br>Time: %{{x:.3f}} s<br>{param}: %{{y:.3g}}<br>Amp: %{{z:.3g}}<extra></extra>"
+    ))
+    add_watermark(fig)
+    fig.update_layout(
+        paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
+        xaxis=dict(title="Time (s)"), yaxis=dict(title=param),
+        height=500, margin=dict(l=40, r=40, t=30, b=40)
+    )
+    return fig
+
+
+def create_waterfall_figure(traces, param, spacing):
+    """Waterfall of a one-parameter sweep; `traces` is a list of (value, t, y), drawn `spacing` apart."""
+    fig = go.Figure()
+    for i, (value, t, y) in enumerate(traces):
+        fig.add_trace(go.Scatter(
+            **_coords(t, np.asarray(y) + i * spacing), mode='lines', name=f"{param} {value:.3g}",
+            line=dict(color=NEON_DARK['RESULT'] if i % 2 else NEON_DARK['SIGNAL1'], width=1.5),
+            hovertemplate=f"<b>{param} {value:.3g}</b><br>Time: %{{x:.3f}} s<extra></extra>"
+        ))
+    add_watermark(fig)
+    fig.update_layout(
+        paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
+        xaxis=dict(title="Time (s)", showgrid=True, gridcolor=NEON_DARK['GRID']),
+        yaxis=dict(
+            title=param, showgrid=True, gridcolor=NEON_DARK['GRID'], zeroline=False,
+            tickvals=[i * spacing for i in range(len(traces))], ticktext=[f"{value:.3g}" for value, _, _ in traces]
+        ),
+        showlegend=False, height=max(400, 18 * len(traces)), margin=dict(l=40, r=40, t=30, b=40)
+    )
+    return fig
+
+
+def create_sweep_metric_figure(values1, values2, metric_grid, param1, param2, metric):
+    """Heatmap of a per-signal metric over a two-parameter sweep."""
+    fig = go.Figure(go.Heatmap(
+        z=metric_grid, x=values2, y=values1,
+        colorscale="Viridis", colorbar=dict(title=metric),
+        hovertemplate=f"{param1}: %{{y:.3g}}<br>{param2}: %{{x:.3g}}<br>{metric}: %{{z:.3g}}<extra></extra>"
+    ))
+    add_watermark(fig)
+    fig.update_layout(
+        paper_bgcolor=NEON_DARK['PANEL'], plot_bgcolor=NEON_DARK['PANEL'], font=dict(color=NEON_DARK['TEXT']),
+        xaxis=dict(title=param2), yaxis=dict(title=param1),
+        height=450, margin=dict(l=40, r=40, t=30, b=40)
+    )
+    return fig
@@ -0,0 +1,231 @@
+"""FIR and IIR filters that can run over a whole signal or chunk by chunk.
+
+Designs:
+
+- "Moving Average": the mean of the last `window` seconds;
+- "FIR Low-pass" / "FIR High-pass": Hamming-windowed sinc, with a transition
+  band of half the distance from the cutoff to 0 Hz or Nyquist, whichever is
+  nearer, and at most MAX_FIR_TAPS taps;
+- "IIR Low-pass" / "IIR High-pass": Butterworth of order IIR_ORDER, built as a
+  cascade of second-order sections (biquads, bilinear transform with a
+  prewarped cutoff).
+
+All filters are causal and a Filter keeps its state between `process` calls, so
+feeding a signal in chunks gives the output of filtering it in one pass (to
+rounding). FIR taps are applied by convolution with whichever of direct, FFT
+or overlap-add is cheapest (see wavelab.convolution).
+
+IIR sections run without a per-sample Python loop. The signal is cut into
+blocks of IIR_BLOCK samples. One batched FFT convolution with the section's
+impulse response gives every block's zero-state response. Then only two state
+values per block are carried forward in Python, and their zero-input response
+is added back with a broadcast.
+"""
+import numpy as np
+
+from .convolution import convolve, next_fast_len
+
+FILTER_OPERATIONS = ["Moving Average", "FIR Low-pass", "FIR High-pass", "IIR Low-pass", "IIR High-pass"]
+IIR_ORDER = 4
+IIR_BLOCK = 2048
+MAX_FIR_TAPS = 1 << 16
+# Cutoffs are kept just below Nyquist so every design stays valid.
+MAX_CUTOFF = 0.99
+
+
+def _ar_response(a1, a2, n):
+    """First `n` samples of the impulse response of 1 / (1 + a1 z⁻¹ + a2 z⁻²)."""
+    g = np.zeros(n)
+    g[0] = 1.0
+    if n > 1:
+        g[1] = -a1
+    for i in range(2, n):
+        g[i] = -a1 * g[i - 1] - a2 * g[i - 2]
+    return g
+
+
+class Filter:
+    """A causal filter at `sample_rate` Hz: FIR `taps`, or second-order sections `sos`.
+
+    Each row of `sos` is (b0, b1, b2, 1, a1, a2). `process` continues from the
+    state left by the previous call; `reset` starts over.
+    """
+
+    def __init__(self, name, sample_rate, taps=None, sos=None):
+        if (taps is None) == (sos is None):
+            raise ValueError("A filter needs either FIR taps or second-order sections")
+        self.name = name
+        self.sample_rate = float(sample_rate)
+        self.taps = None if taps is None else np.asarray(taps, dtype=float)
+        self.sos = None if sos is None else np.asarray(sos, dtype=float).reshape(-1, 6)
+        self._kernels = []
+        if self.sos is not None:
+            for b0, b1, b2, _, a1, a2 in self.sos:
+                g = _ar_response(a1, a2, IIR_BLOCK)
+                h = np.convolve([b0, b1, b2], g)[:IIR_BLOCK]
+                self._kernels.append((g, h))
+        self.reset()
+
+    def __repr__(self):
+        size = f"{len(self.taps)} taps" if self.taps is not None else f"{len(self.sos)} sections"
+        return f"Filter({self.name!r}, {self.sample_rate:g} Hz, {size})"
+
+    def reset(self):
+        if self.taps is not None:
+            self._state = np.zeros(len(self.taps) - 1)
+        else:
+            self._state = np.zeros((len(self.sos), 2))
+
+    def process(self, x):
+        """Filter the next chunk `x`; returns a new array of the same length."""
+        x = np.asarray(x, dtype=float)
+        if self.taps is not None:
+            return self._fir(x)
+        y = x
+        for i, (section, kernels) in enumerate(zip(self.sos, self._kernels)):
+            y = self._section(section, kernels, y, i)
+        return y if y is not x else x.copy()
+
+    def _fir(self, x):
+        m = len(self.taps)
+        if len(x) == 0:
+            return x.copy()
+        padded = np.concatenate([self._state, x])
+        out, _, _ = convolve(padded, self.taps)
+        if m > 1:
+            self._state = padded[len(padded) - (m - 1):].copy()
+        return out[m - 1:m - 1 + len(x)]
+
+    def _section(self, section, kernels, x, index):
+        """One biquad over `x` in blocks (see the module docstring)."""
+        _, b1, b2, _, a1, a2 = section
+        g, h = kernels
+        n, size = len(x), IIR_BLOCK
+        if n == 0:
+            return x.copy()
+        n_blocks = -(-n // size)
+        blocks = np.zeros((n_blocks, size))
+        blocks.ravel()[:n] = x
+        nfft = next_fast_len(2 * size - 1)
+        y = np.fft.irfft(np.fft.rfft(blocks, nfft, axis=1) * np.fft.rfft(h, nfft), nfft, axis=1)[:, :size]
+
+        # Transposed direct form II state (z1, z2) at the start of every block.
+        g_shift = np.concatenate([[0.0], g[:-1]])
+        states = np.empty((n_blocks, 2))
+        z1, z2 = self._state[index]
+        for k in range(n_blocks):
+            states[k] = z1, z2
+            y_last = y[k, -1] + z1 * g[-1] + z2 * g_shift[-1]
+            y_prev = y[k, -2] + z1 * g[-2] + z2 * g_shift[-2]
+            x_last, x_prev = blocks[k, -1], blocks[k, -2]
+            z1, z2 = b1 * x_last - a1 * y_last + b2 * x_prev - a2 * y_prev, b2 * x_last - a2 * y_last
+        y += states[:, :1] * g
+        y += states[:, 1:] * g_shift
+        y = y.ravel()[:n]
+
+        # The last block was zero-padded, so take the final state from the real last samples.
+        if n > 1:
+            self._state[index] = b1 * x[-1] - a1 * y[-1] + b2 * x[-2] - a2 * y[-2], b2 * x[-1] - a2 * y[-1]
+        else:
+            z2 = self._state[index, 1]
+            self._state[index] = b1 * x[-1] - a1 * y[-1] + z2, b2 * x[-1] - a2 * y[-1]
+        return y
+
+    def response(self, num_points=1024):
+        """(frequencies in Hz, complex response) from 0 Hz to Nyquist."""
+        if self.taps is not None:
+            nfft = max(2 * num_points, next_fast_len(len(self.taps)))
+            freqs = np.fft.rfftfreq(nfft, 1.0 / self.sample_rate)
+            return freqs, np.fft.rfft(self.taps, nfft)
+        freqs = np.linspace(0.0, self.sample_rate / 2, num_points + 1)
+        z = np.exp(-2j * np.pi * freqs / self.sample_rate)
+        response = np.ones_like(z)
+        for b0, b1, b2, _, a1, a2 in self.sos:
+            response *= (b0 + b1 * z + b2 * z * z) / (1 + a1 * z + a2 * z * z)
+        return freqs, response
+
+
+def _cutoff(cutoff, sample_rate):
+    if cutoff <= 0:
+        raise ValueError(f"Filter cutoff must be positive, got {cutoff:g} Hz")
+    return min(float(cutoff), MAX_CUTOFF * sample_rate / 2)
+
+
+def moving_average(window, sample_rate):
+    """Mean of the last `window` seconds (at least one sample)."""
+    taps = int(np.clip(round(window * sample_rate), 1, MAX_FIR_TAPS))
+    return Filter("Moving Average", sample_rate, taps=np.full(taps, 1.0 / taps))
+
+
+def windowed_sinc(cutoff, sample_rate, highpass=False):
+    """Hamming-windowed sinc low-pass, or its spectral inversion for a high-pass."""
+    fc = _cutoff(cutoff, sample_rate)
+    transition = min(fc, sample_rate / 2 - fc) / 2
+    # Hamming: transition width ≈ 3.3 · fs / taps. Odd, so the high-pass inversion has a centre tap.
+    taps = int(np.clip(3.3 * sample_rate / transition, 3, MAX_FIR_TAPS - 1)) | 1
+    n = np.arange(taps) - (taps - 1) / 2
+    h = np.sinc(2 * fc / sample_rate * n) * np.hamming(taps)
+    h /= h.sum()
+    if highpass:
+        h = -h
+        h[(taps - 1) // 2] += 1.0
+    return Filter("FIR High-pass" if highpass else "FIR Low-pass", sample_rate, taps=h)
+
+
+def butterworth(cutoff, sample_rate, order=IIR_ORDER, highpass=False):
+    """Butterworth low- or high-pass of `order` as a cascade of biquads."""
+    fc = _cutoff(cutoff, sample_rate)
+    w0 = 2 * np.pi * fc / sample_rate
+    cos_w0, sin_w0 = np.cos(w0), np.sin(w0)
+    sections = []
+    for k in range(order // 2):
+        # Each conjugate pole pair of the analog prototype becomes one biquad with this Q.
+        q = 1.0 / (2 * np.sin((2 * k + 1) * np.pi / (2 * order)))
+        alpha = sin_w0 / (2 * q)
+        if highpass:
+            b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+        else:
+            b = [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2]
+        a0 = 1 + alpha
+        sections.append([b[0] / a0, b[1] / a0, b[2] / a0, 1.0, -2 * cos_w0 / a0, (1 - alpha) / a0])
+    if order % 2:
+        k = np.tan(w0 / 2)
+        b = [1 / (1 + k), -1 / (1 + k)] if highpass else [k / (1 + k), k / (1 + k)]
+        sections.append([b[0], b[1], 0.0, 1.0, (k - 1) / (k + 1), 0.0])
+    return Filter("IIR High-pass" if highpass else "IIR Low-pass", sample_rate, sos=sections)
+
+
+def design_filter(operation, param, sample_rate):
+    """The Filter for a filtering operation; `param` is the window (s) or cutoff (Hz)."""
+    if operation == "Moving Average":
+        return moving_average(param, sample_rate)
+    if operation in ("FIR Low-pass", "FIR High-pass"):
+        return windowed_sinc(param, sample_rate, highpass=operation == "FIR High-pass")
+    if operation in ("IIR Low-pass", "IIR High-pass"):
+        return butterworth(param, sample_rate, highpass=operation == "IIR High-pass")
+    raise ValueError(f"Unknown filter '{operation}', expected one of {FILTER_OPERATIONS}")
+
+
+def axis_spacing(t, alpha=1.0):
+    """Signed sample spacing of the axis alpha * t + beta (0 for fewer than two samples)."""
+    return alpha * (t[-1] - t[0]) / (len(t) - 1) if len(t) > 1 else 0.0
+
+
+def filter_signal(operation, param, y, dt, state=None):
+    """Filter samples `y` spaced `dt` apart; a negative `dt` means they run backwards in time.
+
+    `state`, if given, is a dict that keeps the Filter between calls so that
+    consecutive chunks continue one another.
+    """
+    y = np.asarray(y, dtype=float)
+    if dt == 0 or len(y) == 0:
+        return y.copy()
+    if state is not None and "filter" in state:
+        filt = state["filter"]
+    else:
+        filt = design_filter(operation, param, 1.0 / abs(dt))
+        if state is not None:
+            state["filter"] = filt
+    if dt < 0:
+        return filt.process(y[::-1])[::-1]
+    return filt.process(y)
@@ -0,0 +1,133 @@
+"""Job specs: one signal and its operations as a plain dict, for the command line and exports.
+
+Every key is optional:
+
+    {"signal": "Sine", "amp": 1.0, "freq": 1.0, "phase": 0.0, "expression": null,
+     "operation": "Amplitude Scaling", "param": 2.0,
+     "signal2": {"signal": "Square", "amp": 1.0, "freq": 3.0, "phase": 0.0},
+     "samples": 500, "discrete": false}
+
+Instead of "operation"/"param"/"signal2", a job may give a chain of operations:
+
+    {"steps": [{"operation": "Time Shifting", "param": 0.2},
+               {"operation": "Signal Addition", "signal2": {"signal": "Square", "freq": 3.0}}]}
+
+A signal (or signal2) of "Recorded File" reads a WAV/NPY/CSV file instead:
+
+    {"signal": "Recorded File", "recording": "take1.wav", "sample_rate": 48000}
+
+The time axis then spans the recording and "samples" points are taken from it.
+A signal of "Multi-channel" mixes any number of channels into Signal 1 before
+the operations run on it (see wavelab.channels):
+
+    {"signal": "Multi-channel", "mix": "Sum",
+     "channels": [{"signal": "Sine", "amp": 1.27, "freq": 1.0},
+                  {"signal": "Sine", "amp": 0.42, "freq": 3.0, "phase": 0.0, "shift": 0.0}]}
+"""
+from .channels import ChannelMix
+from .operations import OPERATIONS, apply_operation, needs_second_signal
+from .pipeline import OperationChain, Step, chain_label, param_display
+from .recordings import open_recording
+from .signals import MULTICHANNEL_SIGNAL, RECORDED_SIGNAL, SIGNAL_TYPES, generate_signal, time_grid
+
+DEFAULT_JOB = {
+    "signal": "Sine", "amp": 1.0, "freq": 1.0, "phase": 0.0, "expression": None,
+    "operation": "Amplitude Scaling", "param": 1.0, "signal2": None, "steps": None,
+    "recording": None, "sample_rate": 1000.0, "channels": None, "mix": "Sum", "samples": 500, "discrete": False
+}
+DEFAULT_SIGNAL2 = {"signal": "Sine", "amp": 1.0, "freq": 1.0, "phase": 0.0, "recording": None, "sample_rate": 1000.0}
+JOB_SIGNALS = SIGNAL_TYPES + [RECORDED_SIGNAL, MULTICHANNEL_SIGNAL]
+
+
+def validate_job(spec):
+    """Raise ValueError for a complete job spec (DEFAULT_JOB filled in) that cannot run."""
+    if spec["signal"] not in JOB_SIGNALS:
+        raise ValueError(f"Unknown signal '{spec['signal']}', expected one of {JOB_SIGNALS}")
+    if spec["operation"] not in OPERATIONS:
+        raise ValueError(f"Unknown operation '{spec['operation']}', expected one of {list(OPERATIONS)}")
+    if int(spec["samples"]) < 2:
+        raise ValueError("samples must be at least 2")
+
+
+def job_recording(sig):
+    """The Recording a signal spec refers to, or None for generated signals."""
+    if sig["signal"] != RECORDED_SIGNAL:
+        return None
+    if not sig.get("recording"):
+        raise ValueError("'Recorded File' signals need a \"recording\" path")
+    return open_recording(sig["recording"], sig.get("sample_rate", 1000.0))
+
+
+def job_channels(spec):
+    """The ChannelMix of a 'Multi-channel' signal spec, or None for other signals."""
+    if spec["signal"] != MULTICHANNEL_SIGNAL:
+        return None
+    if not spec.get("channels"):
+        raise ValueError("'Multi-channel' signals need a \"channels\" list")
+    return ChannelMix(spec["channels"], spec.get("mix", "Sum"))
+
+
+def step_from_spec(step):
+    """The Step of one {"operation", "param", "signal2"} entry of a job."""
+    signal2 = None
+    if needs_second_signal(step["operation"]):
+        sig2 = {**DEFAULT_SIGNAL2, **(step.get("signal2") or {})}
+        signal2 = (sig2["signal"], sig2["amp"], sig2["freq"], sig2["phase"], job_recording(sig2))
+    return Step(step["operation"], step.get("param", 1.0), signal2)
+
+
+def job_steps(spec):
+    """The Steps of a complete job spec; a single operation is a chain of one step."""
+    if spec["steps"]:
+        return [step_from_spec(step) for step in spec["steps"]]
+    return [step_from_spec({"operation": spec["operation"], "param": spec["param"], "signal2": spec["signal2"]})]
+
+
+def compute_job(spec):
+    """Run one job spec and return a dict of the generated and processed arrays.
+
+    Signal 2 ("s2") comes with the axis it was sampled on ("t_s2").
+    """
+    spec = {**DEFAULT_JOB, **spec}
+    validate_job(spec)
+    recording = job_recording(spec)
+    t = time_grid(int(spec["samples"]), 0.0, recording.duration if recording else 1.0)
+    s1 = generate_signal(spec["signal"], t, spec["amp"], spec["freq"], spec["phase"], spec["expression"], recording or job_channels(spec))
+
+    if spec["steps"]:
+        steps = job_steps(spec)
+        chain = OperationChain()
+        t_processed, s_processed = chain.evaluate(t, s1, steps)
+        s2_list = chain.second_signals(None, steps)
+        t_s2, s2 = s2_list[0] if s2_list else (None, None)
+        return {
+            "spec": spec, "t": t, "s1": s1, "t_s2": t_s2, "s2": s2,
+            "t_processed": t_processed, "s_processed": s_processed,
+            "label": chain_label(steps), "param_display": param_display(steps)
+        }
+
+    s2 = None
+    if needs_second_signal(spec["operation"]):
+        sig2 = {**DEFAULT_SIGNAL2, **(spec["signal2"] or {})}
+        s2 = generate_signal(sig2["signal"], t, sig2["amp"], sig2["freq"], sig2["phase"], sig2.get("expression"), job_recording(sig2))
+
+    t_processed, s_processed, p_val_display = apply_operation(spec["operation"], t, s1, s2, spec["param"])
+    return {
+        "spec": spec, "t": t, "s1": s1, "t_s2": t, "s2": s2,
+        "t_processed": t_processed, "s_processed": s_processed,
+        "label": spec["operation"], "param_display": p_val_display
+    }
+
+
+def build_figure(result):
+    """The chart of a computed job, as the app draws it."""
+    # Imported here so computing jobs does not need Plotly.
+    from .figures import create_plotly_chart
+
+    spec = result["spec"]
+    return create_plotly_chart(
+        result["t"], result["s1"],
+        result["t_s2"], result["s2"],
+        result["t_processed"], result["s_processed"],
+        result["label"], spec["discrete"], result["param_display"]
+    )
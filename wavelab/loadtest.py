@@ -0,0 +1,443 @@
+"""Concurrent-session load test of the Streamlit app.
+
+    python -m wavelab loadtest --sessions 1,2,4,8,16 --duration 30 -o load.json
+    python -m wavelab loadtest --url ws://127.0.0.1:8501 --pid 4242 --sessions 8
+
+Starts `streamlit run gui.py` on a free local port (unless --url points at a
+running server) and connects simulated users to it over Streamlit's websocket
+protocol, the same messages a browser tab exchanges. AppTest is not used: it
+runs the script in the test process and replaces Streamlit's runtime globally,
+so it cannot serve several sessions at once or show the server's memory.
+
+Each user loops over interaction scripts picked at random, pausing between
+steps as a person would:
+
+- "drag": a Control Panel slider dragged through successive values, one
+  value every DRAG_INTERVAL seconds (Streamlit's slider debounce);
+- "operation": switch the operation, then drag its parameter slider;
+- "equation": open Custom Input through the sidebar button (`nav_to`), edit
+  the equation a few times, go back and plot it as "Custom User Signal";
+- "navigate": visit Live Stream, Parameter Sweep and About Us and come back.
+
+A step sends the widget's new value together with every value the session set
+before, as the browser does, and the rerun ends when the server reports the
+script finished and idle. Its latency runs from sending the value to that
+point; "first chart" is when the first Plotly chart of the rerun arrived.
+
+Concurrency levels run one after another, each with fresh sessions. Every
+level reports reruns, errors (exceptions shown by the app, timeouts, widgets
+that never appeared), throughput, latency percentiles and the resident memory
+of the server and its child processes (the sandbox workers): the peak during
+the level and the growth per session over the level's starting point.
+"""
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+from .operations import OPERATION_PARAMS, OPERATIONS
+
+LOAD_LEVELS = [1, 2, 4, 8, 16]
+LEVEL_SECONDS = 30.0
+THINK_SECONDS = 1.0
+DRAG_INTERVAL = 0.2
+DRAG_STEPS = 8
+RERUN_TIMEOUT = 60.0
+STARTUP_TIMEOUT = 60.0
+MEMORY_POLL = 0.25
+GUI_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gui.py")
+
+CUSTOM_INPUT = "✏️  Custom Input"
+LIVE_STREAM = "📡  Live Stream"
+PARAMETER_SWEEP = "🧮  Parameter Sweep"
+ABOUT = "about_btn"
+BACK = "⬅ Back to Visualizer"
+EQUATION_AREA = "Enter Equation (function of t)"
+EQUATIONS = [
+    "sin(2*pi*5*t) * exp(-2*t)",
+    "sin(2*pi*3*t) + 0.5*sin(2*pi*9*t)",
+    "sign(sin(2*pi*2*t)) * t",
+    "exp(-((t - 0.5)**2) / 0.01)",
+]
+# (key, lo, hi, step) of the Control Panel sliders a "drag" moves.
+DRAG_SLIDERS = [("s1_freq", 0.1, 20.0, 0.5), ("s1_amp", 0.1, 5.0, 0.1), ("s1_phase", -180.0, 180.0, 10.0)]
+
+
+# --- INTERACTION SCRIPTS ---
+# A script is a list of (target, value, pause) steps. The target is a widget's
+# key, or its label for widgets without one; buttons take the value True.
+
+def _drag(key, lo, hi, step, rng):
+    n = round((hi - lo) / step)
+    start = rng.randrange(n + 1)
+    direction = 1 if start + DRAG_STEPS <= n else -1
+    return [(key, round(lo + (start + direction * i) * step, 6), DRAG_INTERVAL) for i in range(1, DRAG_STEPS + 1)]
+
+
+def drag_script(rng, think):
+    steps = _drag(*rng.choice(DRAG_SLIDERS), rng)
+    return steps[:-1] + [(steps[-1][0], steps[-1][1], think)]
+
+
+def operation_script(rng, think):
+    operation = rng.choice([op for op in OPERATIONS if op in OPERATION_PARAMS])
+    _, lo, hi, _, step = OPERATION_PARAMS[operation]
+    steps = [("operation", operation, think)] + _drag(f"param_{operation}", lo, hi, step, rng)
+    return steps[:-1] + [(steps[-1][0], steps[-1][1], think)]
+
+
+def equation_script(rng, think):
+    edits = [(EQUATION_AREA, eq, think) for eq in rng.sample(EQUATIONS, 2)]
+    return ([(CUSTOM_INPUT, True, think)] + edits +
+            [(BACK, True, think), ("s1_type", "Custom User Signal", think),
+             ("s1_amp", round(rng.uniform(0.5, 3.0), 1), think), ("s1_type", "Sine", think)])
+
+
+def navigate_script(rng, think):
+    return [(LIVE_STREAM, True, think), (BACK, True, think),
+            (PARAMETER_SWEEP, True, think), (BACK, True, think),
+            (ABOUT, True, think), (BACK, True, think)]
+
+
+SCRIPTS = {"drag": drag_script, "operation": operation_script, "equation": equation_script, "navigate": navigate_script}
+
+
+# --- SERVER ---
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app=GUI_SCRIPT, port=None):
+    """Run `streamlit run app` headless on `port`; returns (process, websocket URL) once it is healthy."""
+    port = port or free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true", "--server.port", str(port),
+         "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(app)))
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {proc.returncode} before serving {app}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return proc, f"ws://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"streamlit did not become healthy on port {port} within {STARTUP_TIMEOUT:g} s")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def _rss(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def process_rss(pid):
+    """Resident bytes of `pid` and all its descendants, or None where /proc is unavailable."""
+    if not os.path.isdir(f"/proc/{pid}"):
+        return None
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    total, todo = 0, [pid]
+    while todo:
+        p = todo.pop()
+        total += _rss(p)
+        todo.extend(children.get(p, []))
+    return total
+
+
+# --- SESSION ---
+
+class Session:
+    """One simulated browser tab: a websocket to the server and the widgets it last saw."""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/") + "/_stcore/stream"
+        self.ws = None
+        self.widgets = {}       # key or label -> (widget id, element type, element, fragment id)
+        self.states = {}        # widget id -> WidgetState sent with every rerun
+        self.reruns = []
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    def _widget_state(self, widget_id, kind, element, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=widget_id)
+        if kind == "button":
+            state.trigger_value = True
+        elif kind in ("checkbox", "toggle"):
+            state.bool_value = bool(value)
+        elif kind == "slider" and element.options:
+            state.string_array_value.data.extend([str(value)])
+        elif kind == "slider":
+            state.double_array_value.data.extend([float(value)])
+        elif kind in ("selectbox", "radio", "text_area", "text_input"):
+            state.string_value = str(value)
+        else:
+            raise ValueError(f"Cannot set a {kind} widget")
+        return state
+
+    def _record(self, message):
+        """Track the widget in a delta; returns the delta's element type (None for blocks)."""
+        delta = message.delta
+        if delta.WhichOneof("type") != "new_element":
+            return None
+        kind = delta.new_element.WhichOneof("type")
+        element = getattr(delta.new_element, kind)
+        widget_id = getattr(element, "id", "")
+        if widget_id.startswith("$$ID-"):
+            key = widget_id.split("-", 2)[2]
+            name = key if key != "None" else getattr(element, "label", "")
+            self.widgets[name] = (widget_id, kind, element, delta.fragment_id)
+        return kind
+
+    async def rerun(self, name, widget=None, value=None, script=None):
+        """Send one rerun (optionally with a widget change) and wait until the server is idle again."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        trigger = None
+        if widget is not None:
+            widget_id, kind, element, fragment_id = self.widgets[widget]
+            trigger = self._widget_state(widget_id, kind, element, value)
+            if kind != "button":
+                self.states[widget_id] = trigger
+            msg.rerun_script.fragment_id = fragment_id
+        states = dict(self.states)
+        if trigger is not None:
+            states[trigger.id] = trigger
+        msg.rerun_script.widget_states.widgets.extend(states.values())
+        if not msg.rerun_script.fragment_id:
+            self.widgets = {}
+
+        record = {"script": script or name, "action": name, "latency": None, "first_chart": None, "exceptions": 0, "error": None}
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        finished = False
+        try:
+            while True:
+                data = await asyncio.wait_for(self.ws.recv(), RERUN_TIMEOUT)
+                fm = ForwardMsg()
+                fm.ParseFromString(data)
+                kind = fm.WhichOneof("type")
+                if kind == "delta":
+                    element = self._record(fm)
+                    if element == "plotly_chart" and record["first_chart"] is None:
+                        record["first_chart"] = time.perf_counter() - start
+                    elif element == "exception":
+                        exception = fm.delta.new_element.exception
+                        record["exceptions"] += 1
+                        record["error"] = record["error"] or f"{exception.type}: {exception.message}"
+                elif kind == "script_finished":
+                    finished = fm.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN
+                    if fm.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                        record["error"] = "compile error"
+                elif kind == "session_status_changed" and finished and not fm.session_status_changed.script_is_running:
+                    break
+            if not msg.rerun_script.fragment_id:
+                # Like the browser, forget the values of widgets the page no longer shows.
+                shown = {widget_id for widget_id, _, _, _ in self.widgets.values()}
+                self.states = {wid: s for wid, s in self.states.items() if wid in shown}
+        except asyncio.TimeoutError:
+            record["error"] = "timeout"
+        record["latency"] = time.perf_counter() - start
+        self.reruns.append(record)
+        return record
+
+    async def step(self, target, value, script=None):
+        """Set `target` to `value`; rerun once first if the current page does not show it yet.
+
+        That extra rerun is what the browser does after a button that changes
+        the page only takes effect on the next run (the "Back" buttons).
+        """
+        if target not in self.widgets:
+            record = await self.rerun("(refresh)", script=script)
+            if not record["error"] and target not in self.widgets:
+                record["error"] = f"widget {target!r} not found"
+            if record["error"]:
+                return record
+        return await self.rerun(target, target, value, script)
+
+
+async def run_user(url, index, seed, deadline, think, scripts):
+    """Connect one user and replay random scripts until `deadline`; returns its rerun records."""
+    rng = random.Random(seed * 1000 + index)
+    session = Session(url)
+    try:
+        await session.connect()
+        first = await session.rerun("load")
+        while not first["error"] and time.perf_counter() < deadline:
+            script = rng.choice(scripts)
+            for target, value, pause in SCRIPTS[script](rng, think):
+                record = await session.step(target, value, script)
+                if record["error"]:
+                    break
+                await asyncio.sleep(min(pause, think) * rng.uniform(0.5, 1.5))
+            else:
+                continue
+            break
+    except OSError as e:
+        session.reruns.append({"script": "connect", "action": "connect", "latency": None, "first_chart": None, "exceptions": 0, "error": str(e)})
+    finally:
+        await session.close()
+    return session.reruns
+
+
+async def warm_up(url, scripts):
+    """Replay every script once, unmeasured, so imports, caches and sandbox workers exist before the first level."""
+    rng = random.Random(0)
+    session = Session(url)
+    await session.connect()
+    try:
+        await session.rerun("load")
+        for script in scripts:
+            for target, value, _ in SCRIPTS[script](rng, 0.0):
+                if (await session.step(target, value))["error"]:
+                    break
+    finally:
+        await session.close()
+
+
+async def _level(url, sessions, seconds, think, scripts, seed, pid):
+    peak = [process_rss(pid) if pid else None]
+    stop = asyncio.Event()
+
+    async def watch_memory():
+        while not stop.is_set():
+            rss = process_rss(pid)
+            if rss is not None:
+                peak[0] = max(peak[0] or 0, rss)
+            await asyncio.sleep(MEMORY_POLL)
+
+    start_rss = peak[0]
+    watcher = asyncio.ensure_future(watch_memory()) if pid else None
+    start = time.perf_counter()
+    records = await asyncio.gather(*[run_user(url, i, seed, start + seconds, think, scripts) for i in range(sessions)])
+    wall = time.perf_counter() - start
+    stop.set()
+    if watcher is not None:
+        await watcher
+    return [r for user in records for r in user], wall, start_rss, peak[0]
+
+
+def _percentiles(values):
+    if not values:
+        return {"p50": None, "p90": None, "p99": None}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99)}
+
+
+def summarize(sessions, records, wall, start_rss, peak_rss):
+    """Latency, throughput and memory figures of one concurrency level."""
+    ok = [r for r in records if not r["error"]]
+    by_script = {}
+    for r in ok:
+        by_script.setdefault(r["script"], []).append(r["latency"])
+    return {
+        "sessions": sessions,
+        "reruns": len(records),
+        "errors": len(records) - len(ok),
+        "error_samples": sorted({f"{r['action']}: {r['error']}" for r in records if r["error"]})[:5],
+        "seconds": wall,
+        "throughput": len(records) / wall if wall else 0.0,
+        "latency": _percentiles([r["latency"] for r in ok]),
+        "first_chart": _percentiles([r["first_chart"] for r in ok if r["first_chart"] is not None]),
+        "by_script": {name: _percentiles(values) for name, values in sorted(by_script.items())},
+        "rss_start": start_rss,
+        "rss_peak": peak_rss,
+        "rss_per_session": (peak_rss - start_rss) / sessions if peak_rss is not None and start_rss is not None else None,
+    }
+
+
+def format_level(level):
+    def ms(value):
+        return f"{value * 1e3:8.1f}" if value is not None else "     n/a"
+
+    def mb(value):
+        return f"{value / 2**20:7.1f}" if value is not None else "    n/a"
+
+    lat = level["latency"]
+    return (f"{level['sessions']:>4} sessions  {level['reruns']:>6} reruns  {level['errors']:>4} errors  "
+            f"{level['throughput']:6.2f} reruns/s  p50 {ms(lat['p50'])}  p90 {ms(lat['p90'])}  p99 {ms(lat['p99'])} ms  "
+            f"first chart p50 {ms(level['first_chart']['p50'])} ms  RSS peak {mb(level['rss_peak'])} MB  "
+            f"{mb(level['rss_per_session'])} MB/session")
+
+
+def run_load_test(levels=None, seconds=LEVEL_SECONDS, think=THINK_SECONDS, scripts=None, url=None, pid=None,
+                  app=GUI_SCRIPT, seed=0, progress=None):
+    """Run every concurrency level against `url` (or a server started here); returns the results dict."""
+    levels = levels or LOAD_LEVELS
+    scripts = scripts or list(SCRIPTS)
+    proc = None
+    if url is None:
+        proc, url = start_server(app)
+        pid = proc.pid
+    try:
+        asyncio.run(warm_up(url, scripts))
+        idle_rss = process_rss(pid) if pid else None
+        results = []
+        for sessions in levels:
+            level = summarize(sessions, *asyncio.run(_level(url, sessions, seconds, think, scripts, seed, pid)))
+            results.append(level)
+            if progress:
+                progress(level)
+    finally:
+        if proc is not None:
+            stop_server(proc)
+    return {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"url": url if proc is None else None, "app": app, "seconds": seconds, "think": think,
+                   "scripts": scripts, "seed": seed},
+        "idle_rss": idle_rss,
+        "levels": results,
+    }
+
+
+def write_results(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=1)
@@ -0,0 +1,209 @@
+"""Lightweight per-run stage timing with percentile summaries and export.
+
+A script run (or a fragment rerun) opens a RunTimings with `start_run`; code
+inside it wraps its stages in `with stage("figure"):`. Stages outside an open
+run cost one context-variable lookup and are not recorded, so library code can
+be instrumented unconditionally.
+
+Finished runs go to a process-wide MetricsRecorder holding the most recent
+runs of every session. It summarizes stage percentiles and can export them:
+
+- WAVELAB_METRICS_JSONL=path appends every run as one JSON line;
+- WAVELAB_METRICS_PROM=path rewrites a Prometheus text-format file (a summary
+  per stage and tag set) at most every PROMETHEUS_INTERVAL seconds.
+
+`peak_memory` measures the peak bytes allocated by a block with tracemalloc,
+which NumPy reports its array buffers to.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+
+RUN_HISTORY = 1000
+QUANTILES = (0.5, 0.9, 0.99)
+PROMETHEUS_INTERVAL = 5.0
+TOTAL_STAGE = "total"
+
+_current_run = ContextVar("wavelab_current_run", default=None)
+
+
+class RunTimings:
+    """Stage durations of one script or fragment run."""
+
+    def __init__(self, scope, recorder):
+        self.scope = scope
+        self.recorder = recorder
+        self.stages = {}
+        self._start = time.perf_counter()
+        self._parent = _current_run.get()
+        _current_run.set(self)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def finish(self, **tags):
+        """Close the run, tag it and hand it to the recorder."""
+        total = time.perf_counter() - self._start
+        _current_run.set(self._parent)
+        record = {
+            "time": time.time(), "scope": self.scope, "tags": {k: str(v) for k, v in tags.items()},
+            "stages": {**self.stages, TOTAL_STAGE: total},
+        }
+        self.recorder.record(record)
+        return record
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as stage `name` of the current run, if any."""
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add(name, time.perf_counter() - start)
+
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False    # whether peak_memory switched tracemalloc on
+
+
+@contextmanager
+def peak_memory():
+    """Yield a dict that receives "peak_bytes": the peak traced allocation above the block's start.
+
+    tracemalloc is process-wide, so allocations made by other threads during the
+    block are counted too; it is only switched on while some block is measuring.
+    """
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    result = {}
+    try:
+        yield result
+    finally:
+        with _tracing_lock:
+            result["peak_bytes"] = max(tracemalloc.get_traced_memory()[1] - base, 0)
+            _tracing_users -= 1
+            if _tracing_users == 0 and _tracing_started:
+                tracemalloc.stop()
+                _tracing_started = False
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class MetricsRecorder:
+    """Thread-safe history of recent runs shared by all sessions."""
+
+    def __init__(self, history=RUN_HISTORY, jsonl_path=None, prometheus_path=None, prometheus_interval=PROMETHEUS_INTERVAL):
+        self._runs = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.prometheus_interval = prometheus_interval
+        self._last_export = 0.0
+
+    def record(self, record):
+        with self._lock:
+            self._runs.append(record)
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+            export = self.prometheus_path and time.monotonic() - self._last_export >= self.prometheus_interval
+            if export:
+                self._last_export = time.monotonic()
+        if export:
+            self.write_prometheus(self.prometheus_path)
+
+    def runs(self):
+        with self._lock:
+            return list(self._runs)
+
+    def clear(self):
+        with self._lock:
+            self._runs.clear()
+
+    def _grouped(self, by_tags):
+        """{(scope, stage, tag items): [seconds, ...]} over the recorded runs."""
+        groups = {}
+        for run in self.runs():
+            tags = tuple(sorted(run["tags"].items())) if by_tags else ()
+            for name, seconds in run["stages"].items():
+                groups.setdefault((run["scope"], name, tags), []).append(seconds)
+        return groups
+
+    def summary(self, quantiles=QUANTILES, **filters):
+        """One row per (scope, stage): count, mean and quantiles in milliseconds.
+
+        Keyword filters keep only runs whose tags match, e.g. page="home".
+        """
+        groups = {}
+        for run in self.runs():
+            if any(run["tags"].get(k) != str(v) for k, v in filters.items()):
+                continue
+            for name, seconds in run["stages"].items():
+                groups.setdefault((run["scope"], name), []).append(seconds)
+        rows = []
+        for (scope, name), values in sorted(groups.items()):
+            ms = np.asarray(values) * 1e3
+            row = {"scope": scope, "stage": name, "count": len(ms), "mean_ms": float(ms.mean())}
+            for q, value in zip(quantiles, np.quantile(ms, quantiles)):
+                row[f"p{q * 100:g}_ms"] = float(value)
+            rows.append(row)
+        return rows
+
+    def to_prometheus(self, quantiles=QUANTILES):
+        """Prometheus text exposition: a summary of stage seconds per scope, stage and tag set."""
+        lines = [
+            "# HELP wavelab_stage_seconds Time spent in each stage of a WaveLab script or fragment run.",
+            "# TYPE wavelab_stage_seconds summary",
+        ]
+        for (scope, name, tags), values in sorted(self._grouped(by_tags=True).items()):
+            base = [("scope", scope), ("stage", name)] + list(tags)
+            for q, value in zip(quantiles, np.quantile(values, quantiles)):
+                lines.append(f"wavelab_stage_seconds{_labels(base + [('quantile', f'{q:g}')])} {value:.9g}")
+            lines.append(f"wavelab_stage_seconds_sum{_labels(base)} {sum(values):.9g}")
+            lines.append(f"wavelab_stage_seconds_count{_labels(base)} {len(values)}")
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self):
+        return "".join(json.dumps(run) + "\n" for run in self.runs())
+
+    def write_prometheus(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+RECORDER = MetricsRecorder(
+    jsonl_path=os.environ.get("WAVELAB_METRICS_JSONL"),
+    prometheus_path=os.environ.get("WAVELAB_METRICS_PROM"),
+)
+
+
+def start_run(scope, recorder=None):
+    """Open a RunTimings; stages timed in this thread are added to it until `finish`."""
+    return RunTimings(scope, recorder or RECORDER)
@@ -0,0 +1,155 @@
+"""Signal operations applied to Signal 1 (and optionally Signal 2)."""
+import numpy as np
+
+from .convolution import convolution_operation
+from .filters import FILTER_OPERATIONS, axis_spacing, filter_signal
+
+# --- OPERATIONS ---
+OPERATIONS = {
+    "Time Scaling": "x(at)",
+    "Amplitude Scaling": "A·x(t)",
+    "Time Shifting": "x(t - t₀)",
+    "Time Reversal": "x(-t)",
+    "Signal Addition": "x₁(t) + x₂(t)",
+    "Signal Multiplication": "x₁(t) · x₂(t)",
+    "Convolution": "(x₁ * x₂)(t)",
+    "Cross-correlation": "R₁₂(τ)",
+    "Auto-correlation": "Rₓₓ(τ)",
+    "Moving Average": "(1/N) Σ x[n - k]",
+    "FIR Low-pass": "Σ h[k] x[n - k]",
+    "FIR High-pass": "x[n] - Σ h[k] x[n - k]",
+    "IIR Low-pass": "H(z) = Π Bₖ(z) / Aₖ(z)",
+    "IIR High-pass": "H(z) = Π Bₖ(z) / Aₖ(z)"
+}
+TWO_SIGNAL_OPERATIONS = ["Signal Addition", "Signal Multiplication", "Convolution", "Cross-correlation"]
+# Operations that produce a new, longer time axis (see wavelab.convolution).
+CONVOLUTION_OPERATIONS = ["Convolution", "Cross-correlation", "Auto-correlation"]
+# Causal filters at the sample rate of the current time axis (see wavelab.filters).
+# FILTER_OPERATIONS is re-exported from there.
+
+# Slider settings (label, min, max, default, step) for operations with a parameter.
+OPERATION_PARAMS = {
+    "Time Scaling": ("Scaling Factor (a)", 0.1, 5.0, 1.0, 0.1),
+    "Amplitude Scaling": ("Amplitude Factor (A)", 0.1, 5.0, 1.0, 0.1),
+    "Time Shifting": ("Shift (t₀)", -5.0, 5.0, 0.0, 0.1),
+    "Moving Average": ("Window (s)", 0.002, 0.2, 0.02, 0.002),
+    "FIR Low-pass": ("Cutoff (Hz)", 0.5, 100.0, 10.0, 0.5),
+    "FIR High-pass": ("Cutoff (Hz)", 0.5, 100.0, 10.0, 0.5),
+    "IIR Low-pass": ("Cutoff (Hz)", 0.5, 100.0, 10.0, 0.5),
+    "IIR High-pass": ("Cutoff (Hz)", 0.5, 100.0, 10.0, 0.5),
+}
+
+# --- OPERATION THEORY ---
+OPERATION_THEORY = {
+    "Time Scaling": """
+    **Time Scaling Theory:**
+    Time scaling modifies the "speed" of a signal. Given x(t), the scaled signal is x(at):
+    - If a > 1: Signal plays faster (compressed in time)
+    - If 0 < a < 1: Signal plays slower (stretched in time)
+    """,
+    "Amplitude Scaling": """
+    **Amplitude Scaling Theory:**
+    Amplitude scaling changes the "height" of a signal. Given x(t), the scaled signal is A·x(t):
+    - Multiplying by A changes the peak amplitude.
+    """,
+    "Time Shifting": """
+    **Time Shifting Theory:**
+    Time shifting delays or advances a signal. Given x(t), the shifted signal is x(t - t₀):
+    - If t₀ > 0: Signal is delayed (shifted right)
+    - If t₀ < 0: Signal is advanced (shifted left)
+    """,
+    "Time Reversal": """
+    **Time Reversal Theory:**
+    Time reversal flips the signal about t = 0. Given x(t), the reversed signal is x(-t).
+    """,
+    "Signal Addition": """
+    **Signal Addition Theory:**
+    Adding two signals produces their superposition: y(t) = x₁(t) + x₂(t).
+    """,
+    "Signal Multiplication": """
+    **Signal Multiplication Theory:**
+    Multiplying two signals produces modulation: y(t) = x₁(t) · x₂(t).
+    """,
+    "Convolution": """
+    **Convolution Theory:**
+    Convolution slides the flipped x₂ across x₁ and integrates the overlap: y(t) = ∫ x₁(τ) x₂(t - τ) dτ.
+    - It is the output of an LTI system with impulse response x₂ for input x₁.
+    - The result is as long as both inputs together.
+    """,
+    "Cross-correlation": """
+    **Cross-correlation Theory:**
+    Cross-correlation measures how similar x₁ is to x₂ shifted by a lag τ: R₁₂(τ) = ∫ x₁(t + τ) x₂(t) dt.
+    - The peak lag is the delay of x₁ relative to x₂.
+    """,
+    "Auto-correlation": """
+    **Auto-correlation Theory:**
+    Auto-correlation is the cross-correlation of a signal with itself: Rₓₓ(τ) = ∫ x(t + τ) x(t) dt.
+    - It is symmetric and peaks at τ = 0 with the signal energy; periodic signals give periodic peaks.
+    """,
+    "Moving Average": """
+    **Moving Average Theory:**
+    A moving average replaces each sample with the mean of the last N samples (N = window × sample rate).
+    - It is the simplest low-pass FIR filter: it smooths noise but has spectral nulls at multiples of 1/window.
+    """,
+    "FIR Low-pass": """
+    **FIR Low-pass Theory:**
+    A finite impulse response filter is a convolution with taps h[k]. Here h is a windowed sinc:
+    - The ideal low-pass impulse response sin(2πf꜀t)/(πt), truncated and tapered by a Hamming window.
+    - The output is delayed by half the filter length (linear phase).
+    """,
+    "FIR High-pass": """
+    **FIR High-pass Theory:**
+    The high-pass is the low-pass subtracted from the input (spectral inversion): h = δ - h_low.
+    - Frequencies above the cutoff pass; the output has the same linear-phase delay.
+    """,
+    "IIR Low-pass": """
+    **IIR Low-pass Theory:**
+    An infinite impulse response filter feeds its output back: y[n] = Σ bₖ x[n - k] - Σ aₖ y[n - k].
+    - This is a 4th-order Butterworth filter (maximally flat passband, -3 dB at the cutoff).
+    - It runs as a cascade of second-order sections (biquads), which stays numerically stable.
+    """,
+    "IIR High-pass": """
+    **IIR High-pass Theory:**
+    The Butterworth high-pass mirrors the low-pass: it rolls off below the cutoff at 24 dB per octave.
+    - Like every causal IIR filter, its phase is not linear, so different frequencies are delayed differently.
+    """
+}
+
+
+def needs_second_signal(operation):
+    return operation in TWO_SIGNAL_OPERATIONS
+
+
+def apply_operation(operation, t, s1, s2=None, param_val=1.0):
+    """Apply an operation and return (t_processed, s_processed, param_display)."""
+    t_processed = t
+    s_processed = s1
+    p_val_display = 0
+
+    if operation == "Time Shifting":
+        t_processed = t + param_val
+        p_val_display = param_val
+    elif operation == "Time Scaling":
+        a = param_val
+        p_val_display = param_val
+        if a > 1e-9:
+            t_processed = t / a
+        else:
+            # x(0·t) is the constant x(0).
+            s_processed = np.full_like(t, s1[np.abs(t).argmin()])
+    elif operation == "Time Reversal":
+        t_processed = -t
+    elif operation == "Amplitude Scaling":
+        s_processed = param_val * s1
+        p_val_display = param_val
+    elif operation == "Signal Addition" and s2 is not None:
+        s_processed = s1 + s2
+    elif operation == "Signal Multiplication" and s2 is not None:
+        s_processed = s1 * s2
+    elif operation in FILTER_OPERATIONS:
+        s_processed = filter_signal(operation, param_val, s1, axis_spacing(t))
+        p_val_display = param_val
+    elif operation == "Auto-correlation" or (operation in CONVOLUTION_OPERATIONS and s2 is not None):
+        t_processed, s_processed, _ = convolution_operation(operation, t, s1, t, s2)
+
+    return t_processed, s_processed, p_val_display
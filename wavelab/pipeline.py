@@ -0,0 +1,289 @@
+"""Lazy, fused evaluation of a chain of operations on Signal 1.
+
+Operations act either on the time axis (scaling, shifting, reversal) or on the
+sample values (amplitude scaling, addition, multiplication), exactly as
+`apply_operation` does for a single step. A chain is evaluated in one pass:
+
+- time-axis steps are folded into a single affine map t' = alpha * t + beta,
+  so they never touch an array until the final axis is materialized;
+- value steps run in place on one working buffer; Signal 2 of an addition
+  or multiplication is sampled on the current (transformed) axis, and only
+  there: `second_signals` returns it with that axis;
+- filter steps run over the samples in the order of the current axis, at its
+  sample rate, into a new working buffer;
+- convolution and correlation steps materialize the current axis and replace
+  it with the (longer) output grid, after which folding starts again.
+
+Intermediate results are checkpointed where the chain was last edited. While a
+slider for step k is dragged, steps before k are served from the checkpoint and
+only steps k..n are recomputed.
+"""
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from .cache import array_nbytes, signal_key
+from .convolution import convolution_operation
+from .filters import axis_spacing, design_filter, filter_signal
+from .operations import CONVOLUTION_OPERATIONS, FILTER_OPERATIONS, OPERATION_PARAMS, OPERATIONS, needs_second_signal
+from .signals import generate_signal, time_grid
+
+
+class Step(namedtuple("Step", ["operation", "param", "signal2"])):
+    """One operation in a chain. `signal2` is (type, amp, freq, phase[, recording]) for two-signal operations."""
+    __slots__ = ()
+
+    def __new__(cls, operation, param=1.0, signal2=None):
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}'")
+        if needs_second_signal(operation):
+            signal2 = tuple(signal2) if signal2 is not None else ("Sine", 1.0, 1.0, 0.0)
+        else:
+            signal2 = None
+        return super().__new__(cls, operation, float(param), signal2)
+
+
+def chain_label(steps):
+    return " → ".join(step.operation for step in steps)
+
+
+class OperationChain:
+    """Evaluates chains of Steps, keeping checkpoints and Signal 2 arrays between calls."""
+
+    def __init__(self, max_checkpoints=8, max_bytes=256 * 2**20, shared_cache=None):
+        self.max_checkpoints = max_checkpoints
+        self.max_bytes = max_bytes
+        self.shared_cache = shared_cache    # optional SharedArrayCache for Signal 2 arrays
+        self._checkpoints = OrderedDict()   # (source_key, steps prefix) -> (t, alpha, beta, y)
+        self._signal2 = OrderedDict()       # (time grid, signal2 spec) -> array
+        self._last = None                   # (source_key, steps) of the previous evaluation
+        self._info = {}                     # (source_key, steps prefix) -> convolution run info
+        self._used = {}                     # (source_key, steps prefix) -> (axis, Signal 2) of a Signal 2 step
+
+    def _remember(self, cache, key, value, limit):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit or (len(cache) > 1 and self._cached_bytes() > self.max_bytes):
+            cache.popitem(last=False)
+
+    def _cached_bytes(self):
+        """Bytes held by checkpoints, Signal 2 arrays and their axes (memory-mapped recordings are free)."""
+        # Checkpoints after a convolution share its time axis; array_nbytes counts each array once.
+        arrays = [a for t, _, _, y in self._checkpoints.values() for a in (t, y)] + list(self._signal2.values())
+        return array_nbytes(arrays + [a for used in self._used.values() for a in used])
+
+    def _second_signal(self, t, spec):
+        key = (len(t), float(t[0]), float(t[-1]), spec)
+        if key not in self._signal2:
+            source = spec[4] if len(spec) > 4 else None
+            if self.shared_cache is not None:
+                arr = self.shared_cache.get_or_compute(
+                    signal_key(spec[0], *spec[1:4], t, source=source),
+                    lambda: generate_signal(spec[0], t, *spec[1:4], source=source)
+                )
+            else:
+                arr = generate_signal(spec[0], t, *spec[1:4], source=source)
+                arr.flags.writeable = False
+            self._remember(self._signal2, key, arr, 2 * self.max_checkpoints)
+        self._signal2.move_to_end(key)
+        return self._signal2[key]
+
+    def second_signals(self, source_key, steps):
+        """(axis, Signal 2) of every step with a Signal 2 in the last evaluation of `steps`, in step order."""
+        steps = tuple(steps)
+        return [self._used[key] for key in ((source_key, steps[:i + 1]) for i in range(len(steps))) if key in self._used]
+
+    def _dirty_index(self, source_key, steps):
+        """First step that differs from the previous evaluation; it is likely to change again."""
+        if self._last is None or self._last[0] != source_key:
+            return 0
+        prev = self._last[1]
+        for i, (a, b) in enumerate(zip(prev, steps)):
+            if a != b:
+                return i
+        return min(len(prev), len(steps))
+
+    def _start(self, source_key, steps, t, s1):
+        for k in range(len(steps), 0, -1):
+            hit = self._checkpoints.get((source_key, steps[:k]))
+            if hit is not None:
+                self._checkpoints.move_to_end((source_key, steps[:k]))
+                return k, hit
+        return 0, (t, 1.0, 0.0, s1)
+
+    def _convolve(self, step, t, alpha, beta, y):
+        """Run a convolution step on the materialized axis; Signal 2 shares its spacing.
+
+        Returns the convolution's (t, y, info) and the (axis, Signal 2) it used, or None.
+        """
+        t_cur = alpha * t + beta
+        if step.signal2 is None:
+            return convolution_operation(step.operation, t_cur, y), None
+        if abs(alpha) == 1.0:
+            t2 = t
+        else:
+            t2 = time_grid(len(t), t[0], t[0] + abs(alpha) * (t[-1] - t[0]))
+            t2.flags.writeable = False
+        s2 = self._second_signal(t2, step.signal2)
+        return convolution_operation(step.operation, t_cur, y, t2, s2), (t2, s2)
+
+    def run_info(self, source_key, steps):
+        """Method and timing of each convolution step in the last evaluation of `steps`."""
+        steps = tuple(steps)
+        return [self._info[key] for key in ((source_key, steps[:i + 1]) for i in range(len(steps))) if key in self._info]
+
+    def evaluate(self, t, s1, steps, source_key=None, check=None):
+        """Return (t_processed, s_processed) for `steps` applied to (t, s1).
+
+        `source_key` identifies s1 (e.g. its generator parameters); pass None
+        to disable checkpoint reuse across calls. `check`, if given, is called
+        before every step and may raise to abandon the evaluation (see
+        wavelab.background).
+        """
+        steps = tuple(steps)
+        dirty = self._dirty_index(source_key, steps)
+        start, (t, alpha, beta, y) = self._start(source_key, steps, t, s1)
+        owned = False   # whether `y` is our private working buffer
+
+        for i in range(start, len(steps)):
+            if source_key is not None and i == dirty and i > 0 and (source_key, steps[:i]) not in self._checkpoints:
+                frozen = y.copy() if owned else y.view()
+                frozen.flags.writeable = False
+                self._remember(self._checkpoints, (source_key, steps[:i]), (t, alpha, beta, frozen), self.max_checkpoints)
+            if check is not None:
+                check()
+            step = steps[i]
+            op, p = step.operation, step.param
+            if op in CONVOLUTION_OPERATIONS:
+                (t, y, info), used = self._convolve(step, t, alpha, beta, y)
+                t.flags.writeable = False
+                alpha, beta, owned = 1.0, 0.0, True
+                self._info[(source_key, steps[:i + 1])] = info
+                if used is not None:
+                    self._used[(source_key, steps[:i + 1])] = used
+            elif op == "Time Shifting":
+                beta += p
+            elif op == "Time Scaling":
+                if p > 1e-9:
+                    alpha, beta = alpha / p, beta / p
+                else:
+                    # x(0·t) is the constant value of the current signal at t = 0.
+                    y = np.full_like(y, y[np.abs(alpha * t + beta).argmin()], dtype=float)
+                    owned = True
+            elif op == "Time Reversal":
+                alpha, beta = -alpha, -beta
+            elif op in FILTER_OPERATIONS:
+                y = filter_signal(op, p, y, axis_spacing(t, alpha))
+                owned = True
+            else:
+                if not owned:
+                    y = np.array(y, dtype=float)
+                    owned = True
+                if op == "Amplitude Scaling":
+                    np.multiply(y, p, out=y)
+                elif op in ("Signal Addition", "Signal Multiplication"):
+                    # x₂ is a function of the output time, so it is sampled on the current axis.
+                    if alpha == 1.0 and beta == 0.0:
+                        t_cur = t
+                    else:
+                        t_cur = alpha * t + beta
+                        t_cur.flags.writeable = False
+                    s2 = self._second_signal(t_cur, step.signal2)
+                    (np.add if op == "Signal Addition" else np.multiply)(y, s2, out=y)
+                    self._used[(source_key, steps[:i + 1])] = (t_cur, s2)
+
+        if source_key is not None and steps:
+            frozen = y if owned else y.view()
+            frozen.flags.writeable = False
+            self._remember(self._checkpoints, (source_key, steps), (t, alpha, beta, frozen), self.max_checkpoints)
+        self._last = (source_key, steps)
+        current = lambda key: key[0] == source_key and steps[:len(key[1])] == key[1]
+        self._info = {key: info for key, info in self._info.items() if current(key)}
+        self._used = {key: used for key, used in self._used.items() if current(key)}
+
+        if alpha == 1.0 and beta == 0.0:
+            t_processed = t
+        else:
+            t_processed = np.multiply(t, alpha)
+            t_processed += beta
+        return t_processed, y
+
+    def clear(self):
+        self._checkpoints.clear()
+        self._signal2.clear()
+        self._info.clear()
+        self._used.clear()
+        self._last = None
+
+
+def _sample_signal2(spec, t):
+    return generate_signal(spec[0], t, *spec[1:4], source=spec[4] if len(spec) > 4 else None)
+
+
+def evaluate_bank(t, bank, steps):
+    """Apply `steps` to every row of a (channels, n) bank, as OperationChain.evaluate does to one signal.
+
+    Time-axis steps fold into one map shared by all rows, and value steps
+    broadcast over the channel axis, so they cost one ufunc per step whatever
+    the channel count; Signal 2 is sampled once and added to (or multiplies)
+    every channel. Filters are designed once and run row by row, and
+    convolutions run row by row. Returns (t_processed, processed bank).
+    """
+    y = np.array(bank, dtype=float, ndmin=2)
+    alpha, beta = 1.0, 0.0
+    for step in steps:
+        op, p = step.operation, step.param
+        if op in CONVOLUTION_OPERATIONS:
+            t_cur = alpha * t + beta
+            if step.signal2 is None:
+                rows = [convolution_operation(op, t_cur, row) for row in y]
+            else:
+                t2 = t if abs(alpha) == 1.0 else time_grid(len(t), t[0], t[0] + abs(alpha) * (t[-1] - t[0]))
+                s2 = _sample_signal2(step.signal2, t2)
+                rows = [convolution_operation(op, t_cur, row, t2, s2) for row in y]
+            t, y = rows[0][0], np.stack([row[1] for row in rows])
+            alpha, beta = 1.0, 0.0
+        elif op == "Time Shifting":
+            beta += p
+        elif op == "Time Scaling":
+            if p > 1e-9:
+                alpha, beta = alpha / p, beta / p
+            else:
+                y[:] = y[:, [np.abs(alpha * t + beta).argmin()]]
+        elif op == "Time Reversal":
+            alpha, beta = -alpha, -beta
+        elif op in FILTER_OPERATIONS:
+            spacing = axis_spacing(t, alpha)
+            state = {}
+            for row in y:
+                row[:] = filter_signal(op, p, row, spacing, state)
+                if "filter" in state:
+                    state["filter"].reset()
+        elif op == "Amplitude Scaling":
+            y *= p
+        elif op in ("Signal Addition", "Signal Multiplication"):
+            t_cur = t if alpha == 1.0 and beta == 0.0 else alpha * t + beta
+            s2 = _sample_signal2(step.signal2, t_cur)
+            (np.add if op == "Signal Addition" else np.multiply)(y, s2, out=y)
+    if alpha == 1.0 and beta == 0.0:
+        return t, y
+    return alpha * t + beta, y
+
+
+def chain_filters(t, steps):
+    """(step index, Filter) for every filter step, designed at the sample rate it runs at."""
+    spacing = abs(axis_spacing(t))
+    filters = []
+    for i, step in enumerate(steps):
+        if step.operation == "Time Scaling" and step.param > 1e-9:
+            spacing /= step.param
+        elif step.operation in FILTER_OPERATIONS and spacing > 0:
+            filters.append((i, design_filter(step.operation, step.param, 1.0 / spacing)))
+    return filters
+
+
+def param_display(steps):
+    """Parameter shown in the chart title; only single-step chains have one."""
+    if len(steps) == 1 and steps[0].operation in OPERATION_PARAMS:
+        return steps[0].param
+    return 0
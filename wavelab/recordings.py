@@ -0,0 +1,274 @@
+"""Recorded signals (WAV, NPY, CSV) used as Signal 1 / Signal 2 sources.
+
+Samples are never loaded into RAM as a whole:
+
+- NPY files are opened with `np.load(mmap_mode="r")`;
+- WAV files are parsed for their header and the PCM data is memory-mapped;
+- CSV files are parsed in chunks of rows into a float64 cache file, which is
+  then memory-mapped like the others.
+
+Each recording gets a multi-level min/max overview (a pyramid of per-block
+minima and maxima) built in one chunked pass. Plotting any window at any zoom
+level reads only the overview level that matches the window, so the first
+render of a large file and zoomed renders stay cheap.
+"""
+import hashlib
+import os
+import struct
+import tempfile
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+
+RECORDING_FORMATS = (".wav", ".npy", ".csv")
+RECORDINGS_DIR = os.environ.get("WAVELAB_RECORDINGS", "recordings")
+CSV_CACHE_DIR = os.path.join(tempfile.gettempdir(), "wavelab-csv")
+CSV_CHUNK_ROWS = 100_000
+READ_CHUNK = 1 << 20        # samples per chunk when scanning a file
+OVERVIEW_BLOCK = 256        # samples per block in the finest overview level
+OVERVIEW_FACTOR = 8         # blocks merged per step up the pyramid
+
+# WAV sample formats that can be memory-mapped directly: (format tag, bits) -> (dtype, offset, scale)
+_WAV_DTYPES = {
+    (1, 8): ("u1", 128.0, 1 / 128.0),
+    (1, 16): ("<i2", 0.0, 1 / 32768.0),
+    (1, 32): ("<i4", 0.0, 1 / 2147483648.0),
+    (3, 32): ("<f4", 0.0, 1.0),
+    (3, 64): ("<f8", 0.0, 1.0),
+}
+
+
+class Recording:
+    """A memory-mapped recording with a min/max overview pyramid."""
+
+    def __init__(self, data, sample_rate, name, offset=0.0, scale=1.0):
+        if data.ndim != 1:
+            raise ValueError("Recording data must be one-dimensional")
+        if len(data) == 0:
+            raise ValueError(f"Recording '{name}' contains no samples")
+        self.data = data
+        self.sample_rate = float(sample_rate)
+        self.name = name
+        self.offset = offset
+        self.scale = scale
+        self.levels = _build_overview(self)
+
+    def __repr__(self):
+        return f"Recording({self.name!r}, {len(self):,} samples @ {self.sample_rate:g} Hz)"
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def duration(self):
+        return len(self.data) / self.sample_rate
+
+    def read(self, start=0, stop=None):
+        """Samples [start, stop) as float64."""
+        raw = self.data[start:stop]
+        out = np.asarray(raw, dtype=float)
+        if self.offset:
+            out = out - self.offset
+        if self.scale != 1.0:
+            out = out * self.scale
+        return out
+
+    def sample_at(self, t):
+        """Nearest recorded sample at each time in `t` (seconds); zero outside the recording.
+
+        Times up to `duration` (the end of the last sample period) read the last sample.
+        """
+        t = np.asarray(t)
+        idx = np.rint(t * self.sample_rate).astype(np.intp)
+        n = len(self.data)
+        idx[(idx == n) & (t <= self.duration)] = n - 1
+        valid = (idx >= 0) & (idx < n)
+        out = np.zeros(idx.shape)
+        out[valid] = self.data[idx[valid]]
+        if self.offset:
+            out[valid] -= self.offset
+        if self.scale != 1.0:
+            out *= self.scale
+        return out
+
+    def envelope(self, x_range=None, max_points=2000):
+        """(t, y) min/max envelope of a time window with about `max_points` points."""
+        n = len(self.data)
+        if x_range is None:
+            lo, hi = 0, n
+        else:
+            lo = max(int(np.floor(min(x_range) * self.sample_rate)), 0)
+            hi = min(int(np.ceil(max(x_range) * self.sample_rate)) + 1, n)
+            if hi <= lo:
+                return np.empty(0), np.empty(0)
+        count = hi - lo
+        n_blocks = max(max_points // 2, 1)
+        if count <= max_points:
+            return np.arange(lo, hi) / self.sample_rate, self.read(lo, hi)
+
+        needed_block = count / n_blocks
+        if needed_block < OVERVIEW_BLOCK:
+            # Finer than the overview: the raw window is small enough to read.
+            from .decimate import minmax_decimate
+            return minmax_decimate(np.arange(lo, hi) / self.sample_rate, self.read(lo, hi), max_points)
+
+        block = OVERVIEW_BLOCK
+        level = 0
+        while level + 1 < len(self.levels) and block < needed_block:
+            block *= OVERVIEW_FACTOR
+            level += 1
+        mins, maxs = self.levels[level]
+        b0, b1 = lo // block, -(-hi // block)
+        centers = (np.arange(b0, b1) * block + block / 2) / self.sample_rate
+        t = np.repeat(centers, 2)
+        y = np.column_stack([mins[b0:b1], maxs[b0:b1]]).ravel()
+        return t, (y - self.offset) * self.scale
+
+
+def _build_overview(recording):
+    """Per-block min/max at OVERVIEW_BLOCK samples, then coarser levels by OVERVIEW_FACTOR."""
+    data = recording.data
+    n = len(data)
+    n_blocks = -(-n // OVERVIEW_BLOCK)
+    mins = np.empty(n_blocks, dtype=data.dtype)
+    maxs = np.empty(n_blocks, dtype=data.dtype)
+    chunk = READ_CHUNK - READ_CHUNK % OVERVIEW_BLOCK
+    for start in range(0, n, chunk):
+        part = np.asarray(data[start:start + chunk])
+        b = start // OVERVIEW_BLOCK
+        edges = np.arange(0, len(part), OVERVIEW_BLOCK)
+        mins[b:b + len(edges)] = np.minimum.reduceat(part, edges)
+        maxs[b:b + len(edges)] = np.maximum.reduceat(part, edges)
+    levels = [(mins, maxs)]
+    while len(mins) > OVERVIEW_FACTOR:
+        edges = np.arange(0, len(mins), OVERVIEW_FACTOR)
+        mins = np.minimum.reduceat(mins, edges)
+        maxs = np.maximum.reduceat(maxs, edges)
+        levels.append((mins, maxs))
+    return levels
+
+
+def _channel(data, channel):
+    if data.ndim == 1:
+        return data
+    if data.ndim != 2:
+        raise ValueError(f"Expected 1-D or 2-D samples, got shape {data.shape}")
+    if not 0 <= channel < data.shape[1]:
+        raise ValueError(f"Channel {channel} out of range (file has {data.shape[1]})")
+    return data[:, channel]
+
+
+def load_npy(path, sample_rate, channel=0):
+    data = np.load(path, mmap_mode="r", allow_pickle=False)
+    if data.dtype.kind not in "iuf":
+        raise ValueError(f"Unsupported NPY dtype {data.dtype}")
+    return Recording(_channel(data, channel), sample_rate, os.path.basename(path))
+
+
+def _wav_layout(path):
+    """Return (format tag, channels, sample rate, bits, data offset, data size) from a WAV header."""
+    with open(path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"'{os.path.basename(path)}' is not a RIFF/WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("WAV file has no data chunk")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if tag == 0xFFFE and len(body) >= 26:  # WAVE_FORMAT_EXTENSIBLE
+                    tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (tag, channels, rate, bits)
+                if size & 1:
+                    f.seek(1, 1)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("WAV data chunk precedes its fmt chunk")
+                return fmt + (f.tell(), size)
+            else:
+                f.seek(size + (size & 1), 1)
+
+
+def load_wav(path, channel=0):
+    tag, channels, rate, bits, offset, size = _wav_layout(path)
+    if (tag, bits) not in _WAV_DTYPES:
+        raise ValueError(f"Unsupported WAV sample format (format {tag}, {bits}-bit)")
+    dtype, zero, scale = _WAV_DTYPES[(tag, bits)]
+    frames = size // (channels * np.dtype(dtype).itemsize)
+    data = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(frames, channels))
+    return Recording(_channel(data, channel), rate, os.path.basename(path), zero, scale)
+
+
+def _csv_cache_path(path, column):
+    st = os.stat(path)
+    digest = hashlib.sha1(f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{column}".encode()).hexdigest()[:16]
+    return os.path.join(CSV_CACHE_DIR, f"{os.path.basename(path)}.{digest}.f8")
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def load_csv(path, sample_rate, column=0):
+    """Parse one CSV column in chunks of CSV_CHUNK_ROWS rows into a memory-mapped cache."""
+    cache = _csv_cache_path(path, column)
+    if not os.path.exists(cache):
+        os.makedirs(CSV_CACHE_DIR, exist_ok=True)
+        # A unique temporary file per parse, so concurrent sessions never write into each other's.
+        fd, tmp = tempfile.mkstemp(dir=CSV_CACHE_DIR, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out, open(path, newline="") as src:
+                first = src.readline()
+                delimiter = "," if "," in first else ";" if ";" in first else None
+                fields = first.split(delimiter) if first.strip() else []
+                rows = [] if len(fields) <= column or not _is_number(fields[column]) else [first]
+                while True:
+                    rows.extend(islice(src, CSV_CHUNK_ROWS))
+                    if not rows:
+                        break
+                    values = np.loadtxt(rows, delimiter=delimiter, usecols=column, ndmin=1, dtype="<f8")
+                    out.write(values.tobytes())
+                    rows = []
+        except BaseException:
+            os.remove(tmp)
+            raise
+        os.replace(tmp, cache)
+    data = np.memmap(cache, dtype="<f8", mode="r")
+    return Recording(data, sample_rate, os.path.basename(path))
+
+
+@lru_cache(maxsize=16)
+def _open_cached(path, mtime_ns, size, sample_rate, channel):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".wav":
+        return load_wav(path, channel)
+    if ext == ".npy":
+        return load_npy(path, sample_rate, channel)
+    if ext == ".csv":
+        return load_csv(path, sample_rate, channel)
+    raise ValueError(f"Unsupported recording format '{ext}' (use {', '.join(RECORDING_FORMATS)})")
+
+
+def open_recording(path, sample_rate=1000.0, channel=0):
+    """Open (or reuse) a recording; `sample_rate` is ignored for WAV files, which carry their own."""
+    st = os.stat(path)
+    return _open_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size, float(sample_rate), int(channel))
+
+
+def list_recordings(directory=RECORDINGS_DIR):
+    """Recording files available in `directory`, sorted by name."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in RECORDING_FORMATS
+    )
@@ -0,0 +1,281 @@
+"""Evaluate custom equations in a pool of sandboxed worker processes.
+
+Equations are checked against the whitelist before they run, but a valid one
+can still pin a CPU (`np.sort(np.tile(t, 10**6))`) or exhaust memory
+(`np.ones(10**10)`). Inside the Streamlit server that would stall every
+session, so `evaluate_sandboxed` runs them in pre-started worker processes:
+
+- the time axis and the result travel through shared memory, not pickles;
+- every worker has an address-space limit (WAVELAB_SANDBOX_MB, default 2048 MB
+  on top of what the worker uses at start-up);
+- every call has a wall-clock limit (WAVELAB_SANDBOX_TIMEOUT, default 5 s).
+
+A worker that hits either limit, or dies, is killed and replaced, and the
+caller gets an ExpressionError of kind "limit". A caller can also pass a
+`cancelled` callable; once it returns True the worker is killed and replaced
+the same way and the error is of kind "cancelled" (see wavelab.background).
+
+Workers are plain `python -c` subprocesses talking over a socket pair rather
+than multiprocessing children: Streamlit installs the page script as
+`__main__`, which multiprocessing would re-run in every child. The sandbox
+needs POSIX; elsewhere, or with WAVELAB_SANDBOX=0, equations evaluate
+in-process. So do grids whose blocks would not fit in the free space of
+SHM_DIR (Docker gives /dev/shm only 64 MB by default): touching a shared block
+that the filesystem cannot back kills the process with SIGBUS.
+"""
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .expressions import ExpressionError, compile_expression, evaluate_custom_signal
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SANDBOX_ENABLED = os.name == "posix" and os.environ.get("WAVELAB_SANDBOX", "1") != "0"
+DEFAULT_WORKERS = int(os.environ.get("WAVELAB_SANDBOX_WORKERS", 2))
+DEFAULT_TIMEOUT = float(os.environ.get("WAVELAB_SANDBOX_TIMEOUT", 5.0))
+DEFAULT_MEMORY_MB = float(os.environ.get("WAVELAB_SANDBOX_MB", 2048))
+# Python and NumPy start-up is not charged to the first call's time limit.
+STARTUP_TIMEOUT = 30.0
+# How often a running evaluation checks whether its caller cancelled it.
+CANCEL_POLL = 0.05
+# Where SharedMemory blocks live, and the space left free there for everyone else.
+SHM_DIR = "/dev/shm"
+SHM_HEADROOM = 16 * 2**20
+
+
+def _shm_has_room(nbytes):
+    """Whether SHM_DIR can back `nbytes` more of shared memory (True if it cannot be checked)."""
+    try:
+        return shutil.disk_usage(SHM_DIR).free >= nbytes + SHM_HEADROOM
+    except OSError:
+        return True
+
+
+def _address_space():
+    """Current virtual memory size of this process in bytes (Linux), or 0 if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _limit_memory(memory_bytes):
+    if resource is None or not memory_bytes:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = _address_space() + int(memory_bytes)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+_WORKER_CODE = "import sys; from wavelab.sandbox import _worker_main; _worker_main(int(sys.argv[1]), int(sys.argv[2]))"
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _worker_main(fd, memory_bytes):
+    """Worker loop: evaluate (expression, t block, out block, shape) requests until sent None."""
+    conn = Connection(fd)
+    # Blocks belong to the parent, which unlinks them; tracking them here would
+    # start a tracker process per worker that "cleans up" the parent's blocks.
+    resource_tracker.register = lambda name, rtype: None
+    _limit_memory(memory_bytes)
+    conn.send(("ready", None))
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):     # the server went away
+            return
+        if request is None:
+            return
+        expression, t_name, out_name, shape = request
+        t_block = SharedMemory(t_name)
+        out_block = SharedMemory(out_name)
+        t = out = None
+        try:
+            t = np.ndarray(shape, dtype=float, buffer=t_block.buf)
+            out = np.ndarray(shape, dtype=float, buffer=out_block.buf)
+            evaluate_custom_signal(expression, t, out=out)
+            reply = ("ok", None)
+        except ExpressionError as e:
+            reply = ("memory", None) if e.kind == "memory" else ("error", (e.message, e.kind, e.offset))
+        except MemoryError:
+            reply = ("memory", None)
+        finally:
+            del t, out      # release the views so the blocks can be closed
+            t_block.close()
+            out_block.close()
+        conn.send(reply)
+
+
+class SandboxPool:
+    """Fixed-size pool of worker processes evaluating custom equations under time and memory limits."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB):
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_bytes = int(memory_mb * 2**20)
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.restarts = 0
+        for _ in range(workers):
+            self._idle.put(self._start())
+
+    def _start(self):
+        ours, theirs = socket.socketpair()
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [_PACKAGE_ROOT, os.environ.get("PYTHONPATH")]))}
+        process = subprocess.Popen(
+            [sys.executable, "-c", _WORKER_CODE, str(theirs.fileno()), str(self.memory_bytes)],
+            pass_fds=(theirs.fileno(),), stdin=subprocess.DEVNULL, env=env
+        )
+        theirs.close()
+        return {"process": process, "conn": Connection(ours.detach()), "ready": False}
+
+    def _replace(self, worker):
+        process, conn = worker["process"], worker["conn"]
+        process.kill()
+        process.wait()
+        conn.close()
+        with self._lock:
+            self.restarts += 1
+        return self._start()
+
+    def evaluate(self, expression, t, cancelled=None):
+        """Evaluate `expression` over `t` in a worker; raises ExpressionError (kind "limit" on a limit).
+
+        Grids too large for the shared-memory filesystem are evaluated in-process instead.
+
+        `cancelled`, if given, is polled while the worker runs; when it returns
+        True the evaluation is stopped with an ExpressionError of kind "cancelled".
+        """
+        compile_expression(expression)     # syntax and name errors without a round trip
+        t = np.asarray(t, dtype=float)
+        size = max(t.nbytes, 1)
+        if not _shm_has_room(2 * size):
+            return evaluate_custom_signal(expression, t)
+        t_block = SharedMemory(create=True, size=size)
+        try:
+            out_block = SharedMemory(create=True, size=size)
+        except OSError:
+            t_block.close()
+            t_block.unlink()
+            return evaluate_custom_signal(expression, t)
+        try:
+            np.ndarray(t.shape, dtype=float, buffer=t_block.buf)[...] = t
+            status, detail = self._call((expression, t_block.name, out_block.name, t.shape), cancelled)
+            if status == "cancelled":
+                raise ExpressionError("The evaluation was cancelled", expression, "cancelled")
+            if status == "error":
+                message, kind, offset = detail
+                raise ExpressionError(message, expression, kind, offset)
+            if status == "limit":
+                raise ExpressionError(f"{detail}; the evaluation was stopped", expression, "limit")
+            return np.ndarray(t.shape, dtype=float, buffer=out_block.buf).copy()
+        finally:
+            t_block.close()
+            t_block.unlink()
+            out_block.close()
+            out_block.unlink()
+
+    def _call(self, request, cancelled=None):
+        worker = self._idle.get()
+        with self._lock:
+            self.calls += 1
+        try:
+            status, detail = self._exchange(worker, request, cancelled)
+            if status in ("limit", "cancelled"):
+                worker = self._replace(worker)
+            return status, detail
+        finally:
+            self._idle.put(worker)
+
+    def _exchange(self, worker, request, cancelled=None):
+        """(status, detail) of one request; status "limit" or "cancelled" means the worker must be replaced."""
+        conn = worker["conn"]
+        try:
+            if not worker["ready"]:
+                if not conn.poll(STARTUP_TIMEOUT):
+                    return "limit", "The evaluation process did not start"
+                conn.recv()
+                worker["ready"] = True
+            conn.send(request)
+            deadline = time.monotonic() + self.timeout
+            interval = CANCEL_POLL if cancelled is not None else self.timeout
+            while not conn.poll(max(min(interval, deadline - time.monotonic()), 0.0)):
+                if time.monotonic() >= deadline:
+                    return "limit", f"Equation took longer than the {self.timeout:g} s time limit"
+                if cancelled is not None and cancelled():
+                    return "cancelled", None
+            status, detail = conn.recv()
+        except (EOFError, OSError):
+            return "limit", "The evaluation process crashed"
+        if status == "memory":
+            # Also replaced: a worker that ran out of memory may be left fragmented.
+            return "limit", f"Equation needed more than the {self.memory_bytes / 2**20:g} MB memory limit"
+        return status, detail
+
+    def info(self):
+        return {"workers": self.workers, "idle": self._idle.qsize(), "calls": self.calls, "restarts": self.restarts, "timeout": self.timeout,
+                "memory_mb": self.memory_bytes / 2**20}
+
+    def close(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            process, conn = worker["process"], worker["conn"]
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            try:
+                process.wait(1.0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            conn.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide SandboxPool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxPool()
+        return _pool
+
+
+def sandbox_info():
+    """Statistics of the process-wide pool, or None if it has not been started."""
+    return _pool.info() if _pool is not None else None
+
+
+def evaluate_sandboxed(expression, t, cancelled=None):
+    """Drop-in for evaluate_custom_signal that runs the equation in the sandbox pool.
+
+    `cancelled` is only honoured in the sandbox; in-process evaluations run to the end.
+    """
+    if not SANDBOX_ENABLED:
+        return evaluate_custom_signal(expression, t)
+    return get_pool().evaluate(expression, t, cancelled)
@@ -0,0 +1,56 @@
+"""Built-in signal generators."""
+import numpy as np
+
+from .expressions import evaluate_custom_signal
+
+CUSTOM_SIGNAL = "Custom User Signal"
+BASIC_SIGNALS = ["Sine", "Square", "Sawtooth", "Step", "Impulse", "Ramp"]
+SIGNAL_TYPES = BASIC_SIGNALS + [CUSTOM_SIGNAL]
+RECORDED_SIGNAL = "Recorded File"
+MULTICHANNEL_SIGNAL = "Multi-channel"
+
+# Sample counts offered by the high-resolution mode.
+RESOLUTION_STEPS = [1_000, 10_000, 100_000, 1_000_000, 5_000_000, 10_000_000, 20_000_000]
+
+
+def time_grid(num_samples, start=0.0, stop=1.0):
+    """Evenly spaced time axis used by both continuous and discrete modes."""
+    return np.linspace(start, stop, num_samples)
+
+
+def generate_signal(sig_type, t, amp, freq, phase, expression=None, source=None):
+    """Evaluate a signal over `t`; custom signals use `expression` and may raise ExpressionError.
+
+    Recorded signals sample the Recording given as `source`, scaled by `amp`;
+    multi-channel signals mix the channels of the ChannelMix given as `source`
+    (see wavelab.channels), scaled by `amp`.
+    For built-in signals amp, freq and phase may be arrays that broadcast
+    against `t`; wavelab.sweep uses this to evaluate whole parameter sweeps.
+    """
+    if sig_type == CUSTOM_SIGNAL:
+        return evaluate_custom_signal(expression, t)
+    if sig_type == RECORDED_SIGNAL:
+        if source is None:
+            raise ValueError("No recording selected")
+        return amp * source.sample_at(t)
+    if sig_type == MULTICHANNEL_SIGNAL:
+        if source is None:
+            raise ValueError("No channels defined")
+        return amp * source.sample_at(t)
+
+    phase_rad = np.deg2rad(phase)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if sig_type == "Sine":
+            return amp * np.sin(2 * np.pi * freq * t + phase_rad)
+        elif sig_type == "Square":
+            return amp * np.sign(np.sin(2 * np.pi * freq * t + phase_rad))
+        elif sig_type == "Sawtooth":
+            return amp * (2 * (freq * t - np.floor(0.5 + freq * t)))
+        elif sig_type == "Step":
+            return amp * np.heaviside(t, 1)
+        elif sig_type == "Impulse":
+            idx = np.abs(t).argmin()
+            return np.where(np.arange(len(t)) == idx, amp, 0.0)
+        elif sig_type == "Ramp":
+            return amp * t
+    return np.zeros_like(t)
@@ -0,0 +1,151 @@
+"""Frequency-domain analysis: magnitude/phase spectra and spectrograms.
+
+Spectra use `np.fft.rfft` on a windowed copy of the signal. Spectrograms frame
+the signal with a strided view (no copy of the samples), apply the window to
+all frames at once and transform every frame in one batched `rfft` call. Long
+signals get a larger hop instead of more frames, so the cost of a spectrogram
+is bounded by MAX_FRAMES no matter how many samples there are.
+
+Windows of up to MAX_CACHED_WINDOW samples (every spectrogram segment) are
+cached by (name, length); longer ones are built per call. A SpectrumCache
+keeps the last spectra per (signal key, parameters), within a byte budget
+(WAVELAB_SPECTRUM_CACHE_MB, default 64 MB per session), so an unchanged
+signal is not transformed again when only another signal or the view changes.
+The most recent results (one per drawn signal) are kept even over budget.
+"""
+import os
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SPECTRUM_WINDOWS = ["Hann", "Hamming", "Blackman", "Rectangular"]
+SEGMENT_LENGTHS = [64, 128, 256, 512, 1024, 2048, 4096]
+MAX_FRAMES = 1000
+DB_FLOOR = -120.0
+MAX_CACHED_WINDOW = 1 << 16
+SPECTRUM_CACHE_BYTES = int(float(os.environ.get("WAVELAB_SPECTRUM_CACHE_MB", 64)) * 2**20)
+
+
+def get_window(name, n):
+    """Read-only window of length `n`; short windows are shared between calls."""
+    if n <= MAX_CACHED_WINDOW:
+        return _cached_window(name, n)
+    return _make_window(name, n)
+
+
+@lru_cache(maxsize=64)
+def _cached_window(name, n):
+    return _make_window(name, n)
+
+
+def _make_window(name, n):
+    if name == "Hann":
+        w = np.hanning(n)
+    elif name == "Hamming":
+        w = np.hamming(n)
+    elif name == "Blackman":
+        w = np.blackman(n)
+    elif name == "Rectangular":
+        w = np.ones(n)
+    else:
+        raise ValueError(f"Unknown window '{name}', expected one of {SPECTRUM_WINDOWS}")
+    w.flags.writeable = False
+    return w
+
+
+def sample_rate(t):
+    """Sample rate of an evenly spaced time axis (its direction is irrelevant)."""
+    if len(t) < 2 or t[-1] == t[0]:
+        return 1.0
+    return (len(t) - 1) / abs(float(t[-1]) - float(t[0]))
+
+
+def compute_spectrum(t, y, window="Hann"):
+    """Single-sided amplitude spectrum: (freqs, magnitude, phase in degrees)."""
+    n = len(y)
+    w = get_window(window, n)
+    spec = np.fft.rfft(np.multiply(y, w))
+    freqs = np.fft.rfftfreq(n, 1.0 / sample_rate(t))
+    magnitude = np.abs(spec)
+    magnitude *= 2.0 / w.sum()
+    magnitude[0] /= 2.0
+    phase = np.angle(spec, deg=True)
+    # Phase of numerically empty bins is noise; show it as zero.
+    phase[magnitude < magnitude.max() * 1e-6] = 0.0
+    return freqs, magnitude, phase
+
+
+def frame_signal(y, nperseg, hop):
+    """(frames, nperseg) strided view of `y`; no samples are copied."""
+    return sliding_window_view(y, nperseg)[::hop]
+
+
+def compute_spectrogram(t, y, window="Hann", nperseg=256, overlap=0.5, max_frames=MAX_FRAMES):
+    """(frame times, freqs, power in dB) with shape (freqs, frames)."""
+    y = np.asarray(y)
+    nperseg = min(nperseg, len(y))
+    hop = max(int(nperseg * (1 - overlap)), 1)
+    hop = max(hop, -(-(len(y) - nperseg) // max(max_frames - 1, 1)))
+    frames = frame_signal(y, nperseg, hop)
+    w = get_window(window, nperseg)
+    spec = np.fft.rfft(frames * w, axis=-1)
+    power = np.abs(spec)
+    power *= 2.0 / w.sum()
+    with np.errstate(divide="ignore"):
+        power_db = 20 * np.log10(power)
+    np.maximum(power_db, DB_FLOOR, out=power_db)
+    fs = sample_rate(t)
+    starts = np.arange(len(frames)) * hop
+    times = t[0] + np.sign(t[-1] - t[0]) * (starts + nperseg / 2) / fs
+    return times, np.fft.rfftfreq(nperseg, 1.0 / fs), power_db.T
+
+
+class SpectrumCache:
+    """Keeps recent spectra and spectrograms keyed by signal identity and parameters, within `max_bytes`.
+
+    The newest `keep_latest` entries (one per signal the spectrum view draws) stay
+    cached even when they exceed `max_bytes`.
+    """
+
+    def __init__(self, max_entries=16, max_bytes=SPECTRUM_CACHE_BYTES, keep_latest=3):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.keep_latest = keep_latest
+        self._entries = OrderedDict()   # key -> (value, nbytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key, compute):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+        self.misses += 1
+        value = compute()
+        for arr in value:
+            arr.flags.writeable = False
+        size = sum(arr.nbytes for arr in value)
+        self._entries[key] = (value, size)
+        self.nbytes += size
+        # The newest results are kept even over budget, so toggling the view of very
+        # long signals (e.g. Magnitude ↔ Phase) does not transform them again.
+        while len(self._entries) > self.keep_latest and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+        return value
+
+    def spectrum(self, signal_key, t, y, window="Hann"):
+        return self._get(("spectrum", signal_key, window), lambda: compute_spectrum(t, y, window))
+
+    def spectrogram(self, signal_key, t, y, window="Hann", nperseg=256, overlap=0.5):
+        return self._get(
+            ("spectrogram", signal_key, window, nperseg, overlap),
+            lambda: compute_spectrogram(t, y, window, nperseg, overlap)
+        )
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
@@ -0,0 +1,169 @@
+"""Chunked, phase-continuous signal streams for the live display.
+
+A SignalStream produces consecutive chunks of any signal type, including
+custom equations. Periodic signals track their phase as a fraction of a cycle,
+so the sine argument stays small and chunks join seamlessly no matter how
+long the stream runs. Chunks go into a fixed-size RingBuffer, and a
+StreamPacer decides how many samples each frame may produce so that a slow
+renderer slows the stream down instead of piling up work. Memory use is
+constant for the lifetime of the stream.
+"""
+import time
+
+import numpy as np
+
+from .expressions import evaluate_custom_signal
+from .signals import CUSTOM_SIGNAL
+
+STREAM_RATES = [100, 500, 1_000, 5_000, 10_000, 50_000]
+
+
+class SignalStream:
+    """Endless generator of one signal type, sampled at `sample_rate` Hz."""
+
+    def __init__(self, sig_type, amp=1.0, freq=1.0, phase=0.0, sample_rate=1_000, expression=None, evaluate=evaluate_custom_signal):
+        self.sig_type = sig_type
+        self.amp = amp
+        self.freq = freq
+        self.phase = phase
+        self.sample_rate = sample_rate
+        self.expression = expression
+        self.evaluate = evaluate           # custom equation evaluator, e.g. wavelab.sandbox.evaluate_sandboxed
+        self.position = 0                  # samples produced so far
+        self._cycle = phase / 360.0 % 1.0  # phase at `position`, in cycles
+
+    def set_params(self, amp=None, freq=None, phase=None):
+        """Change parameters mid-stream without a phase jump (phase offsets are applied as a shift)."""
+        if phase is not None and phase != self.phase:
+            self._cycle = (self._cycle + (phase - self.phase) / 360.0) % 1.0
+            self.phase = phase
+        if amp is not None:
+            self.amp = amp
+        if freq is not None:
+            self.freq = freq
+
+    def next_chunk(self, n):
+        """Return the next `n` samples as (t, y)."""
+        idx = np.arange(n, dtype=float)
+        t = (self.position + idx) / self.sample_rate
+        if self.sig_type == CUSTOM_SIGNAL:
+            y = self.evaluate(self.expression, t)
+        else:
+            cycles = self._cycle + self.freq * idx / self.sample_rate
+            y = self._periodic(cycles, t)
+        self._cycle = (self._cycle + self.freq * n / self.sample_rate) % 1.0
+        self.position += n
+        return t, y
+
+    def _periodic(self, cycles, t):
+        amp = self.amp
+        if self.sig_type == "Sine":
+            return amp * np.sin(2 * np.pi * cycles)
+        elif self.sig_type == "Square":
+            return amp * np.sign(np.sin(2 * np.pi * cycles))
+        elif self.sig_type == "Sawtooth":
+            # Same waveform as generate_signal, which ignores the phase for sawtooth.
+            c = cycles - self.phase / 360.0
+            return amp * (2 * (c - np.floor(0.5 + c)))
+        elif self.sig_type == "Step":
+            return amp * np.heaviside(t, 1)
+        elif self.sig_type == "Impulse":
+            y = np.zeros_like(t)
+            y[t == 0] = amp
+            return y
+        elif self.sig_type == "Ramp":
+            return amp * t
+        return np.zeros_like(t)
+
+
+class RingBuffer:
+    """Fixed-capacity (t, y) history; `view()` is always a contiguous, copy-free window.
+
+    Every sample is written twice, at i and i + capacity, so the most recent
+    `capacity` samples are always one contiguous slice.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._t = np.zeros(2 * self.capacity)
+        self._y = np.zeros(2 * self.capacity)
+        self._head = 0      # index of the oldest sample
+        self.size = 0
+
+    @property
+    def nbytes(self):
+        return self._t.nbytes + self._y.nbytes
+
+    def extend(self, t, y):
+        n = len(t)
+        if n >= self.capacity:
+            t, y, n = t[-self.capacity:], y[-self.capacity:], self.capacity
+        cap = self.capacity
+        end = (self._head + self.size) % cap
+        first = min(n, cap - end)
+        for buf, data in ((self._t, t), (self._y, y)):
+            buf[end:end + first] = data[:first]
+            buf[end + cap:end + cap + first] = data[:first]
+            if first < n:
+                buf[:n - first] = data[first:]
+                buf[cap:cap + n - first] = data[first:]
+        overflow = max(self.size + n - cap, 0)
+        self._head = (self._head + overflow) % cap
+        self.size = min(self.size + n, cap)
+
+    def view(self):
+        """Read-only (t, y) of the buffered samples, oldest first."""
+        t = self._t[self._head:self._head + self.size]
+        y = self._y[self._head:self._head + self.size]
+        t.flags.writeable = False
+        y.flags.writeable = False
+        return t, y
+
+    def clear(self):
+        self._head = 0
+        self.size = 0
+
+
+class StreamPacer:
+    """Decides how many samples each frame may produce.
+
+    A frame produces the samples that are due since the previous frame, but
+    never more than `max_lag_frames` frames' worth. When rendering falls
+    behind, the stream clock slows down (backpressure) instead of queueing an
+    ever-growing backlog; the skipped wall time is reported as `lag_seconds`.
+    """
+
+    def __init__(self, sample_rate, fps, max_lag_frames=2, clock=time.monotonic):
+        self.sample_rate = sample_rate
+        self.fps = fps
+        self.max_lag_frames = max_lag_frames
+        self.clock = clock
+        self._last = None
+        self.lag_seconds = 0.0
+        self.frames = 0
+        self.throttled_frames = 0
+
+    def pause(self):
+        """Forget the last frame time so a resumed stream does not count the pause as lag."""
+        self._last = None
+
+    @property
+    def frame_samples(self):
+        return max(int(round(self.sample_rate / self.fps)), 1)
+
+    def samples_due(self):
+        now = self.clock()
+        if self._last is None:
+            self._last = now
+            self.frames += 1
+            return self.frame_samples
+        elapsed = now - self._last
+        self._last = now
+        due = int(round(elapsed * self.sample_rate))
+        cap = self.frame_samples * self.max_lag_frames
+        self.frames += 1
+        if due > cap:
+            self.throttled_frames += 1
+            self.lag_seconds += (due - cap) / self.sample_rate
+            due = cap
+        return max(due, 1)
@@ -0,0 +1,89 @@
+"""Parameter sweeps: a whole family of signals in one broadcasted evaluation.
+
+One or two of amplitude, frequency and phase are swept over evenly spaced
+values. The swept values are reshaped onto their own leading axes and passed to
+`generate_signal` together with the 1-D time axis, so NumPy broadcasting
+evaluates every combination in a single call:
+
+    amp (k1, 1) × t (n,)              -> sweep (k1, n)
+    freq (k1, 1, 1), phase (1, k2, 1) -> sweep (k1, k2, n)
+"""
+import io
+
+import numpy as np
+
+from .signals import BASIC_SIGNALS, generate_signal, time_grid
+
+# Sweepable parameter -> (generate_signal argument, slider min, max, default range).
+SWEEP_PARAMS = {
+    "Amplitude": ("amp", 0.1, 5.0, (0.5, 2.0)),
+    "Frequency": ("freq", 0.1, 20.0, (1.0, 10.0)),
+    "Phase": ("phase", -180.0, 180.0, (-180.0, 180.0)),
+}
+SWEEP_SIGNALS = BASIC_SIGNALS
+SWEEP_METRICS = ["RMS", "Peak", "Mean"]
+MAX_SWEEP_VALUES = 200
+MAX_SWEEP_ELEMENTS = 20_000_000
+
+
+def sweep_values(lo, hi, count):
+    """`count` evenly spaced parameter values from lo to hi."""
+    count = int(count)
+    if not 1 <= count <= MAX_SWEEP_VALUES:
+        raise ValueError(f"A sweep takes 1 to {MAX_SWEEP_VALUES} values per parameter, got {count}")
+    return np.linspace(lo, hi, count)
+
+
+def generate_sweep(sig_type, t, params, swept):
+    """Evaluate `sig_type` for every combination of the swept values.
+
+    `params` gives the fixed amp, freq and phase; `swept` is an ordered dict of
+    one or two SWEEP_PARAMS names to 1-D value arrays. Returns a C-contiguous
+    array of shape (len(values1), [len(values2),] len(t)).
+    """
+    if sig_type not in SWEEP_SIGNALS:
+        raise ValueError(f"Sweeps need a built-in signal, one of {SWEEP_SIGNALS}")
+    if not 1 <= len(swept) <= 2:
+        raise ValueError("Sweep one or two parameters")
+    args = dict(params)
+    shape = []
+    for axis, (name, values) in enumerate(swept.items()):
+        values = np.asarray(values, dtype=float)
+        dims = [1] * (len(swept) + 1)
+        dims[axis] = len(values)
+        args[SWEEP_PARAMS[name][0]] = values.reshape(dims)
+        shape.append(len(values))
+    shape.append(len(t))
+    if np.prod(shape) > MAX_SWEEP_ELEMENTS:
+        raise ValueError(f"Sweep of {' × '.join(map(str, shape))} samples exceeds {MAX_SWEEP_ELEMENTS:,}; use fewer values or samples")
+    out = generate_signal(sig_type, t, args["amp"], args["freq"], args["phase"])
+    # Signals that ignore a swept parameter (e.g. the phase of a Ramp) broadcast to fewer axes.
+    return np.ascontiguousarray(np.broadcast_to(out, shape))
+
+
+def sweep_metric(sweep, metric):
+    """Reduce every signal of a sweep over time: one value per parameter combination."""
+    if metric == "RMS":
+        return np.sqrt(np.mean(np.square(sweep), axis=-1))
+    if metric == "Peak":
+        return np.max(np.abs(sweep), axis=-1)
+    if metric == "Mean":
+        return np.mean(sweep, axis=-1)
+    raise ValueError(f"Unknown sweep metric '{metric}', expected one of {SWEEP_METRICS}")
+
+
+def run_sweep(sig_type, params, ranges, num_samples=500, start=0.0, stop=1.0):
+    """Generate a sweep from `ranges` ({name: (lo, hi, count)}); returns (t, swept values, sweep)."""
+    t = time_grid(num_samples, start, stop)
+    swept = {name: sweep_values(*spec) for name, spec in ranges.items()}
+    return t, swept, generate_sweep(sig_type, t, params, swept)
+
+
+def sweep_npz(t, swept, sweep, sig_type=""):
+    """Sweep arrays as NPZ bytes: `t`, `sweep`, `params` (names in axis order) and one array per swept parameter."""
+    buffer = io.BytesIO()
+    np.savez(
+        buffer, t=t, sweep=sweep, signal=np.array(sig_type), params=np.array(list(swept)),
+        **{SWEEP_PARAMS[name][0]: values for name, values in swept.items()}
+    )
+    return buffer.getvalue()
@@ -0,0 +1,203 @@
+"""Colour palette shared by the Streamlit front end and the figure builders, and the app stylesheet."""
+import json
+
+# --- THEME CONSTANTS ---
+NEON_DARK = {
+    "BG": "#101014",
+    "PANEL": "#181820",
+    "ACCENT": "#C9E819",     # Neon Lime
+    "TEXT": "#00FFFF",       # Cyan
+    "BTN": "#53C4F1",
+    "SIGNAL1": "#B4C6F5",    # Light Blue
+    "SIGNAL2": "#F9CC98",    # Light Orange
+    "RESULT": "#39FF14",     # Bright Green
+    "GRID": "#444455"
+}
+
+# --- APP STYLESHEET ---
+# Formatted once per process. Pacifico, Exo 2 and Montserrat are not shipped with
+# the app and nothing is fetched from outside, so browsers without a local install
+# of them draw the title in the generic cursive or sans-serif face and the body
+# text in the default sans-serif.
+APP_CSS = """
+/* Global Font & Background */
+.stApp {{
+    background-color: {bg};
+    color: {text};
+    font-family: 'Montserrat', sans-serif;
+}}
+
+[data-testid="stSidebar"] {{
+    background-color: {panel};
+    border-right: 1px solid #333;
+}}
+
+/* --- SIDEBAR HEADER (NON-STICKY) --- */
+.sidebar-title-container {{
+    text-align: center;
+    padding-bottom: 20px;
+    margin-bottom: 20px;
+    border-bottom: 1px solid {grid};
+}}
+
+/* Title Styles inside Sidebar */
+.sidebar-custom-title {{
+    font-family: 'Exo 2', 'Pacifico', cursive, sans-serif;
+    font-size: 3rem;
+    background: linear-gradient(90deg, #A259FF 0%, #FF6F91 100%);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+    text-fill-color: transparent;
+    text-shadow: 0 4px 8px rgba(0,0,0,0.5);
+    line-height: 1.2;
+    margin: 0;
+}}
+@media (max-width: 600px) {{
+    .sidebar-custom-title {{
+        font-size: 2rem;
+    }}
+}}
+
+/* Subtitle Styles inside Sidebar (CYAN) */
+.sidebar-subtitle {{
+    font-family: 'Montserrat', sans-serif;
+    color: #00FFFF !important; /* Cyan */
+    font-size: 0.85rem;
+    font-weight: 400;
+    margin-top: 5px;
+    opacity: 1;
+}}
+
+/* --- SIDEBAR NAVIGATION BUTTONS STYLING --- */
+[data-testid="stSidebar"] div.stButton > button {{
+    background-color: transparent;
+    border: 1px solid {accent};
+    color: {accent};
+    border-radius: 8px;
+    width: 100%;
+    text-align: left;
+    padding-left: 20px;
+    font-weight: 600;
+    transition: all 0.3s ease;
+    margin-bottom: 5px;
+}}
+
+[data-testid="stSidebar"] div.stButton > button:hover {{
+    background-color: {accent};
+    color: {bg};
+    border-color: {accent};
+    transform: translateX(5px);
+    box-shadow: 0 0 10px {accent};
+}}
+
+/* Section Headers in Sidebar */
+.sidebar-header {{
+    color: #888;
+    font-size: 0.8rem;
+    font-weight: bold;
+    letter-spacing: 1.5px;
+    margin-top: 20px;
+    margin-bottom: 10px;
+    text-transform: uppercase;
+}}
+
+/* Main Page Title Styles */
+.custom-title {{
+    font-family: 'Exo 2', 'Pacifico', cursive, sans-serif;
+    font-size: 4rem;
+    background: linear-gradient(90deg, #A259FF 0%, #FF6F91 100%);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+    text-fill-color: transparent;
+    margin-bottom: -0.5rem;
+    text-shadow: 0 4px 8px rgba(0,0,0,0.5);
+}}
+@media (max-width: 600px) {{
+    .custom-title {{
+        font-size: 2.2rem;
+    }}
+}}
+.custom-subtitle {{
+    font-family: sans-serif;
+    color: {text};
+    opacity: 0.7;
+    font-size: 1.1rem;
+    margin-bottom: 2rem;
+}}
+
+/* Profile Card */
+.profile-card {{
+    background-color: {panel};
+    border: 1px solid {accent};
+    padding: 30px;
+    border-radius: 12px;
+    text-align: center;
+    box-shadow: 0 4px 15px rgba(0,0,0,0.5);
+    margin-bottom: 20px;
+    transition: transform 0.2s;
+    min-height: 320px;
+    min-width: 240px;
+    max-width: 100%;
+    display: flex;
+    flex-direction: column;
+    justify-content: space-between;
+    flex: 1 1 0;
+}}
+.profile-card:hover {{
+    transform: scale(1.02);
+}}
+.profile-name {{
+    color: {accent};
+    font-family: 'Pacifico', cursive;
+    font-size: 2rem;
+    margin-bottom: 10px;
+}}
+.profile-role {{
+    color: {btn};
+    font-weight: bold;
+    font-size: 1.2rem;
+    margin-bottom: 5px;
+}}
+a {{
+    color: {btn};
+    text-decoration: none;
+    margin: 0 5px;
+}}
+
+/* License Footer */
+.license-container {{
+    margin-top: 50px;
+    padding-top: 20px;
+    border-top: 1px solid {grid};
+    text-align: center;
+    font-size: 0.8rem;
+    color: #888;
+}}
+
+div.stButton > button {{
+    font-weight: bold;
+}}
+""".format(
+    bg=NEON_DARK['BG'],
+    text=NEON_DARK['TEXT'],
+    panel=NEON_DARK['PANEL'],
+    accent=NEON_DARK['ACCENT'],
+    btn=NEON_DARK['BTN'],
+    grid=NEON_DARK['GRID']
+)
+
+
+def stylesheet_loader(css=APP_CSS):
+    """HTML whose script adds `css` to the page head once.
+
+    The style element outlives the Streamlit element that carried the script,
+    so the page needs to send it only on the first run of a session.
+    """
+    text = json.dumps(css).replace("</", "<\\/")
+    return (
+        "<script>(() => { if (document.getElementById('wavelab-css')) return; "
+        "const style = document.createElement('style'); style.id = 'wavelab-css'; "
+        f"style.textContent = {text}; document.head.appendChild(style); }})();</script>"
+    )
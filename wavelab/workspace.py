@@ -0,0 +1,202 @@
+"""Allocation-free compute path with reusable per-session buffers.
+
+The default path allocates a new array for every intermediate value
+(`2*np.pi*freq*t`, the sine, `amp * ...`) and shares finished float64 arrays
+across sessions. The workspace path instead keeps one set of named buffers per
+session and writes every step into them with ufunc `out=` arguments, so a
+rerun at the same resolution allocates nothing. Buffers can be float32, which
+halves their memory and bandwidth at a precision that is far below what a
+chart can show.
+
+Convolution, correlation and filters still allocate (the FFT needs its own
+arrays); their results are copied into the workspace.
+"""
+import numpy as np
+
+from .convolution import convolution_operation
+from .expressions import evaluate_custom_signal
+from .filters import axis_spacing, filter_signal
+from .operations import CONVOLUTION_OPERATIONS, FILTER_OPERATIONS
+from .signals import CUSTOM_SIGNAL, MULTICHANNEL_SIGNAL, RECORDED_SIGNAL, time_grid
+
+# "shared" is the default path (see wavelab.cache); the others use a Workspace of that dtype.
+COMPUTE_MODES = ["shared", "float64", "float32"]
+
+
+class Workspace:
+    """Named arrays of one dtype, reallocated only when their length or the dtype changes."""
+
+    def __init__(self, dtype="float64"):
+        self.dtype = np.dtype(dtype)
+        self._buffers = {}
+        self._grid_key = None
+        self.allocations = 0
+
+    def buffer(self, name, n):
+        arr = self._buffers.get(name)
+        if arr is None or len(arr) != n:
+            arr = self._buffers[name] = np.empty(n, dtype=self.dtype)
+            self.allocations += 1
+        return arr
+
+    def grid(self, num_samples, start=0.0, stop=1.0):
+        """Time axis in the workspace dtype, filled only when its parameters change."""
+        t = self.buffer("t", num_samples)
+        if self._grid_key != (num_samples, start, stop):
+            np.copyto(t, time_grid(num_samples, start, stop), casting="same_kind")
+            self._grid_key = (num_samples, start, stop)
+        return t
+
+    def release(self, prefix, keep=()):
+        """Drop the buffers whose name starts with `prefix`, except those named in `keep`."""
+        for name in [name for name in self._buffers if name.startswith(prefix) and name not in keep]:
+            del self._buffers[name]
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self._buffers.values())
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def clear(self):
+        self._buffers.clear()
+        self._grid_key = None
+
+
+def generate_into(sig_type, t, amp, freq, phase, out, scratch=None, expression=None, source=None, evaluate=None):
+    """generate_signal written into `out` without temporaries; Sawtooth needs a `scratch` array.
+
+    Custom equations use `evaluate(expression, t)` if given (e.g. the sandbox),
+    otherwise evaluate_custom_signal writes straight into `out`.
+    """
+    if sig_type == CUSTOM_SIGNAL:
+        if evaluate is None:
+            return evaluate_custom_signal(expression, t, out=out)
+        np.copyto(out, evaluate(expression, t), casting="same_kind")
+        return out
+    if sig_type == RECORDED_SIGNAL:
+        if source is None:
+            raise ValueError("No recording selected")
+        np.multiply(source.sample_at(t), amp, out=out, casting="same_kind")
+        return out
+    if sig_type == MULTICHANNEL_SIGNAL:
+        if source is None:
+            raise ValueError("No channels defined")
+        # The channels are mixed straight into `out`, one cache-sized block at a time.
+        np.multiply(source.sample_at(t, out=out), amp, out=out)
+        return out
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if sig_type in ("Sine", "Square"):
+            np.multiply(t, 2 * np.pi * freq, out=out)
+            np.add(out, np.deg2rad(phase), out=out)
+            np.sin(out, out=out)
+            if sig_type == "Square":
+                np.sign(out, out=out)
+            np.multiply(out, amp, out=out)
+        elif sig_type == "Sawtooth":
+            np.multiply(t, freq, out=out)
+            np.add(out, 0.5, out=scratch)
+            np.floor(scratch, out=scratch)
+            np.subtract(out, scratch, out=out)
+            np.multiply(out, 2 * amp, out=out)
+        elif sig_type == "Step":
+            np.heaviside(t, 1, out=out)
+            np.multiply(out, amp, out=out)
+        elif sig_type == "Impulse":
+            out.fill(0)
+            out[np.abs(t).argmin()] = amp
+        elif sig_type == "Ramp":
+            np.multiply(t, amp, out=out)
+        else:
+            out.fill(0)
+    return out
+
+
+def _signal2_into(buffer, name, t, spec):
+    source = spec[4] if len(spec) > 4 else None
+    scratch = buffer(f"{name}_scratch", len(t)) if spec[0] == "Sawtooth" else None
+    return generate_into(spec[0], t, *spec[1:4], buffer(name, len(t)), scratch, source=source)
+
+
+def run_chain(ws, t, s1, steps, filters=None, dt=None, check=None):
+    """Apply `steps` to (t, s1) using workspace buffers, as OperationChain.evaluate does.
+
+    Returns (t_processed, s_processed, signal2, convolution run info), where
+    signal2 holds the (axis, Signal 2) of every step with a Signal 2, sampled
+    only on the axis the step uses. The arrays belong to the workspace and are
+    overwritten by the next call; buffers of steps the chain no longer has are
+    released.
+
+    To run a long signal in consecutive chunks, pass the same `filters` dict to
+    every call (filter steps keep their state in it) and the spacing `dt` of
+    the whole time axis. `check`, if given, is called before every step, as in
+    OperationChain.evaluate.
+    """
+    used = set()
+
+    def buffer(name, n):
+        used.add(name)
+        return ws.buffer(name, n)
+
+    y = ws.buffer("y", len(s1))
+    np.copyto(y, s1, casting="same_kind")
+    alpha, beta = 1.0, 0.0
+    signal2 = []
+    info = []
+    for i, step in enumerate(steps):
+        if check is not None:
+            check()
+        op, p = step.operation, step.param
+        if op in CONVOLUTION_OPERATIONS:
+            t_cur = buffer(f"step{i}_axis", len(t))
+            np.multiply(t, alpha, out=t_cur)
+            np.add(t_cur, beta, out=t_cur)
+            if step.signal2 is None:
+                t_new, y_new, run = convolution_operation(op, t_cur, y)
+            else:
+                # Signal 2 shares the spacing of the (scaled) axis, as in OperationChain._convolve.
+                t2 = t if abs(alpha) == 1.0 else time_grid(len(t), t[0], t[0] + abs(alpha) * (t[-1] - t[0]))
+                s2 = _signal2_into(buffer, f"step{i}_s2", t2, step.signal2)
+                signal2.append((t2, s2))
+                t_new, y_new, run = convolution_operation(op, t_cur, y, t2, s2)
+            t = buffer(f"step{i}_t", len(t_new))
+            np.copyto(t, t_new, casting="same_kind")
+            y = buffer(f"step{i}_y", len(y_new))
+            np.copyto(y, y_new, casting="same_kind")
+            alpha, beta, dt = 1.0, 0.0, None
+            info.append(run)
+        elif op == "Time Shifting":
+            beta += p
+        elif op == "Time Scaling":
+            if p > 1e-9:
+                alpha, beta = alpha / p, beta / p
+            else:
+                y.fill(y[np.abs(alpha * t + beta).argmin()])
+        elif op == "Time Reversal":
+            alpha, beta = -alpha, -beta
+        elif op in FILTER_OPERATIONS:
+            spacing = axis_spacing(t, alpha) if dt is None else alpha * dt
+            state = filters.setdefault(i, {}) if filters is not None else None
+            np.copyto(y, filter_signal(op, p, y, spacing, state), casting="same_kind")
+        elif op == "Amplitude Scaling":
+            np.multiply(y, p, out=y)
+        elif op in ("Signal Addition", "Signal Multiplication"):
+            t_cur = t
+            if alpha != 1.0 or beta != 0.0:
+                # x₂ is a function of the output time: sample it on the current axis, as OperationChain does.
+                t_cur = buffer(f"step{i}_axis", len(t))
+                np.multiply(t, alpha, out=t_cur)
+                np.add(t_cur, beta, out=t_cur)
+            s2 = _signal2_into(buffer, f"step{i}_s2", t_cur, step.signal2)
+            signal2.append((t_cur, s2))
+            (np.add if op == "Signal Addition" else np.multiply)(y, s2, out=y)
+
+    ws.release("step", keep=used)
+    if alpha == 1.0 and beta == 0.0:
+        return t, y, signal2, info
+    t_processed = ws.buffer("t_processed", len(t))
+    np.multiply(t, alpha, out=t_processed)
+    np.add(t_processed, beta, out=t_processed)
+    return t_processed, y, signal2, info